@@ -0,0 +1,258 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Battle Arrays Module
+
+This module fights many battles at once for tuning sweeps. A BattleArrays
+holds the health, strength, magic and ability cooldown of both sides of
+N battles as NumPy columns, and resolves one round for every battle that
+is still going with a few masked array operations.
+
+The rules are those of SimpleBattle (see battle_simulator.run_battle):
+the player acts, the enemy attacks if it survived, then the cooldown
+ticks down. Rogue critical strikes and escapes draw from a NumPy
+Generator, so results match the scalar engine in distribution rather
+than battle for battle; chi_square_homogeneity() checks that.
+
+NumPy is optional for the rest of the game; it is only needed here.
+"""
+
+import math
+import sys
+import time
+from statistics import NormalDist
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import battle_simulator
+import combat_system
+from custom_exceptions import CharacterDeadError
+
+# Codes stored in BattleArrays.result
+ONGOING, PLAYER, ENEMY, ESCAPED, UNFINISHED = 0, 1, 2, 3, 4
+RESULT_NAMES = {PLAYER: "player", ENEMY: "enemy", ESCAPED: "escaped", UNFINISHED: "none"}
+
+# Class codes; anything else uses the fallback special attack
+CLASS_CODES = {"warrior": 0, "mage": 1, "rogue": 2, "cleric": 3}
+OTHER_CLASS = 4
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("BattleArrays needs NumPy (pip install numpy)")
+
+def _column(values):
+    return np.fromiter(values, dtype=np.int64)
+
+# ============================================================================
+# BATTLE ARRAYS
+# ============================================================================
+class BattleArrays:
+
+    """
+    N independent battles stored column-wise
+
+    characters, enemies: equal-length sequences of character and enemy dicts
+    (only their numbers and class are read; the dicts are not changed)
+    """
+    def __init__(self, characters, enemies):
+        _require_numpy()
+        characters = list(characters)
+        enemies = list(enemies)
+        if len(characters) != len(enemies):
+            raise ValueError("Need one enemy per character")
+        self.health = _column(c.get("health", 0) for c in characters)
+        if (self.health <= 0).any():
+            raise CharacterDeadError("Character is already dead and cannot fight.")
+        self.max_health = _column(c.get("max_health", c.get("health", 0)) for c in characters)
+        self.strength = _column(int(c.get("strength", 0)) for c in characters)
+        self.magic = _column(c.get("magic", 0) for c in characters)
+        self.cooldown = _column(c.get("ability_cooldown", 0) for c in characters)
+        self.class_code = _column(CLASS_CODES.get(c.get("class", "").lower(), OTHER_CLASS)
+                                  for c in characters)
+        self.enemy_health = _column(e.get("health", 0) for e in enemies)
+        self.enemy_strength = _column(int(e.get("strength", 0)) for e in enemies)
+        self.xp_reward = _column(e.get("xp_reward", 0) for e in enemies)
+        self.gold_reward = _column(e.get("gold_reward", 0) for e in enemies)
+        n = len(characters)
+        self.turns = np.zeros(n, dtype=np.int64)
+        self.result = np.zeros(n, dtype=np.int8)
+
+    @classmethod
+    def repeat(cls, character, enemy, n):
+        """n copies of the same fight, without building n dicts"""
+        battles = cls([character], [enemy])
+        for name, column in vars(battles).items():
+            setattr(battles, name, np.repeat(column, n))
+        return battles
+
+    def __len__(self):
+        return len(self.health)
+
+    # ------------------------------------------------------------------------
+    # Rounds
+    # ------------------------------------------------------------------------
+    def run(self, policy="attack", seed=None, max_turns=battle_simulator.MAX_TURNS):
+        """
+        Fight every battle to the end
+
+        policy: "attack", "ability" or "run" for every battle
+        seed: seed or numpy Generator for crits and escapes
+        """
+        if policy not in battle_simulator.POLICIES:
+            raise ValueError(f"Unknown battle policy: {policy}")
+        rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+        # Strength never changes during a battle, so both basic hits are fixed
+        self._enemy_guard = self.enemy_strength // 4
+        self._basic = np.maximum(1, self.strength - self._enemy_guard)
+        self._enemy_hit = np.maximum(1, self.enemy_strength - self.strength // 4)
+        live = np.flatnonzero(self.result == ONGOING)
+        while live.size:
+            live = self._round(live, policy, rng)
+            at_limit = self.turns[live] >= max_turns
+            if at_limit.any():
+                self.result[live[at_limit]] = UNFINISHED
+                live = live[~at_limit]
+        return self
+
+    def _round(self, live, policy, rng):
+        """Resolve one round for the battles in `live`; returns those still going"""
+        self.turns[live] += 1
+        if policy == "run":
+            escaped = rng.random(live.size) < 0.5
+            self.result[live[escaped]] = ESCAPED
+            live = live[~escaped]
+        else:
+            damage = self._basic[live]
+            if policy == "ability":
+                damage = self._abilities(live, damage, rng)
+            self.enemy_health[live] = np.maximum(0, self.enemy_health[live] - damage)
+            won = self.enemy_health[live] <= 0
+            self.result[live[won]] = PLAYER
+            live = live[~won]
+        self.health[live] = np.maximum(0, self.health[live] - self._enemy_hit[live])
+        lost = self.health[live] <= 0
+        self.result[live[lost]] = ENEMY
+        live = live[~lost]
+        cooling = live[self.cooldown[live] > 0]
+        self.cooldown[cooling] -= 1
+        return live
+
+    def _abilities(self, live, damage, rng):
+        """Player damage this round when every ready battle uses its ability"""
+        ready = self.cooldown[live] == 0
+        codes = self.class_code[live]
+        guard = self._enemy_guard[live]
+        damage = damage.copy()
+        for code, multiplier in ((0, 2), (1, 2)):
+            hit = ready & (codes == code)
+            stat = self.strength[live] if code == 0 else self.magic[live]
+            damage[hit] = np.maximum(1, stat[hit] * multiplier - guard[hit])
+        rogues = np.flatnonzero(ready & (codes == 2))
+        if rogues.size:
+            crit = rng.random(rogues.size) < 0.5
+            strength = self.strength[live[rogues]]
+            damage[rogues] = np.where(crit, np.maximum(1, strength * 3 - guard[rogues]),
+                                      np.maximum(1, strength - guard[rogues]))
+        clerics = ready & (codes == 3)
+        if clerics.any():
+            healed = live[clerics]
+            self.health[healed] = np.minimum(self.max_health[healed],
+                                             self.health[healed] + self.magic[healed] * 2)
+            damage[clerics] = 0
+        # Fallback special attack is a basic hit with a 1-turn cooldown
+        self.cooldown[live[ready]] = np.where(codes[ready] == OTHER_CLASS, 1, 2)
+        return damage
+
+    # ------------------------------------------------------------------------
+    # Results
+    # ------------------------------------------------------------------------
+    def xp_gained(self):
+        return np.where(self.result == PLAYER, self.xp_reward, 0)
+
+    def gold_gained(self):
+        return np.where(self.result == PLAYER, self.gold_reward, 0)
+
+    def totals(self):
+        """Running totals in the form battle_simulator.summarize expects"""
+        totals = battle_simulator._empty_totals()
+        totals["battles"] = len(self)
+        counts = np.bincount(self.result, minlength=len(RESULT_NAMES) + 1)
+        for code, name in RESULT_NAMES.items():
+            totals[name] = int(counts[code])
+        turn_values, turn_counts = np.unique(self.turns, return_counts=True)
+        totals["turns"] = dict(zip(turn_values.tolist(), turn_counts.tolist()))
+        xp = self.xp_gained()
+        gold = self.gold_gained()
+        totals["xp"], totals["xp_sq"] = int(xp.sum()), int((xp * xp).sum())
+        totals["gold"], totals["gold_sq"] = int(gold.sum()), int((gold * gold).sum())
+        return totals
+
+def simulate_battles(character_template, enemy_type, n, policy="attack", seed=0,
+                     confidence=0.95):
+    """Array-engine version of battle_simulator.simulate_battles (same report)"""
+    battles = BattleArrays.repeat(character_template, combat_system.create_enemy(enemy_type), n)
+    return battle_simulator.summarize(battles.run(policy, seed).totals(), confidence)
+
+# ============================================================================
+# DISTRIBUTION CHECK
+# ============================================================================
+def chi_square_homogeneity(counts_a, counts_b):
+    """
+    Chi-square test that two {category: count} samples share a distribution
+
+    Sparse categories are pooled so every expected count is at least 5.
+    Returns: (statistic, degrees of freedom, p-value); the p-value uses the
+             Wilson-Hilferty normal approximation.
+    """
+    total_a, total_b = sum(counts_a.values()), sum(counts_b.values())
+    total = total_a + total_b
+    cells = []
+    pooled = [0, 0]
+    for key in sorted(set(counts_a) | set(counts_b)):
+        a, b = counts_a.get(key, 0), counts_b.get(key, 0)
+        if (a + b) * min(total_a, total_b) / total >= 5:
+            cells.append((a, b))
+        else:
+            pooled[0] += a
+            pooled[1] += b
+    if pooled != [0, 0]:
+        cells.append(tuple(pooled))
+    statistic = 0.0
+    for a, b in cells:
+        column = a + b
+        for observed, row in ((a, total_a), (b, total_b)):
+            expected = row * column / total
+            statistic += (observed - expected) ** 2 / expected
+    dof = max(1, len(cells) - 1)
+    z = ((statistic / dof) ** (1 / 3) - (1 - 2 / (9 * dof))) / math.sqrt(2 / (9 * dof))
+    return statistic, dof, 1 - NormalDist().cdf(z)
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+def run_benchmark(n=1_000_000, scalar_n=100_000):
+    """Array engine against the scalar engine, with a distribution check"""
+    _require_numpy()
+    import character_manager
+    print(f"array engine: {n} battles, scalar engine: {scalar_n} battles (1 process)")
+    for character_class in ("Warrior", "Mage", "Rogue", "Cleric"):
+        hero = character_manager.create_character("Sim", character_class)
+        hero["health"] = 60
+        start = time.perf_counter()
+        battles = BattleArrays.repeat(hero, combat_system.create_enemy("orc"), n).run("ability", 0)
+        array_rate = n / (time.perf_counter() - start)
+        start = time.perf_counter()
+        scalar = battle_simulator.simulate_battles(hero, "orc", scalar_n, "ability", workers=1)
+        scalar_rate = scalar_n / (time.perf_counter() - start)
+        _, _, p_value = chi_square_homogeneity(battles.totals()["turns"], scalar["turns"])
+        print(f"  {character_class:8} array {array_rate:12,.0f}/s  scalar {scalar_rate:10,.0f}/s"
+              f"  x{array_rate / scalar_rate:5.1f}  turns p={p_value:.3f}")
+
+if __name__ == "__main__":
+    print("=== BATTLE ARRAYS BENCHMARK ===")
+    if np is None:
+        print("NumPy is not installed")
+        sys.exit(1)
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,225 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Battle Events Module
+
+This module decides what happens to the play-by-play of a battle.
+SimpleBattle reports each step as a plain tuple, (EVENT_CODE, values...),
+to its event sink instead of printing. Text is only built by a sink that
+needs it:
+
+    NullSink       drops everything; SimpleBattle does not even build
+                   the tuples
+    RingBufferSink keeps the last N events; text on request
+    TextSink       formats events and writes them to a stream in batches
+                   (the default, printing the same lines as before)
+    BinaryRecorder packs events into bytes; decode_events() reads them back
+
+A sink can be passed to SimpleBattle, or installed for every battle with
+combat_system.set_event_sink() (e.g. NULL_SINK on a headless server).
+format_event() turns one event into the line the game used to print.
+"""
+
+import io
+import struct
+import sys
+import threading
+import time
+from collections import deque
+
+# ============================================================================
+# EVENTS
+# ============================================================================
+# code: (value types, text template); s = string, i = integer
+START, TURN, ATTACK, ENEMY_ATTACK, STATS, ABILITY, COOLDOWN, FALLBACK_ATTACK, \
+    CONFUSED_ATTACK, ESCAPE, ESCAPE_FAILED, ESCAPED, VICTORY, DEFEAT = range(14)
+
+EVENT_FORMATS = {
+    START: ("ss", ">>> Battle start! {} vs {}"),
+    TURN: ("i", ">>> Turn {} begins."),
+    ATTACK: ("ssi", ">>> {} hits {} for {} damage."),
+    ENEMY_ATTACK: ("ssi", ">>> {} attacks {} for {} damage."),
+    STATS: ("siisii", "  {}: {}/{} HP | {}: {}/{} HP"),
+    ABILITY: ("s", ">>> {}"),
+    COOLDOWN: ("s", ">>> {}"),
+    FALLBACK_ATTACK: ("si", ">>> {} uses a basic attack instead for {} damage."),
+    CONFUSED_ATTACK: ("si", ">>> {} (confused) attacks for {} damage."),
+    ESCAPE: ("s", ">>> {} successfully escaped!"),
+    ESCAPE_FAILED: ("s", ">>> {} failed to escape!"),
+    ESCAPED: ("", ">>> Player escaped the battle."),
+    VICTORY: ("ss", ">>> {} defeated {}!"),
+    DEFEAT: ("ss", ">>> {} was defeated by {}..."),
+}
+
+def format_event(event):
+    """Text line for one event tuple"""
+    return EVENT_FORMATS[event[0]][1].format(*event[1:])
+
+def stats_event(character, enemy):
+    """STATS event for the current health of both sides"""
+    return (STATS,
+            character.get("name"), character.get("health", 0),
+            character.get("max_health", character.get("health", 0)),
+            enemy.get("name"), enemy.get("health", 0),
+            enemy.get("max_health", enemy.get("health", 0)))
+
+# ============================================================================
+# SINKS
+# ============================================================================
+class NullSink:
+
+    """Discards events; `enabled` is False so nothing is built for it"""
+    enabled = False
+
+    def emit(self, event):
+        pass
+
+    def flush(self):
+        pass
+
+class RingBufferSink:
+
+    """Keeps the most recent `capacity` events"""
+    enabled = True
+
+    def __init__(self, capacity=256):
+        self.events = deque(maxlen=capacity)
+        self.emit = self.events.append
+
+    def flush(self):
+        pass
+
+    def lines(self):
+        return [format_event(event) for event in self.events]
+
+    def clear(self):
+        self.events.clear()
+
+class TextSink:
+
+    """
+    Writes formatted events to a stream, batch_size events at a time
+
+    stream: file object (None = whatever sys.stdout is when writing)
+
+    Each thread buffers its own events and writes hold a lock, so battles
+    fought on different threads through one sink never mix inside a batch.
+    """
+    enabled = True
+
+    def __init__(self, stream=None, batch_size=64):
+        self.stream = stream
+        self.batch_size = batch_size
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+    def _pending(self):
+        pending = getattr(self._local, "pending", None)
+        if pending is None:
+            pending = self._local.pending = []
+        return pending
+
+    def emit(self, event):
+        pending = self._pending()
+        pending.append(event)
+        if len(pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write this thread's buffered events"""
+        pending = self._pending()
+        if not pending:
+            return
+        text = "\n".join(map(format_event, pending)) + "\n"
+        pending.clear()
+        with self._write_lock:
+            (self.stream or sys.stdout).write(text)
+
+# Binary layout: every event is its code byte followed by its values;
+# integers are signed 32-bit, strings are 16-bit indexes into a table
+# that is written in front of the events.
+_HEADER = struct.Struct("<II")
+_EVENT_STRUCTS = {
+    code: struct.Struct("<B" + kinds.replace("s", "H"))
+    for code, (kinds, _) in EVENT_FORMATS.items()
+}
+# Positions of the string values in each event tuple
+_STRING_SLOTS = {
+    code: tuple(i for i, kind in enumerate(kinds, 1) if kind == "s")
+    for code, (kinds, _) in EVENT_FORMATS.items()
+}
+
+class BinaryRecorder:
+
+    """Packs events into a compact byte string"""
+    enabled = True
+
+    def __init__(self):
+        self._body = bytearray()
+        self._strings = {}
+
+    def emit(self, event):
+        code = event[0]
+        slots = _STRING_SLOTS[code]
+        if slots:
+            strings = self._strings
+            event = list(event)
+            for i in slots:
+                index = strings.get(event[i])
+                if index is None:
+                    index = strings[event[i]] = len(strings)
+                event[i] = index
+        self._body += _EVENT_STRUCTS[code].pack(*event)
+
+    def flush(self):
+        pass
+
+    def data(self):
+        """Bytes holding every event so far"""
+        table = "\0".join(str(s) for s in self._strings).encode("utf-8")
+        return _HEADER.pack(len(self._strings), len(table)) + table + bytes(self._body)
+
+    def clear(self):
+        self._body.clear()
+        self._strings.clear()
+
+def decode_events(data):
+    """Event tuples from BinaryRecorder.data()"""
+    count, table_length = _HEADER.unpack_from(data)
+    offset = _HEADER.size
+    table = data[offset:offset + table_length].decode("utf-8").split("\0") if count else []
+    offset += table_length
+    events = []
+    while offset < len(data):
+        layout = _EVENT_STRUCTS[data[offset]]
+        event = list(layout.unpack_from(data, offset))
+        offset += layout.size
+        for i in _STRING_SLOTS[event[0]]:
+            event[i] = table[event[i]]
+        events.append(tuple(event))
+    return events
+
+NULL_SINK = NullSink()
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+def run_benchmark(battles=20_000):
+    """Time start_battle with each kind of sink"""
+    import character_manager
+    import combat_system
+    hero = character_manager.create_character("Bench", "Warrior")
+    print(f"{battles} warrior vs orc battles")
+    for label, make_sink in (("text (to StringIO)", lambda: TextSink(io.StringIO())),
+                             ("ring buffer", RingBufferSink),
+                             ("binary recorder", BinaryRecorder),
+                             ("null", NullSink)):
+        sink = make_sink()
+        start = time.perf_counter()
+        for _ in range(battles):
+            battle = combat_system.SimpleBattle(dict(hero), combat_system.create_enemy("orc"), sink)
+            battle.start_battle()
+        print(f"  {label:<20} {time.perf_counter() - start:.3f}s")
+
+if __name__ == "__main__":
+    print("=== BATTLE EVENTS BENCHMARK ===")
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
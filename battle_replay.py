@@ -0,0 +1,282 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Battle Replay Module
+
+This module records battles compactly and fights them again. A SimpleBattle
+draws all of its chance rolls from its own seeded RNG, so the starting
+stats, the seed and the action taken each turn are enough to repeat it
+exactly. A recording holds those plus the outcome, packed with struct
+(actions take two bits each); a typical battle is well under 100 bytes.
+
+replay() re-runs a recording with no output and checks that the outcome
+is the same. Run over a file of stored battles with replay_file(), it
+shows which battles a balance change affects; the file is replayed in
+chunks on a process pool, and recordings that cannot be decoded are
+reported rather than stopping the run.
+"""
+
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import battle_events
+import combat_system
+
+# Stable codes for what gets stored; anything else is stored as "confused"
+ACTIONS = ("attack", "ability", "run", "confused")
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+WINNERS = ("player", "enemy", "escaped", "none")
+WINNER_CODES = {winner: code for code, winner in enumerate(WINNERS)}
+
+RECORDING_VERSION = 1
+# version, seed, character: health, max_health, strength, magic, cooldown;
+# enemy: health, max_health, strength, magic, xp_reward, gold_reward;
+# outcome: winner, turns, xp, gold; then the three string lengths
+_FIXED = struct.Struct("<BQ5i6iBIiiBBB")
+_LENGTH = struct.Struct("<I")
+_SEED_LIMIT = 2 ** 64
+
+class BattleRecording:
+
+    """Everything needed to fight one battle again"""
+    __slots__ = ("seed", "character", "enemy", "actions", "result", "turns")
+
+    def __init__(self, seed, character, enemy, actions, result, turns):
+        self.seed = seed
+        self.character = character
+        self.enemy = enemy
+        self.actions = actions
+        self.result = result
+        self.turns = turns
+
+    def __eq__(self, other):
+        return isinstance(other, BattleRecording) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+# ============================================================================
+# RECORDING
+# ============================================================================
+def _starting_state(character, enemy):
+    character = {
+        "name": character["name"], "class": character.get("class", ""),
+        "health": character["health"],
+        "max_health": character.get("max_health", character["health"]),
+        "strength": character.get("strength", 0), "magic": character.get("magic", 0),
+        "ability_cooldown": character.get("ability_cooldown", 0),
+        "experience": 0, "gold": 0,
+    }
+    enemy = {
+        "name": enemy["name"], "health": enemy["health"],
+        "max_health": enemy.get("max_health", enemy["health"]),
+        "strength": enemy.get("strength", 0), "magic": enemy.get("magic", 0),
+        "xp_reward": enemy.get("xp_reward", 0), "gold_reward": enemy.get("gold_reward", 0),
+    }
+    return character, enemy
+
+def record_battle(character, enemy, policy=None, seed=None, events=None):
+    """
+    Fight a battle and record it
+
+    policy: function(battle) -> action for every turn (default: attack)
+    seed: anything random.Random accepts; a seed that does not fit the
+          recording (negative, too large, a string) is turned into one that does
+    Returns: (result dict from start_battle, BattleRecording)
+    """
+    if seed is not None and not (isinstance(seed, int) and 0 <= seed < _SEED_LIMIT):
+        seed = random.Random(seed).getrandbits(63)
+    start_character, start_enemy = _starting_state(character, enemy)
+    battle = combat_system.SimpleBattle(character, enemy, events or battle_events.NULL_SINK, seed)
+    battle.policy = policy
+    result = battle.start_battle()
+    actions = [a if a in ACTION_CODES else "confused" for a in battle.actions]
+    return result, BattleRecording(battle.seed, start_character, start_enemy,
+                                   actions, result, battle.turn)
+
+def encode(recording):
+    """Pack a recording into bytes"""
+    c, e, result = recording.character, recording.enemy, recording.result
+    names = [s.encode("utf-8") for s in (c["name"], c["class"], e["name"])]
+    packed_actions = bytearray((len(recording.actions) + 3) // 4)
+    for i, action in enumerate(recording.actions):
+        packed_actions[i // 4] |= ACTION_CODES[action] << (2 * (i % 4))
+    fixed = _FIXED.pack(
+        RECORDING_VERSION, recording.seed,
+        c["health"], c["max_health"], c["strength"], c["magic"], c["ability_cooldown"],
+        e["health"], e["max_health"], e["strength"], e["magic"],
+        e["xp_reward"], e["gold_reward"],
+        WINNER_CODES[result["winner"]], recording.turns,
+        result["xp_gained"], result["gold_gained"],
+        *(len(name) for name in names))
+    return fixed + b"".join(names) + _LENGTH.pack(len(recording.actions)) + bytes(packed_actions)
+
+def decode(data):
+    """
+    Unpack bytes from encode()
+
+    Raises: ValueError if the bytes are not a whole recording
+    """
+    try:
+        return _decode(data)
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise ValueError(f"Corrupt battle recording: {e}")
+
+def _decode(data):
+    (version, seed, health, max_health, strength, magic, cooldown,
+     e_health, e_max_health, e_strength, e_magic, xp_reward, gold_reward,
+     winner, turns, xp, gold, *lengths) = _FIXED.unpack_from(data)
+    if version != RECORDING_VERSION:
+        raise ValueError(f"Unsupported battle recording version: {version}")
+    offset = _FIXED.size
+    names = []
+    for length in lengths:
+        names.append(bytes(data[offset:offset + length]).decode("utf-8"))
+        offset += length
+    (count,) = _LENGTH.unpack_from(data, offset)
+    offset += _LENGTH.size
+    if len(data) != offset + (count + 3) // 4:
+        raise ValueError("Corrupt battle recording: wrong length")
+    actions = [ACTIONS[(data[offset + i // 4] >> (2 * (i % 4))) & 3] for i in range(count)]
+    character = {"name": names[0], "class": names[1], "health": health,
+                 "max_health": max_health, "strength": strength, "magic": magic,
+                 "ability_cooldown": cooldown, "experience": 0, "gold": 0}
+    enemy = {"name": names[2], "health": e_health, "max_health": e_max_health,
+             "strength": e_strength, "magic": e_magic,
+             "xp_reward": xp_reward, "gold_reward": gold_reward}
+    result = {"winner": WINNERS[winner], "xp_gained": xp, "gold_gained": gold}
+    return BattleRecording(seed, character, enemy, actions, result, turns)
+
+# ============================================================================
+# REPLAY
+# ============================================================================
+def replay(recording, events=None):
+    """
+    Fight a recorded battle again
+
+    Returns: (matches, result) where matches is True when the winner,
+             rewards and turn count are the same as recorded
+    """
+    if isinstance(recording, (bytes, bytearray, memoryview)):
+        recording = decode(recording)
+    actions = iter(recording.actions)
+    battle = combat_system.SimpleBattle(dict(recording.character), dict(recording.enemy),
+                                        events or battle_events.NULL_SINK, recording.seed)
+    # Past the recorded actions the battle has diverged; keep attacking
+    battle.policy = lambda _battle: next(actions, "attack")
+    result = battle.start_battle()
+    return result == recording.result and battle.turn == recording.turns, result
+
+def write_recordings(path, recordings):
+    """Write recordings (BattleRecording or encoded bytes) to a file"""
+    with open(path, "wb") as f:
+        for recording in recordings:
+            data = recording if isinstance(recording, bytes) else encode(recording)
+            f.write(_LENGTH.pack(len(data)))
+            f.write(data)
+
+def iter_recordings(path):
+    """
+    Yield the encoded bytes of each recording in a file
+
+    A truncated last recording is yielded short (decode() rejects it).
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    view = memoryview(data)
+    offset = 0
+    while offset < len(data):
+        if offset + _LENGTH.size > len(data):
+            yield view[offset:]
+            return
+        (length,) = _LENGTH.unpack_from(data, offset)
+        offset += _LENGTH.size
+        yield view[offset:offset + length]
+        offset += length
+
+def _replay_chunk(args):
+    """Pool entry point: (indexes that differ, indexes that are corrupt)"""
+    first_index, chunk = args
+    mismatches = []
+    corrupt = []
+    for i, data in enumerate(chunk, first_index):
+        try:
+            recording = decode(data)
+        except ValueError:
+            corrupt.append(i)
+            continue
+        if not replay(recording)[0]:
+            mismatches.append(i)
+    return mismatches, corrupt
+
+def replay_file(path, workers=None, chunk_size=2000):
+    """
+    Replay every recording in a file
+
+    workers: processes (None = CPU count, 1 = run in this process)
+    Returns: {'replayed': int, 'mismatches': [recording indexes],
+              'corrupt': [indexes of recordings that could not be decoded]}
+    """
+    recordings = [bytes(view) for view in iter_recordings(path)]
+    chunks = [(i, recordings[i:i + chunk_size]) for i in range(0, len(recordings), chunk_size)]
+    mismatches = []
+    corrupt = []
+    if workers == 1 or len(chunks) <= 1:
+        results = map(_replay_chunk, chunks)
+        for chunk_mismatches, chunk_corrupt in results:
+            mismatches.extend(chunk_mismatches)
+            corrupt.extend(chunk_corrupt)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for chunk_mismatches, chunk_corrupt in pool.map(_replay_chunk, chunks):
+                mismatches.extend(chunk_mismatches)
+                corrupt.extend(chunk_corrupt)
+    return {"replayed": len(recordings), "mismatches": mismatches, "corrupt": corrupt}
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+def run_benchmark(count=50_000):
+    """Record battles, then replay the whole file"""
+    import character_manager
+    import random
+    rng = random.Random(0)
+    classes = ("Warrior", "Mage", "Rogue", "Cleric")
+    enemy_types = ("goblin", "orc", "dragon")
+
+    def policy(battle):
+        return "ability" if battle.turn % 2 else "attack"
+
+    recordings = []
+    start = time.perf_counter()
+    for i in range(count):
+        hero = character_manager.create_character(f"hero_{i}", classes[i % 4])
+        enemy = combat_system.create_enemy(enemy_types[rng.randrange(3)])
+        recordings.append(encode(record_battle(hero, enemy, policy, rng.getrandbits(63))[1]))
+    record_time = time.perf_counter() - start
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "battles.bin")
+        write_recordings(path, recordings)
+        size = os.path.getsize(path)
+        start = time.perf_counter()
+        report = replay_file(path)
+        replay_time = time.perf_counter() - start
+    assert not report["mismatches"] and not report["corrupt"]
+    print(f"{count} battles, {size / count:.1f} bytes each, {os.cpu_count()} CPUs")
+    print(f"  record: {record_time:.3f}s ({count / record_time:,.0f}/s)")
+    print(f"  replay: {replay_time:.3f}s ({count / replay_time:,.0f}/s)")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] != "--benchmark":
+        found = replay_file(sys.argv[1])
+        print(f"{found['replayed']} battles replayed, {len(found['mismatches'])} differ, "
+              f"{len(found['corrupt'])} corrupt")
+        for index in found["mismatches"][:20]:
+            print(f"  recording {index} differs")
+        for index in found["corrupt"][:20]:
+            print(f"  recording {index} is corrupt")
+        sys.exit(1 if found["mismatches"] or found["corrupt"] else 0)
+    print("=== BATTLE REPLAY BENCHMARK ===")
+    run_benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 50_000)
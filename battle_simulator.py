@@ -0,0 +1,232 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Battle Simulator Module
+
+This module runs many battles for balancing and reports the statistics.
+Each battle follows SimpleBattle.start_battle turn for turn and uses the
+same rules (SimpleBattle.calculate_damage, use_special_ability and
+SimpleBattle.attempt_escape), but nothing is printed.
+
+Battles are split into fixed-size batches. Every batch gets its own
+random stream seeded from (seed, batch number), which hands each battle
+its SimpleBattle seed, so a run gives the same result whatever the number
+of workers. Batches run on a process pool
+and each returns running totals, which are merged at the end.
+"""
+
+import itertools
+import math
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import battle_events
+import character_events
+import combat_system
+from custom_exceptions import AbilityOnCooldownError, CharacterDeadError
+
+POLICIES = ("attack", "ability", "run")
+BATCH_SIZE = 5000
+MAX_TURNS = 1000
+
+# ============================================================================
+# ONE BATTLE
+# ============================================================================
+def _player_action(battle, action):
+    """Same effect as SimpleBattle.player_turn for one action, without output"""
+    character, enemy = battle.character, battle.enemy
+    if action == "ability":
+        try:
+            combat_system.use_special_ability(character, enemy, battle.rng)
+            return
+        except AbilityOnCooldownError:
+            pass
+    elif action == "run":
+        if battle.attempt_escape():
+            battle.escaped = True
+        return
+    battle.apply_damage(enemy, battle.calculate_damage(character, enemy))
+
+def run_battle(character, enemy, policy="attack", max_turns=MAX_TURNS, seed=None):
+    """
+    Fight one silent battle, changing character and enemy like start_battle
+
+    policy: "attack", "ability", "run" or a function(battle) -> action
+    seed: SimpleBattle seed (the same seed gives the same battle)
+    Returns: (winner, turns, xp_gained, gold_gained)
+    """
+    battle = combat_system.SimpleBattle(character, enemy, battle_events.NULL_SINK, seed)
+    if character["health"] <= 0:
+        raise CharacterDeadError("Character is already dead and cannot fight.")
+    try:
+        return _fight(battle, policy, max_turns)
+    finally:
+        character_events.emit(character, character_events.BATTLE_FIELDS)
+
+def _fight(battle, policy, max_turns):
+    """Turn loop of run_battle"""
+    character, enemy = battle.character, battle.enemy
+    choose = policy if callable(policy) else None
+    while battle.turn < max_turns:
+        battle.turn += 1
+        _player_action(battle, choose(battle) if choose else policy)
+        if battle.escaped:
+            battle.combat_active = False
+            return "escaped", battle.turn, 0, 0
+        if enemy["health"] <= 0:
+            rewards = combat_system.get_victory_rewards(enemy)
+            character["experience"] = character.get("experience", 0) + rewards["xp"]
+            character["gold"] = character.get("gold", 0) + rewards["gold"]
+            battle.combat_active = False
+            return "player", battle.turn, rewards["xp"], rewards["gold"]
+        battle.apply_damage(character, battle.calculate_damage(enemy, character))
+        if character["health"] <= 0:
+            battle.combat_active = False
+            return "enemy", battle.turn, 0, 0
+        if character.get("ability_cooldown", 0) > 0:
+            character["ability_cooldown"] -= 1
+    battle.combat_active = False
+    return "none", battle.turn, 0, 0
+
+# ============================================================================
+# BATCHES
+# ============================================================================
+def _empty_totals():
+    return {"battles": 0, "player": 0, "enemy": 0, "escaped": 0, "none": 0,
+            "turns": {}, "xp": 0, "xp_sq": 0, "gold": 0, "gold_sq": 0}
+
+def _run_batch(args):
+    """Pool entry point: run one batch on its own random stream"""
+    character_template, enemy_template, count, policy, seed, index = args
+    stream = random.Random(f"battles:{seed}:{index}")
+    totals = _empty_totals()
+    turns = totals["turns"]
+    lists = [key for key, value in character_template.items() if isinstance(value, list)]
+    for enemy in map(dict.copy, itertools.repeat(enemy_template, count)):
+        character = dict(character_template)
+        for key in lists:
+            character[key] = list(character[key])
+        winner, turn_count, xp, gold = run_battle(
+            character, enemy, policy, seed=stream.getrandbits(63))
+        totals[winner] += 1
+        turns[turn_count] = turns.get(turn_count, 0) + 1
+        totals["xp"] += xp
+        totals["xp_sq"] += xp * xp
+        totals["gold"] += gold
+        totals["gold_sq"] += gold * gold
+    totals["battles"] = count
+    return totals
+
+def _merge(totals, batch):
+    for key, value in batch.items():
+        if key == "turns":
+            for turn_count, number in value.items():
+                totals["turns"][turn_count] = totals["turns"].get(turn_count, 0) + number
+        else:
+            totals[key] += value
+    return totals
+
+# ============================================================================
+# STATISTICS
+# ============================================================================
+def wilson_interval(successes, trials, z):
+    """Wilson score interval for a proportion"""
+    if trials == 0:
+        return (0.0, 0.0)
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return (max(0.0, centre - margin), min(1.0, centre + margin))
+
+def mean_interval(total, total_sq, count, z):
+    """(mean, (low, high)) normal-approximation interval from running sums"""
+    if count == 0:
+        return 0.0, (0.0, 0.0)
+    mean = total / count
+    variance = max(0.0, total_sq / count - mean * mean) * count / max(1, count - 1)
+    margin = z * math.sqrt(variance / count)
+    return mean, (mean - margin, mean + margin)
+
+def summarize(totals, confidence=0.95):
+    """Turn merged batch totals into the simulate_battles report"""
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    n = totals["battles"]
+    turns = dict(sorted(totals["turns"].items()))
+    turn_sum = sum(t * c for t, c in turns.items())
+    turn_sq = sum(t * t * c for t, c in turns.items())
+    mean_turns, turns_ci = mean_interval(turn_sum, turn_sq, n, z)
+    xp, xp_ci = mean_interval(totals["xp"], totals["xp_sq"], n, z)
+    gold, gold_ci = mean_interval(totals["gold"], totals["gold_sq"], n, z)
+    return {
+        "battles": n,
+        "wins": totals["player"],
+        "losses": totals["enemy"],
+        "escapes": totals["escaped"],
+        "unfinished": totals["none"],
+        "win_rate": totals["player"] / n if n else 0.0,
+        "win_rate_ci": wilson_interval(totals["player"], n, z),
+        "turns": turns,
+        "mean_turns": mean_turns,
+        "mean_turns_ci": turns_ci,
+        "xp_per_battle": xp,
+        "xp_per_battle_ci": xp_ci,
+        "gold_per_battle": gold,
+        "gold_per_battle_ci": gold_ci,
+        "confidence": confidence,
+    }
+
+# ============================================================================
+# SIMULATION
+# ============================================================================
+def simulate_battles(character_template, enemy_type, n, policy="attack", workers=None,
+                     seed=0, batch_size=BATCH_SIZE, confidence=0.95):
+    """
+    Run n silent battles of a copy of character_template against enemy_type
+
+    policy: "attack", "ability", "run" or a module-level function(battle) -> action
+            (it must be picklable to run on the pool)
+    workers: processes (None = CPU count, 1 = run in this process)
+    Returns: dict with wins/losses/escapes, win_rate, the turn-count
+             distribution {turns: battles}, mean turns, XP and gold per
+             battle, and a confidence interval (*_ci) for each mean
+    """
+    if not callable(policy) and policy not in POLICIES:
+        raise ValueError(f"Unknown battle policy: {policy}")
+    # Resolved here so workers use this process's enemy registry
+    enemy = combat_system.create_enemy(enemy_type)
+    template = dict(character_template)
+    batches = [(template, enemy, min(batch_size, n - start), policy, seed, index)
+               for index, start in enumerate(range(0, n, batch_size))]
+    totals = _empty_totals()
+    if workers == 1 or len(batches) <= 1:
+        for batch in map(_run_batch, batches):
+            _merge(totals, batch)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for batch in pool.map(_run_batch, batches):
+                _merge(totals, batch)
+    return summarize(totals, confidence)
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+def run_benchmark(n=200_000, workers=None):
+    """Battles per minute for each class against an orc"""
+    import character_manager
+    print(f"{n} battles per class, workers={workers or 'all CPUs'}")
+    for character_class in ("Warrior", "Mage", "Rogue", "Cleric"):
+        hero = character_manager.create_character("Sim", character_class)
+        start = time.perf_counter()
+        report = simulate_battles(hero, "orc", n, "ability", workers=workers)
+        elapsed = time.perf_counter() - start
+        low, high = report["win_rate_ci"]
+        print(f"  {character_class:8} win {report['win_rate']:.3f} [{low:.3f}, {high:.3f}]"
+              f"  turns {report['mean_turns']:.2f}  {n / elapsed * 60:,.0f} battles/min")
+
+if __name__ == "__main__":
+    print("=== BATTLE SIMULATOR BENCHMARK ===")
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000,
+                  int(sys.argv[2]) if len(sys.argv) > 2 else None)
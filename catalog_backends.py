@@ -0,0 +1,317 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Catalog Backends Module
+
+This module lets quests and items be stored in formats other than the
+"KEY: value" text files, while returning the same dictionaries as
+game_data.load_quests / load_items:
+
+    .txt              game_data text format
+    .jsonl            JSON Lines, one record per line
+    .db / .sqlite     SQLite, with indexed filters (quests by level range,
+                      items by type and cost) via SqliteCatalog
+
+convert_catalog() converts between any two of them.
+"""
+
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+import game_data
+import quest_handler
+from custom_exceptions import (
+    CorruptedDataError,
+    InvalidDataFormatError,
+    MissingDataFileError
+)
+from data_generator import write_quest_catalog
+
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+QUEST_COLUMNS = ("quest_id", "title", "description", "reward_xp",
+                 "reward_gold", "required_level", "prerequisite")
+ITEM_COLUMNS = ("item_id", "name", "type", "effect_stat", "effect_amount",
+                "cost", "description")
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS quests (
+    quest_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    reward_xp INTEGER NOT NULL,
+    reward_gold INTEGER NOT NULL,
+    required_level INTEGER NOT NULL,
+    prerequisite TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS quests_by_level ON quests (required_level);
+CREATE TABLE IF NOT EXISTS items (
+    item_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL CHECK (type IN ('weapon', 'armor', 'consumable')),
+    effect_stat TEXT NOT NULL,
+    effect_amount INTEGER NOT NULL,
+    cost INTEGER NOT NULL,
+    description TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_by_type_cost ON items (type, cost);
+"""
+
+# ============================================================================
+# BACKEND SELECTION
+# ============================================================================
+def backend_for(path):
+    """Return 'text', 'jsonl' or 'sqlite' based on the file extension"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".jsonl":
+        return "jsonl"
+    if ext in SQLITE_EXTENSIONS:
+        return "sqlite"
+    return "text"
+
+def load_quests(path="data/quests.txt"):
+    """Load quests from any supported backend"""
+    return _load(path, "quests")
+
+def load_items(path="data/items.txt"):
+    """Load items from any supported backend"""
+    return _load(path, "items")
+
+def _load(path, kind):
+    if not os.path.exists(path):
+        raise MissingDataFileError(f"Catalog file not found: {path}")
+    backend = backend_for(path)
+    if backend == "jsonl":
+        return load_jsonl(path, kind)
+    if backend == "sqlite":
+        with SqliteCatalog(path) as catalog:
+            return catalog.load(kind)
+    return game_data.load_quests(path) if kind == "quests" else game_data.load_items(path)
+
+# ============================================================================
+# JSON LINES BACKEND
+# ============================================================================
+def load_jsonl(path, kind):
+    """Load and validate a JSON Lines catalog"""
+    if kind == "quests":
+        id_field, validate = "quest_id", game_data.validate_quest_data
+    else:
+        id_field, validate = "item_id", game_data.validate_item_data
+    records = {}
+    try:
+        f = open(path, "r")
+    except OSError as e:
+        raise CorruptedDataError(f"Failed to read catalog file: {e}")
+    with f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise InvalidDataFormatError("Record is not a JSON object")
+                validate(record)
+            except json.JSONDecodeError as e:
+                raise InvalidDataFormatError(f"Invalid JSON: {e.msg} (line {line_number})")
+            except InvalidDataFormatError as e:
+                raise InvalidDataFormatError(f"{e} (line {line_number})")
+            records[record[id_field]] = record
+    return records
+
+def write_jsonl(path, records):
+    with open(path, "w") as f:
+        for record in records.values():
+            f.write(json.dumps(record, separators=(",", ":")))
+            f.write("\n")
+
+# ============================================================================
+# SQLITE BACKEND
+# ============================================================================
+def _quest_from_row(row):
+    return dict(zip(QUEST_COLUMNS, row))
+
+def _item_from_row(row):
+    item_id, name, item_type, stat, amount, cost, description = row
+    return {"item_id": item_id, "name": name, "type": item_type,
+            "effect": {stat: amount}, "cost": cost, "description": description}
+
+class SqliteCatalog:
+
+    """
+    Quest and item catalog stored in a SQLite database
+
+    Filters run inside SQLite against indexed columns, so callers do not
+    have to load and scan the whole catalog.
+    """
+    def __init__(self, path, create=False):
+        if not create and not os.path.exists(path):
+            raise MissingDataFileError(f"Catalog database not found: {path}")
+        try:
+            self.conn = sqlite3.connect(path)
+            if create:
+                self.conn.executescript(SCHEMA_SQL)
+        except sqlite3.DatabaseError as e:
+            raise CorruptedDataError(f"Failed to open catalog database: {e}")
+
+    def _query(self, sql, params=()):
+        try:
+            return self.conn.execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            raise InvalidDataFormatError(f"Catalog database is missing data: {e}")
+        except sqlite3.DatabaseError as e:
+            raise CorruptedDataError(f"Failed to read catalog database: {e}")
+
+    def load(self, kind):
+        if kind == "quests":
+            rows = self._query(f"SELECT {', '.join(QUEST_COLUMNS)} FROM quests")
+            return {row[0]: _quest_from_row(row) for row in rows}
+        rows = self._query(f"SELECT {', '.join(ITEM_COLUMNS)} FROM items")
+        return {row[0]: _item_from_row(row) for row in rows}
+
+    def get_quest(self, quest_id):
+        rows = self._query(
+            f"SELECT {', '.join(QUEST_COLUMNS)} FROM quests WHERE quest_id = ?", (quest_id,))
+        return _quest_from_row(rows[0]) if rows else None
+
+    def get_item(self, item_id):
+        rows = self._query(
+            f"SELECT {', '.join(ITEM_COLUMNS)} FROM items WHERE item_id = ?", (item_id,))
+        return _item_from_row(rows[0]) if rows else None
+
+    def query_quests(self, min_level=None, max_level=None):
+        """Return quests whose required_level is in [min_level, max_level]"""
+        sql = f"SELECT {', '.join(QUEST_COLUMNS)} FROM quests WHERE 1 = 1"
+        params = []
+        if min_level is not None:
+            sql += " AND required_level >= ?"
+            params.append(min_level)
+        if max_level is not None:
+            sql += " AND required_level <= ?"
+            params.append(max_level)
+        return [_quest_from_row(row) for row in self._query(sql, params)]
+
+    def query_items(self, item_type=None, min_cost=None, max_cost=None):
+        """Return items filtered by type and cost range"""
+        sql = f"SELECT {', '.join(ITEM_COLUMNS)} FROM items WHERE 1 = 1"
+        params = []
+        if item_type is not None:
+            sql += " AND type = ?"
+            params.append(item_type)
+        if min_cost is not None:
+            sql += " AND cost >= ?"
+            params.append(min_cost)
+        if max_cost is not None:
+            sql += " AND cost <= ?"
+            params.append(max_cost)
+        return [_item_from_row(row) for row in self._query(sql, params)]
+
+    def replace(self, kind, records):
+        """Replace every quest or item in the database with `records`"""
+        if kind == "quests":
+            rows = ([q[col] for col in QUEST_COLUMNS] for q in records.values())
+            table, columns = "quests", QUEST_COLUMNS
+        else:
+            rows = (
+                [i["item_id"], i["name"], i["type"], *next(iter(i["effect"].items())),
+                 i["cost"], i["description"]]
+                for i in records.values()
+            )
+            table, columns = "items", ITEM_COLUMNS
+        placeholders = ", ".join("?" for _ in columns)
+        with self.conn:
+            self.conn.execute(f"DELETE FROM {table}")
+            self.conn.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+# ============================================================================
+# CONVERSION
+# ============================================================================
+def _kind_for(path):
+    return "items" if "item" in os.path.basename(path).lower() else "quests"
+
+def write_text(path, kind, records):
+    """Write records in the game_data text format"""
+    schema = game_data.QUEST_SCHEMA if kind == "quests" else game_data.ITEM_SCHEMA
+    with open(path, "w") as f:
+        for record in records.values():
+            for key, name, convert, required, allowed in schema:
+                value = record[name]
+                if name == "effect":
+                    ((stat, amount),) = value.items()
+                    value = f"{stat}:{amount}"
+                f.write(f"{key}: {value}\n")
+            f.write("\n")
+
+def convert_catalog(source, dest, kind=None):
+    """
+    Convert a catalog between backends, chosen by file extension
+
+    Returns: number of records written
+    """
+    kind = kind or _kind_for(source)
+    records = _load(source, kind)
+    backend = backend_for(dest)
+    if backend == "jsonl":
+        write_jsonl(dest, records)
+    elif backend == "sqlite":
+        with SqliteCatalog(dest, create=True) as catalog:
+            catalog.replace(kind, records)
+    else:
+        write_text(dest, kind, records)
+    return len(records)
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+def run_benchmark(count=100_000, queries=100):
+    """Compare load time and level-range query latency across backends"""
+    with tempfile.TemporaryDirectory() as tmp:
+        text_path = os.path.join(tmp, "quests.txt")
+        write_quest_catalog(text_path, count)
+        paths = {
+            "text": text_path,
+            "jsonl": os.path.join(tmp, "quests.jsonl"),
+            "sqlite": os.path.join(tmp, "quests.db"),
+        }
+        convert_catalog(text_path, paths["jsonl"], "quests")
+        convert_catalog(text_path, paths["sqlite"], "quests")
+        ranges = [(lo, lo + 2) for lo in (random.randint(1, 48) for _ in range(queries))]
+        print(f"{count} quests, {queries} level-range queries")
+        print(f"{'backend':>8} {'full load':>10} {'query':>10}")
+        for name, path in paths.items():
+            start = time.perf_counter()
+            quests = load_quests(path)
+            load_time = time.perf_counter() - start
+            start = time.perf_counter()
+            if name == "sqlite":
+                with SqliteCatalog(path) as catalog:
+                    for lo, hi in ranges:
+                        catalog.query_quests(lo, hi)
+            else:
+                # File formats can only be filtered after a full load
+                for lo, hi in ranges:
+                    quest_handler.get_quests_by_level(quests, lo, hi)
+            query_time = (time.perf_counter() - start) / queries
+            print(f"{name:>8} {load_time:>9.3f}s {query_time * 1000:>8.2f}ms")
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        written = convert_catalog(sys.argv[1], sys.argv[2])
+        print(f"Converted {written} records: {sys.argv[1]} -> {sys.argv[2]}")
+    else:
+        print("=== CATALOG BACKENDS BENCHMARK ===")
+        print("(convert with: python catalog_backends.py SOURCE DEST)")
+        run_benchmark(int(sys.argv[1]) if len(sys.argv) == 2 else 100_000)
@@ -0,0 +1,186 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Catalog Cache Module
+
+This module compiles the text catalogs in data/ into validated binary
+bundles and loads them back without re-running the text parser.
+
+A bundle is stored next to its text file (data/quests.txt.bundle) and is
+keyed by the text file's size, mtime and SHA-256 hash. When the key no
+longer matches, the loaders fall back to game_data and rebuild the bundle.
+"""
+
+import hashlib
+import marshal
+import os
+import struct
+import sys
+import tempfile
+import time
+
+import data_generator
+import game_data
+from custom_exceptions import CorruptedDataError, MissingDataFileError
+
+BUNDLE_MAGIC = b"QCB1"
+BUNDLE_SUFFIX = ".bundle"
+# Header length prefix, stored right after the magic bytes
+_HEADER_LEN = struct.Struct("<I")
+
+CATALOG_LOADERS = {
+    "quests": game_data.load_quests,
+    "items": game_data.load_items,
+}
+
+# ============================================================================
+# FILE SIGNATURES
+# ============================================================================
+def file_signature(filename):
+    """Return (size, mtime_ns) for a data file"""
+    if not os.path.exists(filename):
+        raise MissingDataFileError(f"Data file not found: {filename}")
+    st = os.stat(filename)
+    return st.st_size, st.st_mtime_ns
+
+def file_digest(filename):
+    """Return the SHA-256 hex digest of a data file"""
+    h = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def default_bundle_path(filename):
+    return filename + BUNDLE_SUFFIX
+
+# ============================================================================
+# COMPILING
+# ============================================================================
+def compile_catalog(filename, kind, bundle_filename=None):
+    """
+    Parse and validate a text catalog and write it as a binary bundle
+
+    Returns: (records, bundle path)
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    if kind not in CATALOG_LOADERS:
+        raise ValueError(f"Unknown catalog kind: {kind}")
+    bundle_filename = bundle_filename or default_bundle_path(filename)
+    # Take the key before parsing so an edit made mid-parse leaves the bundle stale
+    size, mtime_ns = file_signature(filename)
+    digest = file_digest(filename)
+    records = CATALOG_LOADERS[kind](filename)
+    header = marshal.dumps((kind, size, mtime_ns, digest))
+    body = marshal.dumps(records)
+    # Write to a temp file and rename so readers never see a half-written bundle
+    directory = os.path.dirname(os.path.abspath(bundle_filename))
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    except OSError as e:
+        raise CorruptedDataError(f"Failed to write catalog bundle: {e}")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(BUNDLE_MAGIC)
+            f.write(_HEADER_LEN.pack(len(header)))
+            f.write(header)
+            f.write(body)
+        os.replace(tmp_path, bundle_filename)
+    except OSError as e:
+        # Do not leave a stray temp file behind in the data directory
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise CorruptedDataError(f"Failed to write catalog bundle: {e}")
+    return records, bundle_filename
+
+# ============================================================================
+# LOADING
+# ============================================================================
+def _read_bundle_header(f):
+    """Return the bundle header tuple, or None if the file is not a bundle"""
+    if f.read(len(BUNDLE_MAGIC)) != BUNDLE_MAGIC:
+        return None
+    raw_len = f.read(_HEADER_LEN.size)
+    if len(raw_len) != _HEADER_LEN.size:
+        return None
+    (header_len,) = _HEADER_LEN.unpack(raw_len)
+    try:
+        return marshal.loads(f.read(header_len))
+    except (EOFError, ValueError, TypeError):
+        return None
+
+def _header_is_fresh(header, filename, kind):
+    if header is None or header[0] != kind:
+        return False
+    size, mtime_ns = file_signature(filename)
+    if (size, mtime_ns) == (header[1], header[2]):
+        return True
+    # Touched but not edited (checkout, copy) still counts as fresh
+    return size == header[1] and file_digest(filename) == header[3]
+
+def is_bundle_fresh(filename, kind, bundle_filename=None):
+    """Return True if the bundle matches the current text catalog"""
+    bundle_filename = bundle_filename or default_bundle_path(filename)
+    if not os.path.exists(bundle_filename):
+        return False
+    with open(bundle_filename, "rb") as f:
+        return _header_is_fresh(_read_bundle_header(f), filename, kind)
+
+def load_catalog(filename, kind, bundle_filename=None, rebuild=True):
+    """
+    Load a catalog from its bundle when fresh, otherwise from the text file
+
+    A stale or unreadable bundle is rebuilt unless rebuild is False.
+    """
+    bundle_filename = bundle_filename or default_bundle_path(filename)
+    if os.path.exists(bundle_filename):
+        try:
+            with open(bundle_filename, "rb") as f:
+                if _header_is_fresh(_read_bundle_header(f), filename, kind):
+                    return marshal.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+    if not rebuild:
+        return CATALOG_LOADERS[kind](filename)
+    try:
+        records, _ = compile_catalog(filename, kind, bundle_filename)
+    except CorruptedDataError:
+        # Read-only data directory: serve the text parse without caching
+        records = CATALOG_LOADERS[kind](filename)
+    return records
+
+def load_quests(filename="data/quests.txt", bundle_filename=None):
+    """Drop-in replacement for game_data.load_quests that uses the bundle"""
+    return load_catalog(filename, "quests", bundle_filename)
+
+def load_items(filename="data/items.txt", bundle_filename=None):
+    """Drop-in replacement for game_data.load_items that uses the bundle"""
+    return load_catalog(filename, "items", bundle_filename)
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+def run_benchmark(sizes=(10_000, 100_000, 1_000_000)):
+    """Compare a cold text parse against a warm bundle load"""
+    print(f"{'records':>10} {'text parse':>12} {'bundle load':>12} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in sizes:
+            path = os.path.join(tmp, f"quests_{count}.txt")
+            data_generator.write_quest_catalog(path, count)
+            start = time.perf_counter()
+            game_data.load_quests(path)
+            text_time = time.perf_counter() - start
+            compile_catalog(path, "quests")
+            start = time.perf_counter()
+            load_quests(path)
+            bundle_time = time.perf_counter() - start
+            print(f"{count:>10} {text_time:>11.3f}s {bundle_time:>11.3f}s "
+                  f"{text_time / bundle_time:>7.1f}x")
+
+if __name__ == "__main__":
+    print("=== CATALOG CACHE BENCHMARK ===")
+    if len(sys.argv) > 1:
+        run_benchmark([int(arg) for arg in sys.argv[1:]])
+    else:
+        run_benchmark()
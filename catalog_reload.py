@@ -0,0 +1,156 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Catalog Reload Module
+
+This module lets a running game pick up edits to data/quests.txt and
+data/items.txt without a restart.
+
+A CatalogWatcher remembers a hash for every block in the file. When the
+file's size or mtime changes it re-reads the blocks, parses only those
+whose hash is new, and updates the live dictionary in place. Each reload
+reports which IDs were added, changed and removed.
+"""
+
+import hashlib
+import threading
+
+import game_data
+from catalog_cache import file_signature
+from custom_exceptions import InvalidDataFormatError
+
+# kind -> (label, ID field, ID line prefix, single-pass record parser)
+CATALOG_KINDS = {
+    "quests": ("Quest", "quest_id", "QUEST_ID: ", game_data.parse_quest_record),
+    "items": ("Item", "item_id", "ITEM_ID: ", game_data.parse_item_record),
+}
+
+def block_digest(lines):
+    """Return a short hash identifying a block's exact contents"""
+    return hashlib.blake2b("\n".join(lines).encode(), digest_size=16).digest()
+
+# ============================================================================
+# CATALOG WATCHER
+# ============================================================================
+class CatalogWatcher:
+
+    """
+    Keeps a catalog dictionary in sync with its data file
+
+    If `records` is given it is assumed to already hold the file's contents
+    (for example main.all_quests) and is only indexed, not re-parsed.
+    Otherwise the file is loaded into a new dictionary.
+    """
+    def __init__(self, filename, kind, records=None):
+        if kind not in CATALOG_KINDS:
+            raise ValueError(f"Unknown catalog kind: {kind}")
+        self.filename = filename
+        self.kind = kind
+        self._label, self._id_field, self._id_prefix, self._parse_record = CATALOG_KINDS[kind]
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._signature = file_signature(self.filename)
+        # record_id -> digest of the block that defined it
+        self._digests = {}
+        if records is None:
+            self.records = {}
+            for line_number, lines in game_data.iter_blocks(filename, self._label):
+                record = self._parse(line_number, lines)
+                self.records[record[self._id_field]] = record
+                self._digests[record[self._id_field]] = block_digest(lines)
+        else:
+            self.records = records
+            for line_number, lines in game_data.iter_blocks(filename, self._label):
+                record_id = self._block_id(lines)
+                if record_id is not None:
+                    self._digests[record_id] = block_digest(lines)
+
+    def _block_id(self, lines):
+        for line in lines:
+            if line.startswith(self._id_prefix):
+                return line[len(self._id_prefix):]
+        return None
+
+    def _parse(self, line_number, lines):
+        try:
+            record = self._parse_record(lines)
+        except InvalidDataFormatError as e:
+            raise InvalidDataFormatError(f"{e} (line {line_number})")
+        return record
+
+    def subscribe(self, listener):
+        """Call listener(report) after every reload that changed something"""
+        self._listeners.append(listener)
+
+    def poll(self):
+        """
+        Reload the file if it changed since the last poll
+
+        Returns: None if the file is unchanged, otherwise a report dict
+                 {'added': [...], 'changed': [...], 'removed': [...]}
+        Raises: InvalidDataFormatError if an edited block is invalid; the
+                live dictionary is left untouched in that case
+        """
+        with self._lock:
+            signature = file_signature(self.filename)
+            if signature == self._signature:
+                return None
+            old_ids = {digest: record_id for record_id, digest in self._digests.items()}
+            new_digests = {}
+            updates = {}
+            for line_number, lines in game_data.iter_blocks(self.filename, self._label):
+                digest = block_digest(lines)
+                record_id = old_ids.get(digest)
+                if record_id is None:
+                    record = self._parse(line_number, lines)
+                    record_id = record[self._id_field]
+                    updates[record_id] = record
+                else:
+                    # An unchanged block may still be shadowed by a later duplicate
+                    updates.pop(record_id, None)
+                new_digests[record_id] = digest
+            report = {
+                "added": sorted(rid for rid in new_digests if rid not in self._digests),
+                "changed": sorted(
+                    rid for rid in new_digests
+                    if rid in self._digests and new_digests[rid] != self._digests[rid]
+                ),
+                "removed": sorted(rid for rid in self._digests if rid not in new_digests),
+            }
+            for record_id, record in updates.items():
+                self.records[record_id] = record
+            for record_id in report["removed"]:
+                self.records.pop(record_id, None)
+            self._digests = new_digests
+            self._signature = signature
+        if report["added"] or report["changed"] or report["removed"]:
+            for listener in self._listeners:
+                listener(report)
+        return report
+
+    # ------------------------------------------------------------------------
+    # Background polling
+    # ------------------------------------------------------------------------
+    def start(self, interval=1.0):
+        """Poll the file every `interval` seconds on a daemon thread"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.poll()
+            except Exception as e:
+                # Keep serving the last good catalog until the file is fixed
+                print(f"{self._label} reload error: {e}")
@@ -0,0 +1,136 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Catalog Shards Module
+
+This module loads a catalog that is split across many shard files in a
+directory (data/quests.d/*.txt, data/items.d/*.txt). Shards are parsed on
+a process pool and merged into one dictionary.
+
+Shards are always merged in sorted filename order, so the result and any
+duplicate-ID report are the same no matter how many workers are used.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import game_data
+from custom_exceptions import InvalidDataFormatError, MissingDataFileError
+from data_generator import write_quest_catalog
+
+SHARD_EXTENSION = ".txt"
+
+CATALOG_LOADERS = {
+    "quests": game_data.load_quests,
+    "items": game_data.load_items,
+}
+
+# ============================================================================
+# SHARD DISCOVERY
+# ============================================================================
+def list_shards(directory):
+    """Return the shard files in a directory, sorted by filename"""
+    if not os.path.isdir(directory):
+        raise MissingDataFileError(f"Shard directory not found: {directory}")
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.endswith(SHARD_EXTENSION)
+    )
+
+def _load_shard(args):
+    """Worker entry point: parse one shard file"""
+    kind, path = args
+    return CATALOG_LOADERS[kind](path)
+
+# ============================================================================
+# LOADING
+# ============================================================================
+def merge_shards(shard_paths, shard_records):
+    """
+    Merge per-shard dictionaries in order
+
+    Raises: InvalidDataFormatError listing every ID defined in more than
+            one shard, sorted by ID, with the shards in filename order
+    """
+    merged = {}
+    owners = {}
+    duplicates = {}
+    for path, records in zip(shard_paths, shard_records):
+        name = os.path.basename(path)
+        for record_id, record in records.items():
+            if record_id in merged:
+                duplicates.setdefault(record_id, [owners[record_id]]).append(name)
+                continue
+            merged[record_id] = record
+            owners[record_id] = name
+    if duplicates:
+        details = "; ".join(
+            f"{record_id} in {', '.join(duplicates[record_id])}"
+            for record_id in sorted(duplicates)
+        )
+        raise InvalidDataFormatError(f"Duplicate IDs across shards: {details}")
+    return merged
+
+def load_sharded_catalog(directory, kind, workers=None):
+    """
+    Load every shard in a directory and return one merged dictionary
+
+    workers: number of processes (None = os.cpu_count(), 1 = no pool)
+    """
+    if kind not in CATALOG_LOADERS:
+        raise ValueError(f"Unknown catalog kind: {kind}")
+    paths = list_shards(directory)
+    workers = workers or os.cpu_count() or 1
+    tasks = [(kind, path) for path in paths]
+    if workers == 1 or len(paths) <= 1:
+        shard_records = [_load_shard(task) for task in tasks]
+    else:
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            shard_records = list(pool.map(_load_shard, tasks, chunksize=chunksize))
+    return merge_shards(paths, shard_records)
+
+def load_quest_shards(directory="data/quests.d", workers=None):
+    """Load quests from a directory of shard files"""
+    return load_sharded_catalog(directory, "quests", workers)
+
+def load_item_shards(directory="data/items.d", workers=None):
+    """Load items from a directory of shard files"""
+    return load_sharded_catalog(directory, "items", workers)
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+def run_benchmark(records=200_000, shards=64, worker_counts=(1, 2, 4, 8)):
+    """Time loading one sharded catalog with different worker counts"""
+    with tempfile.TemporaryDirectory() as tmp:
+        whole = os.path.join(tmp, "all.txt")
+        write_quest_catalog(whole, records)
+        # Cut the generated catalog into shards on block boundaries
+        with open(whole) as f:
+            blocks = f.read().strip().split("\n\n")
+        per_shard = -(-len(blocks) // shards)
+        for i in range(shards):
+            chunk = blocks[i * per_shard:(i + 1) * per_shard]
+            with open(os.path.join(tmp, f"shard_{i:04d}.txt"), "w") as f:
+                f.write("\n\n".join(chunk) + "\n")
+        os.remove(whole)
+        print(f"{records} quests in {shards} shards, {os.cpu_count()} CPUs")
+        print(f"{'workers':>8} {'time':>9} {'speedup':>8}")
+        baseline = None
+        for workers in worker_counts:
+            start = time.perf_counter()
+            load_quest_shards(tmp, workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>8.3f}s {baseline / elapsed:>7.2f}x")
+
+if __name__ == "__main__":
+    print("=== CATALOG SHARDS BENCHMARK ===")
+    if len(sys.argv) > 1:
+        run_benchmark(int(sys.argv[1]))
+    else:
+        run_benchmark()
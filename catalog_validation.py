@@ -0,0 +1,189 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Catalog Validation Module
+
+This module checks a whole quest or item catalog in one pass and reports
+every problem it finds, instead of stopping at the first bad block like
+game_data.load_quests does.
+
+Each error is a dict: {'line': int or None, 'record': ID or None,
+'field': name or None, 'reason': text}. Blocks can be checked in
+parallel on a process pool; cross-record checks (duplicate IDs, missing
+or circular prerequisites) run afterwards over the collected records.
+"""
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import game_data
+from custom_exceptions import MissingDataFileError
+
+# kind -> (label, ID field, ID key in file, block checker)
+CATALOG_KINDS = {
+    "quests": ("Quest", "quest_id", "QUEST_ID", game_data.check_quest_record),
+    "items": ("Item", "item_id", "ITEM_ID", game_data.check_item_record),
+    "enemies": ("Enemy", "enemy_id", "ENEMY_ID", game_data.check_enemy_record),
+}
+
+CHUNK_SIZE = 2000
+
+# ============================================================================
+# BLOCK CHECKS
+# ============================================================================
+def detect_kind(filename):
+    """Guess the catalog kind from the first key in the file"""
+    for line_number, lines in game_data.iter_blocks(filename, "Catalog"):
+        for kind, entry in CATALOG_KINDS.items():
+            if any(line.startswith(entry[2] + ": ") for line in lines):
+                return kind
+        break
+    return "items" if "item" in os.path.basename(filename).lower() else "quests"
+
+def _check_chunk(args):
+    """
+    Worker entry point: check a list of (line_number, lines) blocks
+
+    Returns: (errors, [(line_number, record_id, prerequisite)])
+    """
+    kind, chunk = args
+    label, id_field, id_key, check = CATALOG_KINDS[kind]
+    errors = []
+    seen = []
+    for line_number, lines in chunk:
+        record, block_errors = check(lines)
+        record_id = record.get(id_field)
+        for offset, field, reason in block_errors:
+            errors.append({
+                "line": line_number + offset if offset is not None else line_number,
+                "record": record_id,
+                "field": field,
+                "reason": reason,
+            })
+        if record_id is not None:
+            seen.append((line_number, record_id, record.get("prerequisite")))
+    return errors, seen
+
+def _chunks(filename, kind):
+    label = CATALOG_KINDS[kind][0]
+    chunk = []
+    for block in game_data.iter_blocks(filename, label):
+        chunk.append(block)
+        if len(chunk) >= CHUNK_SIZE:
+            yield kind, chunk
+            chunk = []
+    if chunk:
+        yield kind, chunk
+
+# ============================================================================
+# CROSS-RECORD CHECKS
+# ============================================================================
+def check_duplicates(seen):
+    """Report every definition of an ID after the first"""
+    errors = []
+    first = {}
+    for line_number, record_id, prereq in seen:
+        if record_id in first:
+            errors.append({
+                "line": line_number,
+                "record": record_id,
+                "field": None,
+                "reason": f"Duplicate ID '{record_id}' (first defined on line {first[record_id]})",
+            })
+        else:
+            first[record_id] = line_number
+    return errors
+
+def check_prerequisites(seen):
+    """
+    Report missing and circular prerequisites
+
+    Same rule as quest_handler.validate_quest_prerequisites, but collects
+    every failure, and also finds cycles that would make
+    quest_handler.get_quest_prerequisite_chain loop forever.
+    """
+    errors = []
+    prereqs = {}
+    lines = {}
+    for line_number, record_id, prereq in seen:
+        prereqs[record_id] = prereq
+        lines[record_id] = line_number
+    for record_id, prereq in prereqs.items():
+        if prereq not in (None, "NONE") and prereq not in prereqs:
+            errors.append({
+                "line": lines[record_id],
+                "record": record_id,
+                "field": "prerequisite",
+                "reason": f"Quest '{record_id}' has invalid prerequisite '{prereq}'.",
+            })
+    # Walk each chain once; state 1 = on the current path, 2 = finished
+    state = {}
+    for start in prereqs:
+        path = []
+        current = start
+        while current in prereqs and current not in state:
+            state[current] = 1
+            path.append(current)
+            current = prereqs[current]
+        if state.get(current) == 1:
+            cycle = path[path.index(current):]
+            errors.append({
+                "line": lines[current],
+                "record": current,
+                "field": "prerequisite",
+                "reason": f"Circular prerequisites: {' -> '.join(cycle + [current])}",
+            })
+        for record_id in path:
+            state[record_id] = 2
+    return errors
+
+# ============================================================================
+# VALIDATION ENTRY POINT
+# ============================================================================
+def _collect(results):
+    errors = []
+    seen = []
+    for chunk_errors, chunk_seen in results:
+        errors.extend(chunk_errors)
+        seen.extend(chunk_seen)
+    return errors, seen
+
+def validate_catalog(path, kind=None, workers=1):
+    """
+    Check an entire catalog file and return a list of every error found
+
+    kind: "quests" or "items" (detected from the file when None)
+    workers: processes used for the per-block checks (1 = no pool)
+    Raises: MissingDataFileError if the file does not exist
+    """
+    if not os.path.exists(path):
+        raise MissingDataFileError(f"Catalog file not found: {path}")
+    kind = kind or detect_kind(path)
+    if kind not in CATALOG_KINDS:
+        raise ValueError(f"Unknown catalog kind: {kind}")
+    if workers == 1:
+        results = map(_check_chunk, _chunks(path, kind))
+        errors, seen = _collect(results)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            errors, seen = _collect(pool.map(_check_chunk, _chunks(path, kind)))
+    errors.extend(check_duplicates(seen))
+    if kind == "quests":
+        errors.extend(check_prerequisites(seen))
+    errors.sort(key=lambda e: (e["line"] or 0, e["field"] or ""))
+    return errors
+
+def format_error(error):
+    where = f"line {error['line']}" if error["line"] else "file"
+    field = f" [{error['field']}]" if error["field"] else ""
+    return f"{where}{field}: {error['reason']}"
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python catalog_validation.py CATALOG_FILE [WORKERS]")
+        sys.exit(2)
+    found = validate_catalog(sys.argv[1], workers=int(sys.argv[2]) if len(sys.argv) > 2 else 1)
+    for error in found:
+        print(format_error(error))
+    print(f"{len(found)} error(s) in {sys.argv[1]}")
+    sys.exit(1 if found else 0)
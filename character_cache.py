@@ -0,0 +1,200 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Character Cache Module
+
+This module keeps recently used characters in memory in front of a save
+store, so a reconnecting player does not re-read their save and an
+unchanged character is not written back.
+
+CharacterCache is itself a save store (see save_store.py), so it can be
+installed with character_manager.set_save_store(). load() returns the
+cached dict, and the mutation functions in character_manager,
+inventory_system and quest_handler (and the end of every battle) mark it
+dirty through character_events. save() writes only dirty characters; evicting a dirty
+character writes it, evicting a clean one does not. Code that edits a
+cached dict directly must call mark_dirty(name).
+"""
+
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import character_events
+import character_manager
+from save_store import TextSaveStore
+
+# ============================================================================
+# CHARACTER CACHE
+# ============================================================================
+class CharacterCache:
+
+    """
+    Bounded LRU cache of characters with dirty tracking
+
+    store: backing save store (default: text files in save_directory)
+    capacity: most characters kept in memory
+    """
+    def __init__(self, store=None, capacity=1024, save_directory="data/save_games"):
+        self.store = store if store is not None else TextSaveStore(save_directory)
+        self.capacity = capacity
+        # name -> character dict, least recently used first
+        self._entries = OrderedDict()
+        self._dirty = set()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.writes = 0
+        self.skipped_writes = 0
+        character_events.subscribe(self._on_change)
+
+    def _on_change(self, character, fields):
+        name = character.get("name")
+        with self._lock:
+            if self._entries.get(name) is character:
+                self._dirty.add(name)
+
+    def mark_dirty(self, name):
+        with self._lock:
+            if name in self._entries:
+                self._dirty.add(name)
+
+    def is_dirty(self, name):
+        with self._lock:
+            return name in self._dirty
+
+    # ------------------------------------------------------------------------
+    # Save store interface
+    # ------------------------------------------------------------------------
+    def load(self, name):
+        """Return the cached character, reading it from the store on a miss"""
+        with self._lock:
+            character = self._entries.get(name)
+            if character is not None:
+                self._entries.move_to_end(name)
+                self.hits += 1
+                return character
+            self.misses += 1
+        character = self.store.load(name)
+        with self._lock:
+            # Another thread may have loaded it meanwhile; keep the first copy
+            if name in self._entries:
+                return self._entries[name]
+            self._insert(name, character)
+        return character
+
+    def save(self, character):
+        """Write the character if it changed since it was loaded or saved"""
+        name = character["name"]
+        with self._lock:
+            cached = self._entries.get(name)
+            if cached is character and name not in self._dirty:
+                self._entries.move_to_end(name)
+                self.skipped_writes += 1
+                return True
+            self.store.save(character)
+            self.writes += 1
+            self._dirty.discard(name)
+            if cached is character:
+                self._entries.move_to_end(name)
+            else:
+                # A different dict for this name replaces the cached one
+                self._entries.pop(name, None)
+                self._insert(name, character)
+        return True
+
+    def list(self):
+        return self.store.list()
+
+    def delete(self, name):
+        with self._lock:
+            self._entries.pop(name, None)
+            self._dirty.discard(name)
+        return self.store.delete(name)
+
+    def close(self):
+        self.flush()
+        character_events.unsubscribe(self._on_change)
+        self.store.close()
+
+    # ------------------------------------------------------------------------
+    # Cache maintenance
+    # ------------------------------------------------------------------------
+    def _insert(self, name, character):
+        """Add an entry and evict beyond capacity; caller holds the lock"""
+        self._entries[name] = character
+        while len(self._entries) > self.capacity:
+            old_name, old_character = next(iter(self._entries.items()))
+            if old_name in self._dirty:
+                # Save first: if it raises, the entry stays cached and dirty
+                self.store.save(old_character)
+                self._dirty.discard(old_name)
+                self.writes += 1
+            else:
+                self.skipped_writes += 1
+            del self._entries[old_name]
+            self.evictions += 1
+
+    def flush(self):
+        """Write every dirty character; returns how many were written"""
+        with self._lock:
+            dirty = [self._entries[name] for name in self._dirty]
+            for character in dirty:
+                self.store.save(character)
+                self.writes += 1
+            self._dirty.clear()
+        return len(dirty)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "dirty": len(self._dirty),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "writes": self.writes,
+                "skipped_writes": self.skipped_writes,
+            }
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+def run_benchmark(players=2000, sessions=20_000, capacity=100):
+    """Simulate reconnecting players with and without the cache"""
+    from data_generator import write_save_games, character_name
+    rng = random.Random(0)
+    # A few players reconnect far more often than the rest
+    order = [character_name(min(players - 1, int(rng.paretovariate(1.2)) - 1))
+             for _ in range(sessions)]
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = os.path.join(tmp, "save_games")
+        write_save_games(directory, players)
+        timings = []
+        for cache in (None, CharacterCache(capacity=capacity, save_directory=directory)):
+            character_manager.set_save_store(cache)
+            start = time.perf_counter()
+            for i, name in enumerate(order):
+                character = character_manager.load_character(name, directory)
+                if i % 5 == 0:
+                    character_manager.add_gold(character, 1)
+                character_manager.save_character(character, directory)
+            timings.append(time.perf_counter() - start)
+            character_manager.set_save_store(None)
+        cache.close()
+    print(f"{sessions} sessions, {players} players, cache capacity {capacity}")
+    print(f"  no cache: {timings[0]:.3f}s")
+    print(f"  cache:    {timings[1]:.3f}s  {cache.stats()}")
+
+if __name__ == "__main__":
+    print("=== CHARACTER CACHE BENCHMARK ===")
+    if len(sys.argv) > 1:
+        run_benchmark(sessions=int(sys.argv[1]))
+    else:
+        run_benchmark()
@@ -0,0 +1,59 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Character Events Module
+
+This module lets other modules hear about character changes without the
+game code knowing who is listening. The functions in character_manager,
+inventory_system and quest_handler call emit() after changing a
+character, naming the fields they may have changed. A battle emits once
+when it ends (combat_system.SimpleBattle and battle_simulator.run_battle)
+rather than for every hit.
+
+A listener is called as listener(character, fields), where fields is a
+tuple of save-file field names. With no listeners, emit() returns at once.
+
+Save listeners (subscribe_saves) are called as listener(name) after
+character_manager writes or deletes a character's save, so anything
+holding an earlier copy of it (a prefetch) can drop it.
+"""
+
+# Field groups used by the emitting functions
+LEVEL_FIELDS = ("experience", "level", "max_health", "strength", "magic", "health")
+STAT_FIELDS = ("health", "max_health", "strength", "magic")
+QUEST_FIELDS = ("active_quests", "completed_quests")
+BATTLE_FIELDS = ("health", "experience", "gold")
+
+_listeners = []
+_save_listeners = []
+
+def subscribe(listener):
+    """Call listener(character, fields) after every character change"""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+def unsubscribe(listener):
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+def emit(character, fields):
+    """Tell every listener that `fields` of `character` may have changed"""
+    if not _listeners:
+        return
+    for listener in list(_listeners):
+        listener(character, fields)
+
+def subscribe_saves(listener):
+    """Call listener(name) after every save or delete of a character"""
+    if listener not in _save_listeners:
+        _save_listeners.append(listener)
+
+def unsubscribe_saves(listener):
+    if listener in _save_listeners:
+        _save_listeners.remove(listener)
+
+def emit_saved(name):
+    """Tell every save listener that the save of `name` changed"""
+    if not _save_listeners:
+        return
+    for listener in list(_save_listeners):
+        listener(name)
@@ -0,0 +1,409 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Character Journal Module
+
+This module provides JournalSaveStore, a save store (see save_store.py)
+that records each change to a character as a small journal line instead
+of rewriting the whole save file.
+
+Each character has up to three files in the store directory:
+
+    NAME.snap      full text save, headed by "# SNAPSHOT <seq>"
+    NAME.journal   changes made after the snapshot, one per line:
+                   <seq> {"field": value, ...}
+    NAME.history   every journal line already folded into a snapshot
+                   (kept so any earlier state can be rebuilt)
+
+A character's first journal line holds every field, so replaying history
+plus the journal from the start rebuilds the character at any sequence
+number. Changes reach the journal from character_events (gain_experience,
+add_gold, inventory and quest functions) and from save(), which records
+any field that differs from the last recorded state. Events are only
+journaled for the dict last saved or loaded for a name, so changes to a
+copy of a character (a preview, a simulation template) are not recorded.
+At most max_open journal files are kept open; the least recently
+written one is closed when another is needed. The compactor folds
+long journals into fresh snapshots, optionally on a background thread.
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import character_events
+import character_manager
+from custom_exceptions import CharacterNotFoundError, SaveFileCorruptedError
+
+SNAPSHOT_HEADER = "# SNAPSHOT "
+SAVE_FIELDS = character_manager.SAVE_FIELDS
+LIST_FIELDS = ("inventory", "active_quests", "completed_quests")
+
+def _copy_value(value):
+    return list(value) if isinstance(value, list) else value
+
+def format_record(seq, changes):
+    return f"{seq} {json.dumps(changes, separators=(',', ':'))}\n"
+
+def repair_tail(path):
+    """Cut a torn final line (a crash mid-append) off a journal file"""
+    try:
+        with open(path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+    except FileNotFoundError:
+        pass
+
+def parse_record(line):
+    """Return (seq, changes) for one journal line, or None if it is torn"""
+    seq, _, payload = line.partition(" ")
+    try:
+        return int(seq), json.loads(payload)
+    except ValueError:
+        return None
+
+# ============================================================================
+# JOURNAL STORE
+# ============================================================================
+class JournalSaveStore:
+
+    """
+    Save store that appends changes and compacts them into snapshots
+
+    compact_after: journal length (records) at which compact_due() picks
+                   a character up
+    keep_history: keep compacted records in NAME.history for load(upto_seq)
+    max_open: most journal files kept open at once
+    """
+    def __init__(self, directory="data/journal", compact_after=200, keep_history=True,
+                 max_open=64):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.compact_after = compact_after
+        self.keep_history = keep_history
+        self.max_open = max_open
+        self._lock = threading.RLock()
+        # name -> last recorded state, sequence number, open journal, record count
+        self._state = {}
+        self._seq = {}
+        self._journals = OrderedDict()
+        self._journal_lengths = {}
+        # name -> the character dict whose events are journaled
+        self._live = {}
+        self._thread = None
+        self._stop = threading.Event()
+        self.bytes_written = 0
+        character_events.subscribe(self._on_change)
+
+    def _path(self, name, extension):
+        return os.path.join(self.directory, f"{name}.{extension}")
+
+    # ------------------------------------------------------------------------
+    # Recording changes
+    # ------------------------------------------------------------------------
+    def _append(self, name, changes):
+        """Write one journal line for `name`; caller holds the lock"""
+        seq = self._seq[name] + 1
+        line = format_record(seq, changes)
+        journal = self._journals.get(name)
+        if journal is None:
+            path = self._path(name, "journal")
+            # New lines must not be appended onto a torn one
+            repair_tail(path)
+            journal = open(path, "a", buffering=1)
+            self._journals[name] = journal
+            while len(self._journals) > self.max_open:
+                self._journals.popitem(last=False)[1].close()
+        else:
+            self._journals.move_to_end(name)
+        journal.write(line)
+        self._seq[name] = seq
+        self._journal_lengths[name] = self._journal_lengths.get(name, 0) + 1
+        self.bytes_written += len(line)
+        state = self._state[name]
+        for field, value in changes.items():
+            state[field] = _copy_value(value)
+        return seq
+
+    def _record_diff(self, character, fields):
+        name = character.get("name")
+        state = self._state.get(name)
+        if state is None:
+            return None
+        changes = {
+            field: _copy_value(character[field])
+            for field in fields
+            if field in state and character.get(field) != state[field]
+        }
+        if not changes:
+            return None
+        return self._append(name, changes)
+
+    def _on_change(self, character, fields):
+        with self._lock:
+            if self._live.get(character.get("name")) is character:
+                self._record_diff(character, fields)
+
+    # ------------------------------------------------------------------------
+    # Save store interface
+    # ------------------------------------------------------------------------
+    def save(self, character):
+        """Record whatever changed since the last record (nothing if up to date)"""
+        character_manager.validate_character_data(character)
+        name = character["name"]
+        with self._lock:
+            self._live[name] = character
+            if name not in self._state:
+                if os.path.exists(self._path(name, "snap")):
+                    self._load_latest(name)
+                else:
+                    self._start(character)
+                    return True
+            self._record_diff(character, SAVE_FIELDS)
+        return True
+
+    def _start(self, character):
+        """Begin a new character: empty snapshot at seq 0, full first record"""
+        name = character["name"]
+        self._write_snapshot(name, 0, character)
+        for extension in ("journal", "history"):
+            if os.path.exists(self._path(name, extension)):
+                os.remove(self._path(name, extension))
+        self._state[name] = {field: None for field in SAVE_FIELDS}
+        self._seq[name] = 0
+        self._journal_lengths[name] = 0
+        self._append(name, {field: _copy_value(character[field]) for field in SAVE_FIELDS})
+
+    def load(self, name, upto_seq=None):
+        """
+        Rebuild a character from its snapshot and journal
+
+        upto_seq: rebuild the state as of that sequence number instead of
+                  the latest (replays history from the first record)
+        """
+        with self._lock:
+            if upto_seq is not None:
+                return self._load_at(name, upto_seq)
+            if name not in self._state:
+                self._load_latest(name)
+            state = self._state[name]
+            character = {field: _copy_value(state[field]) for field in SAVE_FIELDS}
+            self._live[name] = character
+            return character
+
+    def _read_snapshot(self, name):
+        path = self._path(name, "snap")
+        if not os.path.exists(path):
+            raise CharacterNotFoundError(f"No save file found for: {name}")
+        try:
+            with open(path) as f:
+                lines = f.readlines()
+            seq = int(lines[0][len(SNAPSHOT_HEADER):])
+        except (OSError, ValueError, IndexError):
+            raise SaveFileCorruptedError(f"Snapshot for {name} could not be read")
+        if seq == 0:
+            return 0, {field: None for field in SAVE_FIELDS}
+        return seq, character_manager.parse_character_save(lines[1:])
+
+    def _replay(self, path, state, after_seq, upto_seq=None):
+        """Apply journal lines with after_seq < seq <= upto_seq; returns last seq"""
+        last = after_seq
+        if not os.path.exists(path):
+            return last
+        with open(path) as f:
+            for line in f:
+                record = parse_record(line)
+                if record is None:
+                    # A torn line from a crash mid-write
+                    continue
+                seq, changes = record
+                if seq <= last:
+                    continue
+                if upto_seq is not None and seq > upto_seq:
+                    break
+                state.update(changes)
+                last = seq
+        return last
+
+    def _load_latest(self, name):
+        seq, state = self._read_snapshot(name)
+        journal_path = self._path(name, "journal")
+        last = self._replay(journal_path, state, seq)
+        if any(state[field] is None for field in SAVE_FIELDS):
+            raise SaveFileCorruptedError(f"Journal for {name} is missing its first record")
+        character_manager.validate_character_data(state)
+        length = 0
+        if os.path.exists(journal_path):
+            with open(journal_path) as f:
+                length = sum(1 for _ in f)
+        self._state[name] = state
+        self._seq[name] = last
+        self._journal_lengths[name] = length
+
+    def _load_at(self, name, upto_seq):
+        if not os.path.exists(self._path(name, "snap")):
+            raise CharacterNotFoundError(f"No save file found for: {name}")
+        state = {field: None for field in SAVE_FIELDS}
+        last = self._replay(self._path(name, "history"), state, 0, upto_seq)
+        last = self._replay(self._path(name, "journal"), state, last, upto_seq)
+        if last == 0 or any(state[field] is None for field in SAVE_FIELDS):
+            raise SaveFileCorruptedError(
+                f"History for {name} does not reach back to sequence {upto_seq}")
+        character_manager.validate_character_data(state)
+        return state
+
+    def list(self):
+        return sorted(
+            filename[:-len(".snap")]
+            for filename in os.listdir(self.directory)
+            if filename.endswith(".snap")
+        )
+
+    def delete(self, name):
+        with self._lock:
+            if not os.path.exists(self._path(name, "snap")):
+                raise CharacterNotFoundError(f"No save file found for: {name}")
+            self._forget(name)
+            for extension in ("snap", "journal", "history"):
+                if os.path.exists(self._path(name, extension)):
+                    os.remove(self._path(name, extension))
+        return True
+
+    def _forget(self, name):
+        journal = self._journals.pop(name, None)
+        if journal is not None:
+            journal.close()
+        for table in (self._state, self._seq, self._journal_lengths, self._live):
+            table.pop(name, None)
+
+    def sequence(self, name):
+        """Return the last sequence number recorded for a character"""
+        with self._lock:
+            if name not in self._seq:
+                self._load_latest(name)
+            return self._seq[name]
+
+    # ------------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------------
+    def _write_snapshot(self, name, seq, character):
+        path = self._path(name, "snap")
+        temp_path = path + ".tmp"
+        with open(temp_path, "w") as f:
+            f.write(f"{SNAPSHOT_HEADER}{seq}\n")
+            if seq:
+                f.write(character_manager.format_character_save(character))
+        os.replace(temp_path, path)
+
+    def compact(self, name):
+        """
+        Fold a character's journal into a new snapshot
+
+        Order matters for crash safety: history first, then the snapshot,
+        then the journal is emptied. Records at or below the snapshot's
+        sequence number are skipped on replay, so a crash between steps
+        only leaves lines that are ignored.
+        """
+        with self._lock:
+            if name not in self._state:
+                self._load_latest(name)
+            journal_path = self._path(name, "journal")
+            journal = self._journals.pop(name, None)
+            if journal is not None:
+                journal.close()
+            if not self._journal_lengths.get(name):
+                return False
+            if self.keep_history:
+                with open(journal_path) as src, open(self._path(name, "history"), "a") as dst:
+                    dst.write(src.read())
+            self._write_snapshot(name, self._seq[name], self._state[name])
+            open(journal_path, "w").close()
+            self._journal_lengths[name] = 0
+        return True
+
+    def compact_due(self):
+        """Compact every loaded character whose journal is long enough"""
+        with self._lock:
+            due = [name for name, length in self._journal_lengths.items()
+                   if length >= self.compact_after]
+        for name in due:
+            self.compact(name)
+        return due
+
+    def start(self, interval=5.0):
+        """Run compact_due() every `interval` seconds on a daemon thread"""
+        if self._thread is not None:
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.compact_due()
+            except Exception as e:
+                # The journal is still intact; try again next interval
+                print(f"Journal compaction error: {e}")
+
+    def close(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        character_events.unsubscribe(self._on_change)
+        with self._lock:
+            for journal in self._journals.values():
+                journal.close()
+            self._journals.clear()
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+def run_benchmark(actions=20_000):
+    """Compare bytes written per action: full text saves vs the journal"""
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        text_dir = os.path.join(tmp, "save_games")
+        store = JournalSaveStore(os.path.join(tmp, "journal"), compact_after=500)
+        hero = character_manager.create_character("Hero", "Warrior")
+        hero["inventory"] = ["health_potion", "iron_sword", "leather_armor"]
+        store.save(hero)
+        start_bytes = store.bytes_written
+        text_bytes = 0
+        start = time.perf_counter()
+        for _ in range(actions):
+            roll = rng.random()
+            if roll < 0.6:
+                character_manager.add_gold(hero, rng.randint(1, 20))
+            elif roll < 0.9:
+                character_manager.gain_experience(hero, rng.randint(1, 30))
+            else:
+                character_manager.heal_character(hero, rng.randint(1, 10))
+            store.save(hero)
+            store.compact_due()
+        journal_time = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(actions):
+            character_manager.save_character(hero, text_dir)
+            text_bytes += os.path.getsize(os.path.join(text_dir, "Hero_save.txt"))
+        text_time = time.perf_counter() - start
+        journal_bytes = store.bytes_written - start_bytes
+        assert store.load("Hero") == hero
+        store.close()
+    print(f"{actions} gold/XP/heal actions, each followed by a save")
+    print(f"  text saves: {text_bytes / actions:6.1f} bytes/action  {text_time:.3f}s")
+    print(f"  journal:    {journal_bytes / actions:6.1f} bytes/action  {journal_time:.3f}s")
+
+if __name__ == "__main__":
+    print("=== CHARACTER JOURNAL BENCHMARK ===")
+    if len(sys.argv) > 1:
+        run_benchmark(int(sys.argv[1]))
+    else:
+        run_benchmark()
@@ -0,0 +1,237 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Character Loader Module
+
+This module loads many characters at once. Saves are read and parsed on a
+bounded thread pool (or a process pool for text saves), and every name
+gets either a character or the error that stopped it, so one bad save
+does not hide the rest.
+
+A CharacterLoader can also prefetch: prefetch(names) starts loading a
+few likely names in the background and a later load(name) picks up the
+finished result. Each prefetch() replaces the results of the last one
+that were never used. A prefetched result is dropped when the character
+is saved through character_manager, and a prefetched text save is re-read
+if the file changed after it was loaded.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import character_events
+import character_manager
+import save_layout
+from custom_exceptions import (
+    CharacterNotFoundError,
+    InvalidSaveDataError,
+    SaveFileCorruptedError
+)
+
+LOAD_ERRORS = (CharacterNotFoundError, SaveFileCorruptedError, InvalidSaveDataError)
+
+def default_workers():
+    return min(32, (os.cpu_count() or 1) + 4)
+
+def _save_stat(name, save_directory):
+    path = save_layout.existing_save_path(name, save_directory)
+    if path is None:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+def _load_result(name, save_directory):
+    """Load one character; returns (character, None) or (None, error)"""
+    try:
+        return character_manager.load_character(name, save_directory), None
+    except LOAD_ERRORS as e:
+        return None, e
+
+def _load_one(name, save_directory):
+    """Prefetch task: (character, error, file stat before the read)"""
+    store = character_manager.get_save_store()
+    stat = None if store is not None else _save_stat(name, save_directory)
+    return _load_result(name, save_directory) + (stat,)
+
+def _load_chunk(args):
+    """Pool entry point: load a list of names; returns [(character, error)]"""
+    names, save_directory = args
+    return [_load_result(name, save_directory) for name in names]
+
+def _split(results):
+    loaded = {}
+    failed = {}
+    for name, (character, error) in results:
+        if error is None:
+            loaded[name] = character
+        else:
+            failed[name] = error
+    return loaded, failed
+
+# ============================================================================
+# LOADER
+# ============================================================================
+class CharacterLoader:
+
+    """
+    Bounded pool for loading characters, with prefetching
+
+    Loads go through character_manager.load_character, so an installed
+    save store (see save_store.py) is used when there is one.
+    max_prefetch: most names one prefetch() call starts loading
+    """
+    def __init__(self, save_directory="data/save_games", workers=None, max_prefetch=8):
+        self.save_directory = save_directory
+        self.workers = workers or default_workers()
+        self.max_prefetch = max_prefetch
+        self._pool = ThreadPoolExecutor(max_workers=self.workers)
+        # name -> future of (character, error, file stat), oldest first
+        self._prefetched = OrderedDict()
+        # Saves (and so forget) can happen on another thread, e.g. a SaveQueue
+        self._lock = threading.Lock()
+        character_events.subscribe_saves(self.forget)
+
+    def load_many(self, names):
+        """
+        Load every name concurrently
+
+        Returns: (loaded {name: character}, failed {name: error})
+        """
+        names = list(names)
+        prefetched = {}
+        rest = []
+        for name in names:
+            future = self._take(name)
+            if future is not None:
+                prefetched[name] = future
+            else:
+                rest.append(name)
+        # Group the rest into a few tasks per worker to keep per-task overhead low
+        size = max(1, -(-len(rest) // (self.workers * 4)))
+        chunks = [rest[i:i + size] for i in range(0, len(rest), size)]
+        chunk_futures = [
+            self._pool.submit(_load_chunk, (chunk, self.save_directory)) for chunk in chunks
+        ]
+        results = {name: self._result(name, future) for name, future in prefetched.items()}
+        for chunk, future in zip(chunks, chunk_futures):
+            results.update(zip(chunk, future.result()))
+        return _split((name, results[name]) for name in names)
+
+    def load(self, name):
+        """Load one character, using a prefetched result if there is one"""
+        future = self._take(name)
+        if future is None:
+            character, error = _load_result(name, self.save_directory)
+        else:
+            character, error = self._result(name, future)
+        if error is not None:
+            raise error
+        return character
+
+    def prefetch(self, names):
+        """
+        Start loading the first max_prefetch of `names` in the background
+
+        Unused results of earlier prefetches for other names are dropped.
+        Returns immediately.
+        """
+        wanted = list(dict.fromkeys(names))[:self.max_prefetch]
+        keep = set(wanted)
+        with self._lock:
+            for name in [name for name in self._prefetched if name not in keep]:
+                self._prefetched.pop(name).cancel()
+            for name in wanted:
+                if name not in self._prefetched:
+                    self._prefetched[name] = self._pool.submit(
+                        _load_one, name, self.save_directory)
+
+    def _take(self, name):
+        with self._lock:
+            return self._prefetched.pop(name, None)
+
+    def forget(self, name=None):
+        """Drop prefetched results (all of them when name is None)"""
+        with self._lock:
+            if name is None:
+                futures = list(self._prefetched.values())
+                self._prefetched.clear()
+            else:
+                futures = [self._prefetched.pop(name, None)]
+        for future in futures:
+            if future is not None:
+                future.cancel()
+
+    def _result(self, name, future):
+        """Result of a prefetch, re-read if the save file changed since"""
+        character, error, stat = future.result()
+        if stat is not None and stat != _save_stat(name, self.save_directory):
+            return _load_result(name, self.save_directory)
+        return character, error
+
+    def close(self):
+        character_events.unsubscribe_saves(self.forget)
+        self.forget()
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def load_characters(names, save_directory="data/save_games", workers=None, processes=False):
+    """
+    Load many characters at once
+
+    workers: pool size (None = a small multiple of the CPU count)
+    processes: parse text saves on a process pool instead of threads
+               (ignored when a save store is installed)
+    Returns: (loaded {name: character}, failed {name: error})
+    """
+    names = list(names)
+    if processes and character_manager.get_save_store() is None:
+        workers = workers or os.cpu_count() or 1
+        size = max(1, -(-len(names) // (workers * 4)))
+        chunks = [names[i:i + size] for i in range(0, len(names), size)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = []
+            for chunk_results in pool.map(_load_chunk, [(c, save_directory) for c in chunks]):
+                results.extend(chunk_results)
+        return _split(zip(names, results))
+    with CharacterLoader(save_directory, workers) as loader:
+        return loader.load_many(names)
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+def run_benchmark(count=10_000):
+    """Compare one-by-one loading with pooled loading of `count` saves"""
+    from data_generator import write_save_games
+    with tempfile.TemporaryDirectory() as tmp:
+        write_save_games(tmp, count)
+        names = character_manager.list_saved_characters(tmp)
+        print(f"{count} saves, {os.cpu_count()} CPUs")
+        start = time.perf_counter()
+        for name in names:
+            character_manager.load_character(name, tmp)
+        baseline = time.perf_counter() - start
+        print(f"{'one by one':>18} {baseline:7.3f}s {count / baseline:9.0f} saves/s")
+        for label, kwargs in (("4 threads", {"workers": 4}),
+                              ("16 threads", {"workers": 16}),
+                              ("processes", {"processes": True})):
+            start = time.perf_counter()
+            loaded, failed = load_characters(names, tmp, **kwargs)
+            elapsed = time.perf_counter() - start
+            assert len(loaded) == count and not failed
+            print(f"{label:>18} {elapsed:7.3f}s {count / elapsed:9.0f} saves/s")
+
+if __name__ == "__main__":
+    print("=== CHARACTER LOADER BENCHMARK ===")
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
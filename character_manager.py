@@ -7,6 +7,10 @@ This module handles character creation, loading, and saving.
 """
 
 import os
+import zlib
+import character_events
+import progression
+import save_layout
 from custom_exceptions import (
     InvalidCharacterClassError,
     CharacterNotFoundError,
@@ -15,6 +19,13 @@ from custom_exceptions import (
     CharacterDeadError
 )
 
+# Every field stored in a save, in save-file order
+SAVE_FIELDS = (
+    "name", "class", "level", "health", "max_health",
+    "strength", "magic", "experience", "gold",
+    "inventory", "active_quests", "completed_quests"
+)
+
 def create_character(name, character_class):
     """
     Create a new character with stats based on class
@@ -44,42 +55,90 @@ def create_character(name, character_class):
         "completed_quests": []
     }
     return character
+# ============================================================================
+# SAVE STORE SELECTION
+# ============================================================================
+# None = one text file per character in save_directory (the default).
+# Any object with save/load/list/delete methods (see save_store.py) can be
+# installed instead; the functions below then delegate to it.
+_save_store = None
+
+def set_save_store(store):
+    """Route save/load/list/delete through `store` (None restores text files)"""
+    global _save_store
+    _save_store = store
+
+def get_save_store():
+    return _save_store
+
+# ============================================================================
+# SAVE / LOAD
+# ============================================================================
 def save_character(character, save_directory="data/save_games"):
 
     """
     Save character to file
     """
-    if not os.path.exists(save_directory):
-        os.makedirs(save_directory)
-    filename = os.path.join(save_directory, f"{character['name']}_save.txt")
-    try:
-        with open(filename, "w") as file:
-            file.write(f"NAME: {character['name']}\n")
-            file.write(f"CLASS: {character['class']}\n")
-            file.write(f"LEVEL: {character['level']}\n")
-            file.write(f"HEALTH: {character['health']}\n")
-            file.write(f"MAX_HEALTH: {character['max_health']}\n")
-            file.write(f"STRENGTH: {character['strength']}\n")
-            file.write(f"MAGIC: {character['magic']}\n")
-            file.write(f"EXPERIENCE: {character['experience']}\n")
-            file.write(f"GOLD: {character['gold']}\n")
-            file.write(f"INVENTORY: {','.join(character['inventory'])}\n")
-            file.write(f"ACTIVE_QUESTS: {','.join(character['active_quests'])}\n")
-            file.write(f"COMPLETED_QUESTS: {','.join(character['completed_quests'])}\n")
-        return True
-    except Exception as e:
-        # Let PermissionError and IOError naturally propagate
-        raise e
+    if _save_store is not None:
+        result = _save_store.save(character)
+    else:
+        result = write_save_file(character, save_directory)
+    character_events.emit_saved(character["name"])
+    return result
 def load_character(character_name, save_directory="data/save_games"):
-    filename = os.path.join(save_directory, f"{character_name}_save.txt")
-    if not os.path.exists(filename):
-        raise CharacterNotFoundError(f"No save file found for: {character_name}")
-    try:
-        with open(filename, "r") as file:
-            lines = file.readlines()
-    except Exception:
-        raise SaveFileCorruptedError("Save file exists but could not be read")
+    if _save_store is not None:
+        return _save_store.load(character_name)
+    return read_save_file(character_name, save_directory)
+
+def list_saved_characters(save_directory="data/save_games"):
 
+    """
+    Return list of saved character names
+    """
+    if _save_store is not None:
+        return _save_store.list()
+    return list_save_files(save_directory)
+def delete_character(character_name, save_directory="data/save_games"):
+
+    """
+    Delete save file
+    """
+    if _save_store is not None:
+        result = _save_store.delete(character_name)
+    else:
+        result = delete_save_file(character_name, save_directory)
+    character_events.emit_saved(character_name)
+    return result
+
+# ============================================================================
+# TEXT SAVE FORMAT
+# ============================================================================
+# Saves written by write_save_file start with a header line
+#     #SAVE <version> <body length in bytes> <CRC32 of body, hex>
+# so truncation and corruption are found before parsing. Files without the
+# header (older saves) are still read as before.
+SAVE_HEADER_PREFIX = b"#SAVE "
+SAVE_FORMAT_VERSION = 1
+
+def format_character_save(character):
+    """Return the text save file contents for a character"""
+    return (
+        f"NAME: {character['name']}\n"
+        f"CLASS: {character['class']}\n"
+        f"LEVEL: {character['level']}\n"
+        f"HEALTH: {character['health']}\n"
+        f"MAX_HEALTH: {character['max_health']}\n"
+        f"STRENGTH: {character['strength']}\n"
+        f"MAGIC: {character['magic']}\n"
+        f"EXPERIENCE: {character['experience']}\n"
+        f"GOLD: {character['gold']}\n"
+        f"INVENTORY: {','.join(character['inventory'])}\n"
+        f"ACTIVE_QUESTS: {','.join(character['active_quests'])}\n"
+        f"COMPLETED_QUESTS: {','.join(character['completed_quests'])}\n"
+    )
+
+def parse_character_save(lines):
+    """Parse text save lines into a validated character dict"""
     character = {}
     try:
         for line in lines:
@@ -111,50 +170,110 @@ def load_character(character_name, save_directory="data/save_games"):
     validate_character_data(character)
     return character
 
-def list_saved_characters(save_directory="data/save_games"):
+def frame_save(body):
+    """Return save text encoded with its header line in front"""
+    data = body.encode("utf-8")
+    header = f"#SAVE {SAVE_FORMAT_VERSION} {len(data)} {zlib.crc32(data):08x}\n"
+    return header.encode("ascii") + data
 
+def check_save_bytes(data):
     """
-    Return list of saved character names
-    """
-    if not os.path.exists(save_directory):
-        return []
-    saves = os.listdir(save_directory)
-    names = []
-    for filename in saves:
-        if filename.endswith("_save.txt"):
-            names.append(filename.replace("_save.txt", ""))
-    return names
-def delete_character(character_name, save_directory="data/save_games"):
+    Return the body of a save file after checking its header
 
+    Data without a header is returned unchanged.
+    Raises: SaveFileCorruptedError on a bad header, length or checksum
     """
-    Delete save file
-    """
-    filename = os.path.join(save_directory, f"{character_name}_save.txt")
-    if not os.path.exists(filename):
+    if not data.startswith(SAVE_HEADER_PREFIX):
+        return data
+    end = data.find(b"\n")
+    try:
+        version, length, checksum = data[len(SAVE_HEADER_PREFIX):end].split()
+        version, length, checksum = int(version), int(length), int(checksum, 16)
+    except ValueError:
+        raise SaveFileCorruptedError("Save file header is malformed")
+    if version > SAVE_FORMAT_VERSION:
+        raise SaveFileCorruptedError(f"Unsupported save format version: {version}")
+    body = data[end + 1:]
+    if len(body) != length:
+        raise SaveFileCorruptedError(
+            f"Save file is {len(body)} bytes long, header says {length}")
+    if zlib.crc32(body) != checksum:
+        raise SaveFileCorruptedError("Save file checksum does not match")
+    return body
+
+def write_save_file(character, save_directory="data/save_games"):
+    """Write one character as NAME_save.txt in save_directory (see save_layout.py)"""
+    filename = save_layout.save_path(character["name"], save_directory)
+    parent = os.path.dirname(filename)
+    if parent and not os.path.exists(parent):
+        os.makedirs(parent)
+    # Let PermissionError and IOError naturally propagate
+    with open(filename, "wb") as file:
+        file.write(frame_save(format_character_save(character)))
+    if save_layout.is_sharded(save_directory):
+        # Drop an unmigrated flat copy so it is not listed twice
+        try:
+            os.remove(save_layout.flat_path(character["name"], save_directory))
+        except FileNotFoundError:
+            pass
+    return True
+
+def read_save_file(character_name, save_directory="data/save_games"):
+    """Read and parse NAME_save.txt from save_directory"""
+    data = None
+    # One open per candidate path instead of exists() + open()
+    for filename in save_layout.read_paths(character_name, save_directory):
+        try:
+            with open(filename, "rb") as file:
+                data = file.read()
+            break
+        except FileNotFoundError:
+            continue
+        except Exception:
+            raise SaveFileCorruptedError("Save file exists but could not be read")
+    if data is None:
+        raise CharacterNotFoundError(f"No save file found for: {character_name}")
+    # Checksum first, so a damaged file is never parsed
+    body = check_save_bytes(data)
+    try:
+        text = body.decode("utf-8")
+    except UnicodeDecodeError:
+        raise SaveFileCorruptedError("Save file is not valid text")
+    return parse_character_save(text.splitlines())
+
+def list_save_files(save_directory="data/save_games"):
+    """Return the names of every NAME_save.txt in save_directory"""
+    return list(save_layout.iter_save_names(save_directory))
+
+def delete_save_file(character_name, save_directory="data/save_games"):
+    """Delete NAME_save.txt from save_directory"""
+    deleted = False
+    for filename in save_layout.read_paths(character_name, save_directory):
+        try:
+            os.remove(filename)
+            deleted = True
+        except FileNotFoundError:
+            pass
+    if not deleted:
         raise CharacterNotFoundError(f"No save file found for: {character_name}")
-    os.remove(filename)
     return True
 
 # ============================================================================
 # CHARACTER OPERATIONS
 # ============================================================================
-def gain_experience(character, xp_amount):
+def gain_experience(character, xp_amount, curve=None):
 
     """
     Add XP and level up if needed
+
+    All levels earned are applied at once (see progression.py); curve
+    defaults to level * 100 XP per level.
     """
     if character["health"] <= 0:
         raise CharacterDeadError("Cannot gain XP while dead")
-    character["experience"] += xp_amount
-    # Level up loop
-    while character["experience"] >= character["level"] * 100:
-        character["experience"] -= character["level"] * 100
-        character["level"] += 1
-        character["max_health"] += 10
-        character["strength"] += 2
-        character["magic"] += 2
-        character["health"] = character["max_health"]
-    return character["level"]
+    level = progression.apply_experience(character, xp_amount, curve)
+    character_events.emit(character, character_events.LEVEL_FIELDS)
+    return level
 def add_gold(character, amount):
 
     """
@@ -164,6 +283,7 @@ def add_gold(character, amount):
     if new_total < 0:
         raise ValueError("Gold cannot go below 0")
     character["gold"] = new_total
+    character_events.emit(character, ("gold",))
     return character["gold"]
 def heal_character(character, amount):
 
@@ -172,6 +292,7 @@ def heal_character(character, amount):
     """
     before = character["health"]
     character["health"] = min(character["max_health"], before + amount)
+    character_events.emit(character, ("health",))
     return character["health"] - before
 def is_character_dead(character):
     return character["health"] <= 0
@@ -181,6 +302,7 @@ def revive_character(character):
     Revive with half HP
     """
     character["health"] = character["max_health"] // 2
+    character_events.emit(character, ("health",))
     return True
 
 # ============================================================================
@@ -191,12 +313,7 @@ def validate_character_data(character):
     """
     Ensure character dict contains everything needed
     """
-    required = [
-        "name", "class", "level", "health", "max_health",
-        "strength", "magic", "experience", "gold",
-        "inventory", "active_quests", "completed_quests"
-    ]
-    for key in required:
+    for key in SAVE_FIELDS:
         if key not in character:
             raise InvalidSaveDataError(f"Missing field: {key}")
     # Type checks
@@ -0,0 +1,234 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Character Population Module
+
+This module applies server-wide events (XP boosts, gold payouts, mass
+revives) to many characters at once. A CharacterPopulation stores the
+numeric stats of every character as NumPy columns, so one event is a
+handful of array operations instead of a Python loop over dicts.
+
+The batched operations give the same results as gain_experience,
+add_gold and revive_character applied to each character in turn.
+Characters move in and out as ordinary character dicts or save files.
+
+NumPy is optional for the rest of the game; it is only needed here.
+"""
+
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import character_manager
+import progression
+
+NUMERIC_FIELDS = ("level", "health", "max_health", "strength", "magic", "experience", "gold")
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("CharacterPopulation needs NumPy (pip install numpy)")
+
+def _isqrt(values):
+    """Exact integer square root of a non-negative int64 array"""
+    root = np.floor(np.sqrt(values.astype(np.float64))).astype(np.int64)
+    # Float rounding can be off by one either way for large values
+    root = np.where(root * root > values, root - 1, root)
+    root = np.where((root + 1) * (root + 1) <= values, root + 1, root)
+    return root
+
+# ============================================================================
+# POPULATION
+# ============================================================================
+class CharacterPopulation:
+
+    """
+    Numeric character stats stored column-wise
+
+    Non-numeric fields (name, class, inventory, quests) are kept as
+    per-character dicts and only used when exporting.
+    """
+    def __init__(self, characters=(), curve=None):
+        _require_numpy()
+        self.curve = curve or progression.DEFAULT_CURVE
+        characters = list(characters)
+        self.names = [c["name"] for c in characters]
+        self.extras = [
+            {k: (list(v) if isinstance(v, list) else v)
+             for k, v in c.items() if k not in NUMERIC_FIELDS}
+            for c in characters
+        ]
+        self.columns = {
+            field: np.fromiter((c[field] for c in characters), dtype=np.int64,
+                               count=len(characters))
+            for field in NUMERIC_FIELDS
+        }
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getattr__(self, field):
+        # population.gold, population.level, ... return the column arrays
+        columns = self.__dict__.get("columns")
+        if columns is not None and field in columns:
+            return columns[field]
+        raise AttributeError(field)
+
+    # ------------------------------------------------------------------------
+    # Import / export
+    # ------------------------------------------------------------------------
+    @classmethod
+    def from_save_files(cls, save_directory="data/save_games", curve=None):
+        """Load every saved character (through the installed save store, if any)"""
+        names = character_manager.list_saved_characters(save_directory)
+        return cls((character_manager.load_character(name, save_directory) for name in names),
+                   curve)
+
+    def character(self, i):
+        """Return character i as an ordinary character dict"""
+        character = dict(self.extras[i])
+        for field in NUMERIC_FIELDS:
+            character[field] = int(self.columns[field][i])
+        for key, value in character.items():
+            if isinstance(value, list):
+                character[key] = list(value)
+        return character
+
+    def to_characters(self):
+        """Return every character as a dict, in population order"""
+        columns = {field: self.columns[field].tolist() for field in NUMERIC_FIELDS}
+        characters = []
+        for i, extras in enumerate(self.extras):
+            character = {k: (list(v) if isinstance(v, list) else v) for k, v in extras.items()}
+            for field in NUMERIC_FIELDS:
+                character[field] = columns[field][i]
+            characters.append(character)
+        return characters
+
+    def save_all(self, save_directory="data/save_games"):
+        """Write every character with character_manager.save_character"""
+        for character in self.to_characters():
+            character_manager.save_character(character, save_directory)
+        return len(self)
+
+    def _mask(self, mask):
+        if mask is None:
+            return np.ones(len(self), dtype=bool)
+        return np.asarray(mask, dtype=bool)
+
+    # ------------------------------------------------------------------------
+    # Batched operations
+    # ------------------------------------------------------------------------
+    def gain_experience(self, xp_amount, mask=None):
+        """
+        Batched gain_experience: xp_amount is a number or one value per character
+
+        Dead characters are skipped (gain_experience raises for them).
+        Returns: boolean array of characters that received the XP
+        """
+        cols = self.columns
+        xp = np.broadcast_to(np.asarray(xp_amount, dtype=np.int64), (len(self),))
+        eligible = self._mask(mask) & (cols["health"] > 0)
+        level = cols["level"]
+        total = self._thresholds(level) + cols["experience"] + xp
+        new_level = np.maximum(level, self._levels_for(total))
+        leveled = eligible & (new_level > level)
+        plain = eligible & ~leveled
+        cols["experience"][plain] += xp[plain]
+        gained = (new_level - level)[leveled]
+        for stat, per_level in self.curve.stat_gains.items():
+            cols[stat][leveled] += per_level * gained
+        cols["experience"][leveled] = total[leveled] - self._thresholds(new_level[leveled])
+        cols["level"][leveled] = new_level[leveled]
+        cols["health"][leveled] = cols["max_health"][leveled]
+        return eligible
+
+    def _thresholds(self, levels):
+        curve = self.curve
+        if isinstance(curve, progression.LinearCurve):
+            return curve.step * levels * (levels - 1) // 2
+        table = curve.thresholds(int(levels.max(initial=1)))
+        return np.asarray(table, dtype=np.int64)[levels]
+
+    def _levels_for(self, totals):
+        curve = self.curve
+        if isinstance(curve, progression.LinearCurve):
+            limit = 2 * np.maximum(totals, 0) // curve.step
+            return np.maximum(1, (1 + _isqrt(1 + 4 * limit)) // 2)
+        # level_for() extends the table far enough to cover every total
+        top = curve.level_for(int(totals.max(initial=0)))
+        table = np.asarray(curve.thresholds(top + 1), dtype=np.int64)
+        return np.maximum(1, np.searchsorted(table, totals, side="right") - 1)
+
+    def add_gold(self, amount, mask=None):
+        """
+        Batched add_gold
+
+        Raises: ValueError (and changes nothing) if any selected
+                character's gold would go below 0
+        """
+        gold = self.columns["gold"]
+        selected = self._mask(mask)
+        amount = np.broadcast_to(np.asarray(amount, dtype=np.int64), (len(self),))
+        new_gold = gold + amount
+        if np.any(selected & (new_gold < 0)):
+            raise ValueError("Gold cannot go below 0")
+        np.copyto(gold, new_gold, where=selected)
+        return selected
+
+    def revive(self, mask=None):
+        """
+        Batched revive_character for dead characters (or those in `mask`)
+
+        Returns: number of characters revived
+        """
+        health = self.columns["health"]
+        selected = self._mask(mask) if mask is not None else health <= 0
+        health[selected] = self.columns["max_health"][selected] // 2
+        return int(selected.sum())
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+def run_benchmark(count=1_000_000):
+    """Time a gold payout, an XP event and a mass revive on `count` characters"""
+    _require_numpy()
+    rng = np.random.default_rng(0)
+    population = CharacterPopulation()
+    population.names = [f"hero_{i:07d}" for i in range(count)]
+    population.extras = [{"name": name} for name in population.names]
+    levels = rng.integers(1, 60, count)
+    max_health = 100 + 10 * (levels - 1)
+    population.columns = {
+        "level": levels,
+        "health": np.where(rng.random(count) < 0.05, 0, max_health),
+        "max_health": max_health,
+        "strength": 10 + 2 * (levels - 1),
+        "magic": 10 + 2 * (levels - 1),
+        "experience": rng.integers(0, 100, count) * levels,
+        "gold": rng.integers(0, 5000, count),
+    }
+    print(f"{count} characters")
+    for label, event in (
+        ("gold payout", lambda: population.add_gold(250)),
+        ("double XP", lambda: population.gain_experience(rng.integers(0, 20_000, count))),
+        ("mass revive", population.revive),
+    ):
+        start = time.perf_counter()
+        event()
+        print(f"  {label:<12} {time.perf_counter() - start:.3f}s")
+    sample = [population.character(i) for i in range(min(count, 100_000))]
+    start = time.perf_counter()
+    for character in sample:
+        character_manager.add_gold(character, 250)
+    scalar = (time.perf_counter() - start) * count / len(sample)
+    print(f"  (add_gold loop over dicts: ~{scalar:.3f}s)")
+
+if __name__ == "__main__":
+    print("=== CHARACTER POPULATION BENCHMARK ===")
+    if np is None:
+        print("NumPy is not installed")
+        sys.exit(1)
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
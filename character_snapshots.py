@@ -0,0 +1,277 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Character Snapshots Module
+
+This module gives a character cheap snapshots, so a battle or a
+multi-step shop action can be previewed or rolled back without
+copy.deepcopy of the whole character.
+
+track(character) returns a TrackedCharacter: a dict with the same
+fields whose list fields (inventory, quests) are TrackedLists. It works
+with every function that takes a character. snapshot() only pushes an
+empty undo frame. The first change to a field after a snapshot records
+that field's old value; a list is copied only then, the first time it is
+mutated. restore() puts back just the recorded fields, and commit()
+hands them to the enclosing snapshot, so snapshots nest.
+
+The changes made inside a snapshot reach character_events listeners
+(the journal, the cache) like any other, so restore() emits the fields
+it put back; listeners always end up with the restored values.
+"""
+
+import copy
+import sys
+import time
+from contextlib import contextmanager
+
+import character_events
+
+# Undo-log marker for a field that did not exist when it was recorded
+_MISSING = object()
+
+# ============================================================================
+# TRACKED LIST
+# ============================================================================
+class TrackedList(list):
+
+    """
+    List field of a TrackedCharacter
+
+    Every mutating method tells the owner first, so the owner can copy
+    the contents once per snapshot before they change.
+    """
+    __slots__ = ("_owner", "_field")
+
+    def __init__(self, items=(), owner=None, field=None):
+        list.__init__(self, items)
+        self._owner = owner
+        self._field = field
+
+    def _touch(self):
+        owner = self._owner
+        if owner is not None and owner._frames:
+            owner._record_list(self._field, self)
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+def _tracked_method(name):
+    base = getattr(list, name)
+    def method(self, *args):
+        self._touch()
+        return base(self, *args)
+    method.__name__ = name
+    return method
+
+for _name in ("append", "extend", "insert", "remove", "pop", "clear", "reverse",
+              "__setitem__", "__delitem__", "__iadd__", "__imul__"):
+    setattr(TrackedList, _name, _tracked_method(_name))
+
+# sort() takes keyword arguments only
+def _tracked_sort(self, *, key=None, reverse=False):
+    self._touch()
+    list.sort(self, key=key, reverse=reverse)
+TrackedList.sort = _tracked_sort
+
+# ============================================================================
+# TRACKED CHARACTER
+# ============================================================================
+class Snapshot:
+
+    """Handle returned by TrackedCharacter.snapshot()"""
+    __slots__ = ("owner", "depth", "frame")
+
+    def __init__(self, owner, depth, frame):
+        self.owner = owner
+        self.depth = depth
+        self.frame = frame
+
+class TrackedCharacter(dict):
+
+    """
+    Character dict with O(1) snapshots and O(changed fields) restore
+
+    Assigning a plain list to a field stores a TrackedList copy of it.
+    """
+    def __init__(self, character=()):
+        dict.__init__(self)
+        # One undo frame per open snapshot: field -> (old value, old list contents)
+        self._frames = []
+        for key, value in dict(character).items():
+            dict.__setitem__(self, key, self._wrap(key, value))
+
+    def _wrap(self, key, value):
+        if type(value) is list or (isinstance(value, TrackedList) and value._owner is not self):
+            return TrackedList(value, self, key)
+        return value
+
+    def _record(self, key):
+        """Remember the value of `key` before its first change in this frame"""
+        frame = self._frames[-1]
+        if key not in frame:
+            frame[key] = (dict.get(self, key, _MISSING), None)
+
+    def _record_list(self, key, items):
+        frame = self._frames[-1]
+        if key not in frame and dict.get(self, key) is items:
+            frame[key] = (items, list(items))
+
+    # ------------------------------------------------------------------------
+    # dict mutation
+    # ------------------------------------------------------------------------
+    def __setitem__(self, key, value):
+        if self._frames:
+            self._record(key)
+        dict.__setitem__(self, key, self._wrap(key, value))
+
+    def __delitem__(self, key):
+        if self._frames:
+            self._record(key)
+        dict.__delitem__(self, key)
+
+    def pop(self, key, *default):
+        if self._frames and key in self:
+            self._record(key)
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        if not self:
+            raise KeyError("popitem(): dictionary is empty")
+        key = next(reversed(self))
+        return key, self.pop(key)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def clear(self):
+        for key in list(self):
+            del self[key]
+
+    def __reduce__(self):
+        return (TrackedCharacter, (self.to_dict(),))
+
+    def to_dict(self):
+        """Plain dict copy with plain lists"""
+        return {key: list(value) if isinstance(value, list) else value
+                for key, value in self.items()}
+
+    # ------------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------------
+    def snapshot(self):
+        """Start a snapshot; restore() or commit() must end it"""
+        frame = {}
+        self._frames.append(frame)
+        return Snapshot(self, len(self._frames), frame)
+
+    def _check(self, snapshot):
+        frames = self._frames
+        if (snapshot.owner is not self or snapshot.depth > len(frames)
+                or frames[snapshot.depth - 1] is not snapshot.frame):
+            raise ValueError("Snapshot is not open on this character")
+
+    def restore(self, snapshot):
+        """Undo every change since `snapshot`, closing it and any inner ones"""
+        self._check(snapshot)
+        restored = {}
+        while len(self._frames) >= snapshot.depth:
+            frame = self._frames.pop()
+            restored.update(frame)
+            for key, (value, items) in frame.items():
+                if items is not None:
+                    list.__setitem__(value, slice(None), items)
+                if value is _MISSING:
+                    dict.pop(self, key, None)
+                else:
+                    dict.__setitem__(self, key, value)
+        if restored:
+            character_events.emit(self, tuple(restored))
+
+    def commit(self, snapshot):
+        """Keep the changes since `snapshot`, closing it and any inner ones"""
+        self._check(snapshot)
+        while len(self._frames) >= snapshot.depth:
+            frame = self._frames.pop()
+            if self._frames:
+                outer = self._frames[-1]
+                for key, record in frame.items():
+                    if key not in outer:
+                        outer[key] = record
+
+    def changed_fields(self):
+        """Fields changed since the innermost open snapshot"""
+        return tuple(self._frames[-1]) if self._frames else ()
+
+    @contextmanager
+    def transaction(self):
+        """Commit the block's changes, or restore them if it raises"""
+        snapshot = self.snapshot()
+        try:
+            yield snapshot
+        except BaseException:
+            self.restore(snapshot)
+            raise
+        frames = self._frames
+        if len(frames) >= snapshot.depth and frames[snapshot.depth - 1] is snapshot.frame:
+            self.commit(snapshot)
+
+    def preview(self, func, *args, **kwargs):
+        """Return func(self, ...) and then undo whatever it changed"""
+        snapshot = self.snapshot()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            self.restore(snapshot)
+
+def track(character):
+    """Return a TrackedCharacter with the fields of `character`"""
+    if isinstance(character, TrackedCharacter):
+        return character
+    return TrackedCharacter(character)
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+def run_benchmark(rounds=20_000, inventory_size=20, quests=200):
+    """Compare deepcopy rollback with snapshot rollback of a gold change"""
+    import character_manager
+    character = character_manager.create_character("Bench", "Warrior")
+    character["inventory"] = [f"item_{i}" for i in range(inventory_size)]
+    character["completed_quests"] = [f"quest_{i}" for i in range(quests)]
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        backup = copy.deepcopy(character)
+        character_manager.add_gold(character, 5)
+        character.clear()
+        character.update(backup)
+    deepcopy_time = time.perf_counter() - start
+
+    tracked = track(character)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        snapshot = tracked.snapshot()
+        character_manager.add_gold(tracked, 5)
+        tracked.restore(snapshot)
+    snapshot_time = time.perf_counter() - start
+
+    print(f"{rounds} rollbacks, {inventory_size} items, {quests} completed quests")
+    print(f"  deepcopy: {deepcopy_time:.3f}s")
+    print(f"  snapshot: {snapshot_time:.3f}s")
+
+if __name__ == "__main__":
+    print("=== CHARACTER SNAPSHOT BENCHMARK ===")
+    if len(sys.argv) > 1:
+        run_benchmark(rounds=int(sys.argv[1]))
+    else:
+        run_benchmark()
@@ -7,6 +7,13 @@ Handles combat mechanics
 """
 
 import random
+import battle_events
+import character_events
+import enemy_registry
+from battle_events import (
+    START, TURN, ATTACK, ENEMY_ATTACK, ABILITY, COOLDOWN, FALLBACK_ATTACK,
+    CONFUSED_ATTACK, ESCAPE, ESCAPE_FAILED, ESCAPED, VICTORY, DEFEAT
+)
 from custom_exceptions import (
     InvalidTargetError,
     CombatNotActiveError,
@@ -17,6 +24,21 @@ from custom_exceptions import (
 # ============================================================================
 # ENEMY DEFINITIONS
 # ============================================================================
+# Enemies come from an enemy_registry.EnemyRegistry; None = load
+# the shipped data/enemies.txt on first use.
+_enemy_registry = None
+
+def set_enemy_registry(registry):
+    """Create enemies from `registry` (None reloads the shipped catalog)"""
+    global _enemy_registry
+    _enemy_registry = registry
+
+def get_enemy_registry():
+    global _enemy_registry
+    if _enemy_registry is None:
+        _enemy_registry = enemy_registry.load_default_registry()
+    return _enemy_registry
+
 def create_enemy(enemy_type):
 
     """
@@ -25,53 +47,38 @@ def create_enemy(enemy_type):
     Returns: Enemy dictionary
     Raises: InvalidTargetError if enemy_type not recognized
     """
-    et = enemy_type.lower()
-    if et == "goblin":
-        return {
-            "name": "Goblin",
-            "health": 50,
-            "max_health": 50,
-            "strength": 8,
-            "magic": 2,
-            "xp_reward": 25,
-            "gold_reward": 10
-        }
-    elif et == "orc":
-        return {
-            "name": "Orc",
-            "health": 80,
-            "max_health": 80,
-            "strength": 12,
-            "magic": 5,
-            "xp_reward": 50,
-            "gold_reward": 25
-        }
-    elif et == "dragon":
-        return {
-            "name": "Dragon",
-            "health": 200,
-            "max_health": 200,
-            "strength": 25,
-            "magic": 15,
-            "xp_reward": 200,
-            "gold_reward": 100
-        }
-    else:
-        raise InvalidTargetError(f"Unknown enemy type: {enemy_type}")
+    return get_enemy_registry().create(enemy_type)
+def spawn_enemies(enemy_type, count):
+    """
+    Create `count` enemies of one type
+
+    Returns: list of enemy dictionaries
+    Raises: InvalidTargetError if enemy_type not recognized
+    """
+    return get_enemy_registry().spawn(enemy_type, count)
 def get_random_enemy_for_level(character_level):
 
     """
     Get an appropriate enemy for character's level
-    Level 1-2: Goblins
-    Level 3-5: Orcs
-    Level 6+: Dragons
+    Level bands come from the enemy catalog (MIN_LEVEL / MAX_LEVEL);
+    the shipped one has goblins for 1-2, orcs for 3-5 and dragons for 6+.
     """
-    if character_level <= 2:
-        return create_enemy("goblin")
-    elif 3 <= character_level <= 5:
-        return create_enemy("orc")
-    else:
-        return create_enemy("dragon")
+    registry = get_enemy_registry()
+    return registry.create(registry.for_level(character_level))
+
+# ============================================================================
+# EVENT SINK SELECTION
+# ============================================================================
+# Battles created without a sink report to this one (see battle_events.py)
+_event_sink = battle_events.TextSink()
+
+def set_event_sink(sink):
+    """Send the events of new battles to `sink` (None restores printing)"""
+    global _event_sink
+    _event_sink = sink if sink is not None else battle_events.TextSink()
+
+def get_event_sink():
+    return _event_sink
 
 # ============================================================================
 # COMBAT SYSTEM
@@ -86,11 +93,23 @@ class SimpleBattle:
     - You can set `battle.next_player_action` before calling `start_battle()` to one of:
         "attack", "ability", "run"
       to force that action on the next player turn (useful for testing).
+    - Or set `battle.policy` to a function(battle) -> action that picks every
+      turn's action without a forced one (default: "attack").
+    - Battle narration goes to `events` (default: the sink installed with
+      set_event_sink, which prints).
+    - Escapes and critical strikes draw from `battle.rng`, a random.Random
+      seeded with `seed` (default: a seed drawn from the random module), so
+      a battle can be fought again exactly from its seed and actions.
     """
-    def __init__(self, character, enemy):
+    def __init__(self, character, enemy, events=None, seed=None):
         """Initialize battle with character and enemy"""
         self.character = character
         self.enemy = enemy
+        self.seed = seed if seed is not None else random.getrandbits(63)
+        self.rng = random.Random(self.seed)
+        self.events = events if events is not None else _event_sink
+        # None when the sink ignores events, so no event tuple is built
+        self._emit = self.events.emit if self.events.enabled else None
         self.combat_active = True
         self.turn = 0
         # Initialize ability cooldown field if missing (0 means ready)
@@ -100,6 +119,9 @@ class SimpleBattle:
         self.escaped = False
         # next_player_action can be set externally to "attack"/"ability"/"run"
         self.next_player_action = None
+        self.policy = None
+        # Action taken on each turn, for recording (see battle_replay.py)
+        self.actions = []
     def start_battle(self):
 
         """
@@ -110,16 +132,28 @@ class SimpleBattle:
         """
         if self.character["health"] <= 0:
             raise CharacterDeadError("Character is already dead and cannot fight.")
-        display_battle_log(f"Battle start! {self.character['name']} vs {self.enemy['name']}")
+        try:
+            return self._fight()
+        finally:
+            # Print this battle's narration even if it ended with an error
+            self.events.flush()
+            # Health, XP and gold changed without going through character_manager
+            character_events.emit(self.character, character_events.BATTLE_FIELDS)
+    def _fight(self):
+        """Combat loop of start_battle"""
+        emit = self._emit
+        if emit:
+            emit((START, self.character["name"], self.enemy["name"]))
         # Main loop
         while self.combat_active:
             self.turn += 1
-            display_battle_log(f"Turn {self.turn} begins.")
+            if emit:
+                emit((TURN, self.turn))
             # Player turn
             self.player_turn()
-            # After player action check end
+            # After player action check end (an escape also ends the battle)
             result = self.check_battle_end()
-            if result is not None:
+            if result is not None or self.escaped:
                 break
             # Enemy turn
             self.enemy_turn()
@@ -132,12 +166,14 @@ class SimpleBattle:
         # Determine result and rewards
         if self.escaped:
             self.combat_active = False
-            display_battle_log("Player escaped the battle.")
+            if emit:
+                emit((ESCAPED,))
             return {"winner": "escaped", "xp_gained": 0, "gold_gained": 0}
         winner = self.check_battle_end()
         if winner == "player":
             rewards = get_victory_rewards(self.enemy)
-            display_battle_log(f"{self.character['name']} defeated {self.enemy['name']}!")
+            if emit:
+                emit((VICTORY, self.character["name"], self.enemy["name"]))
             # Award rewards to character
             # Character dict is expected to have 'experience' and 'gold' keys
             self.character["experience"] = self.character.get("experience", 0) + rewards["xp"]
@@ -145,7 +181,8 @@ class SimpleBattle:
             self.combat_active = False
             return {"winner": "player", "xp_gained": rewards["xp"], "gold_gained": rewards["gold"]}
         elif winner == "enemy":
-            display_battle_log(f"{self.character['name']} was defeated by {self.enemy['name']}...")
+            if emit:
+                emit((DEFEAT, self.character["name"], self.enemy["name"]))
             self.combat_active = False
             return {"winner": "enemy", "xp_gained": 0, "gold_gained": 0}
         else:
@@ -167,42 +204,51 @@ class SimpleBattle:
             action = self.next_player_action
             # reset once used (caller can set again)
             self.next_player_action = None
+        elif self.policy is not None:
+            action = self.policy(self)
         else:
             # Default non-interactive behavior: basic attack
             action = "attack"
+        self.actions.append(action)
+        emit = self._emit
         if action == "attack":
             damage = self.calculate_damage(self.character, self.enemy)
             self.apply_damage(self.enemy, damage)
-            display_battle_log(f"{self.character['name']} hits {self.enemy['name']} for {damage} damage.")
-            display_combat_stats(self.character, self.enemy)
+            if emit:
+                emit((ATTACK, self.character["name"], self.enemy["name"], damage))
+                emit(battle_events.stats_event(self.character, self.enemy))
         elif action == "ability":
             # Attempt special ability
             try:
-                desc = use_special_ability(self.character, self.enemy)
-                display_battle_log(desc)
-                display_combat_stats(self.character, self.enemy)
+                desc = use_special_ability(self.character, self.enemy, self.rng)
+                if emit:
+                    emit((ABILITY, desc))
+                    emit(battle_events.stats_event(self.character, self.enemy))
             except AbilityOnCooldownError as e:
-                display_battle_log(str(e))
                 # fallback to basic attack when ability on cooldown
                 damage = self.calculate_damage(self.character, self.enemy)
                 self.apply_damage(self.enemy, damage)
-                display_battle_log(f"{self.character['name']} uses a basic attack instead for {damage} damage.")
-                display_combat_stats(self.character, self.enemy)
+                if emit:
+                    emit((COOLDOWN, str(e)))
+                    emit((FALLBACK_ATTACK, self.character["name"], damage))
+                    emit(battle_events.stats_event(self.character, self.enemy))
         elif action == "run":
             escaped = self.attempt_escape()
             if escaped:
                 self.escaped = True
                 self.combat_active = False
-                display_battle_log(f"{self.character['name']} successfully escaped!")
+                if emit:
+                    emit((ESCAPE, self.character["name"]))
                 return
-            else:
-                display_battle_log(f"{self.character['name']} failed to escape!")
+            elif emit:
+                emit((ESCAPE_FAILED, self.character["name"]))
         else:
             # Unknown action -> default to attack
             damage = self.calculate_damage(self.character, self.enemy)
             self.apply_damage(self.enemy, damage)
-            display_battle_log(f"{self.character['name']} (confused) attacks for {damage} damage.")
-            display_combat_stats(self.character, self.enemy)
+            if emit:
+                emit((CONFUSED_ATTACK, self.character["name"], damage))
+                emit(battle_events.stats_event(self.character, self.enemy))
     def enemy_turn(self):
 
         """
@@ -213,8 +259,10 @@ class SimpleBattle:
             raise CombatNotActiveError("Cannot take enemy turn when combat is not active.")
         damage = self.calculate_damage(self.enemy, self.character)
         self.apply_damage(self.character, damage)
-        display_battle_log(f"{self.enemy['name']} attacks {self.character['name']} for {damage} damage.")
-        display_combat_stats(self.character, self.enemy)
+        emit = self._emit
+        if emit:
+            emit((ENEMY_ATTACK, self.enemy["name"], self.character["name"], damage))
+            emit(battle_events.stats_event(self.character, self.enemy))
     def calculate_damage(self, attacker, defender):
 
         """
@@ -249,7 +297,7 @@ class SimpleBattle:
         Try to escape from battle
         50% success chance
         """
-        success = random.random() < 0.5
+        success = self.rng.random() < 0.5
         if success:
             self.combat_active = False
         return success
@@ -257,10 +305,11 @@ class SimpleBattle:
 # ============================================================================
 # SPECIAL ABILITIES
 # ============================================================================
-def use_special_ability(character, enemy):
+def use_special_ability(character, enemy, rng=None):
 
     """"
     Use character's class-specific special ability
+    rng: random.Random for chance-based abilities (default: the random module)
     Returns: String describing what happened
     Raises: AbilityOnCooldownError if ability was used recently
     """
@@ -275,7 +324,7 @@ def use_special_ability(character, enemy):
     elif cls == "mage":
         return mage_fireball(character, enemy)
     elif cls == "rogue":
-        return rogue_critical_strike(character, enemy)
+        return rogue_critical_strike(character, enemy, rng)
     elif cls == "cleric":
         return cleric_heal(character)
     else:
@@ -300,9 +349,9 @@ def mage_fireball(character, enemy):
     enemy["health"] = max(0, enemy.get("health", 0) - damage)
     character["ability_cooldown"] = 2
     return f"{character.get('name')} casts Fireball and hits {enemy.get('name')} for {damage} damage."
-def rogue_critical_strike(character, enemy):
+def rogue_critical_strike(character, enemy, rng=None):
     """Rogue special ability: 50% chance for triple strength damage"""
-    chance = random.random()
+    chance = (rng or random).random()
     if chance < 0.5:
         damage = (character.get("strength", 0) * 3) - (enemy.get("strength", 0) // 4)
         damage = max(1, int(damage))
@@ -316,9 +365,26 @@ def rogue_critical_strike(character, enemy):
         enemy["health"] = max(0, enemy.get("health", 0) - damage)
         character["ability_cooldown"] = 2
         return f"{character.get('name')} attempts a critical strike but hits normally for {damage} damage."
+def cleric_heal(character):
+    """Cleric special ability: Heal for double magic (not above max health)"""
+    before = character.get("health", 0)
+    character["health"] = min(character.get("max_health", before),
+                              before + character.get("magic", 0) * 2)
+    character["ability_cooldown"] = 2
+    return f"{character.get('name')} casts Heal and restores {character['health'] - before} health."
 
 def get_victory_rewards(enemy):
     return {
         "xp": enemy.get("xp_reward", 0),
         "gold": enemy.get("gold_reward", 0)
     }
+
+# ============================================================================
+# BATTLE DISPLAY
+# ============================================================================
+def display_combat_stats(character, enemy):
+    """Show current health of both combatants"""
+    print(battle_events.format_event(battle_events.stats_event(character, enemy)))
+def display_battle_log(message):
+    """Show one line of battle narration"""
+    print(f">>> {message}")
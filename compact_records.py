@@ -0,0 +1,182 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Compact Records Module
+
+This module provides memory-light QuestRecord and ItemRecord types for
+very large catalogs. They use __slots__ instead of a per-record dict,
+intern the strings that repeat across records (IDs, prerequisites, item
+types, effect stats), and keep an item's effect as two plain slots.
+
+Records still support the dictionary-style reads used by quest_handler
+and inventory_system: record["reward_xp"], record.get(...), `in`,
+keys()/values()/items(), and comparison with the equivalent dict.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import game_data
+from data_generator import write_quest_catalog
+
+_intern = sys.intern
+
+# ============================================================================
+# RECORD TYPES
+# ============================================================================
+class CompactRecord:
+
+    """Base class: read-only mapping access over __slots__ attributes"""
+    __slots__ = ()
+    FIELDS = ()
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        if key not in self.FIELDS:
+            return default
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self.FIELDS
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self):
+        return len(self.FIELDS)
+
+    def keys(self):
+        return list(self.FIELDS)
+
+    def values(self):
+        return [getattr(self, key) for key in self.FIELDS]
+
+    def items(self):
+        return [(key, getattr(self, key)) for key in self.FIELDS]
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, CompactRecord):
+            other = other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+class QuestRecord(CompactRecord):
+
+    """Compact quest with the same fields as a loaded quest dictionary"""
+    __slots__ = ("quest_id", "title", "description", "reward_xp",
+                 "reward_gold", "required_level", "prerequisite")
+    FIELDS = __slots__
+
+    def __init__(self, quest_id, title, description, reward_xp,
+                 reward_gold, required_level, prerequisite):
+        self.quest_id = _intern(quest_id)
+        self.title = title
+        self.description = description
+        self.reward_xp = reward_xp
+        self.reward_gold = reward_gold
+        self.required_level = required_level
+        self.prerequisite = _intern(prerequisite)
+
+    @classmethod
+    def from_dict(cls, quest):
+        return cls(quest["quest_id"], quest["title"], quest["description"],
+                   quest["reward_xp"], quest["reward_gold"],
+                   quest["required_level"], quest["prerequisite"])
+
+class ItemRecord(CompactRecord):
+
+    """
+    Compact item with the same fields as a loaded item dictionary
+
+    The effect is stored as effect_stat/effect_amount; item["effect"]
+    builds the {stat: amount} dict on demand.
+    """
+    __slots__ = ("item_id", "name", "type", "effect_stat", "effect_amount",
+                 "cost", "description")
+    FIELDS = ("item_id", "name", "type", "effect", "cost", "description")
+
+    def __init__(self, item_id, name, item_type, effect, cost, description):
+        self.item_id = _intern(item_id)
+        self.name = name
+        self.type = _intern(item_type)
+        ((stat, amount),) = effect.items()
+        self.effect_stat = _intern(stat)
+        self.effect_amount = amount
+        self.cost = cost
+        self.description = description
+
+    @property
+    def effect(self):
+        return {self.effect_stat: self.effect_amount}
+
+    @classmethod
+    def from_dict(cls, item):
+        return cls(item["item_id"], item["name"], item["type"], item["effect"],
+                   item["cost"], item["description"])
+
+# ============================================================================
+# LOADING
+# ============================================================================
+def load_compact_quests(filename="data/quests.txt"):
+    """Load quests as {quest_id: QuestRecord}"""
+    quests = {}
+    for line_number, quest in game_data.iter_quests(filename):
+        record = QuestRecord.from_dict(quest)
+        quests[record.quest_id] = record
+    return quests
+
+def load_compact_items(filename="data/items.txt"):
+    """Load items as {item_id: ItemRecord}"""
+    items = {}
+    for line_number, item in game_data.iter_items(filename):
+        record = ItemRecord.from_dict(item)
+        items[record.item_id] = record
+    return items
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+def _traced_size(load, path):
+    tracemalloc.start()
+    records = load(path)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return size
+
+def run_benchmark(sizes=(10_000, 100_000)):
+    """Measure catalog memory as dicts vs compact records with tracemalloc"""
+    print(f"{'records':>10} {'dicts':>10} {'compact':>10} {'saved':>7} {'load time':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in sizes:
+            path = os.path.join(tmp, f"quests_{count}.txt")
+            write_quest_catalog(path, count)
+            as_dicts = _traced_size(game_data.load_quests, path)
+            as_records = _traced_size(load_compact_quests, path)
+            start = time.perf_counter()
+            load_compact_quests(path)
+            elapsed = time.perf_counter() - start
+            print(f"{count:>10} {as_dicts / 2**20:>8.1f}MB {as_records / 2**20:>8.1f}MB "
+                  f"{1 - as_records / as_dicts:>6.0%} {elapsed:>9.3f}s")
+
+if __name__ == "__main__":
+    print("=== COMPACT RECORDS BENCHMARK ===")
+    if len(sys.argv) > 1:
+        run_benchmark([int(arg) for arg in sys.argv[1:]])
+    else:
+        run_benchmark()
@@ -0,0 +1,171 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Data Generator Module
+
+This module writes large, valid, reproducible test data for benchmarks
+and load tests:
+
+    quest catalogs whose prerequisites form a DAG (each quest depends on an
+    earlier one and never needs a lower level than its prerequisite),
+    item catalogs covering every item type and stat,
+    save files for characters whose stats, inventory and completed
+    quests are consistent with the catalogs.
+
+From the command line everything goes under --out (default
+data/generated), with the saves in OUT/save_games so the game's own
+data/save_games is left alone; --save-dir puts them elsewhere.
+The same seed always produces the same files. Catalogs are streamed to
+disk, so sizes from 10**3 up to 10**7 records are practical.
+"""
+
+import argparse
+import os
+import random
+from array import array
+
+import character_manager
+from inventory_system import MAX_INVENTORY_SIZE
+from progression import DEFAULT_CURVE
+
+MAX_LEVEL = 60
+# How far back a quest may look for its prerequisite
+PREREQ_WINDOW = 50
+ITEM_TYPES = {
+    "weapon": ("strength", "magic"),
+    "armor": ("max_health", "magic"),
+    "consumable": ("health", "strength", "magic"),
+}
+CLASSES = ("Warrior", "Mage", "Rogue", "Cleric")
+
+# ============================================================================
+# QUEST CATALOGS
+# ============================================================================
+def generate_quest_graph(count, seed=0):
+    """
+    Return (levels, prerequisites) arrays for `count` quests
+
+    prerequisites[i] is the index of quest i's prerequisite, or -1 for NONE.
+    """
+    rng = random.Random(f"quests:{seed}")
+    levels = array("H")
+    prereqs = array("l")
+    for i in range(count):
+        # Roots are common (10%), so chains stay about ten quests deep
+        if i == 0 or rng.random() < 0.1:
+            prereqs.append(-1)
+            levels.append(rng.randint(1, 3))
+        else:
+            parent = rng.randint(max(0, i - PREREQ_WINDOW), i - 1)
+            prereqs.append(parent)
+            levels.append(min(MAX_LEVEL, levels[parent] + rng.randint(0, 2)))
+    return levels, prereqs
+
+def quest_id(index):
+    return f"quest_{index:07d}"
+
+def write_quest_catalog(path, count, seed=0):
+    """Write a quest catalog with a prerequisite DAG; returns (levels, prereqs)"""
+    levels, prereqs = generate_quest_graph(count, seed)
+    rng = random.Random(f"quest-text:{seed}")
+    with open(path, "w", buffering=1 << 20) as f:
+        for i in range(count):
+            level = levels[i]
+            prereq = quest_id(prereqs[i]) if prereqs[i] >= 0 else "NONE"
+            f.write(
+                f"QUEST_ID: {quest_id(i)}\n"
+                f"TITLE: Quest {i}\n"
+                f"DESCRIPTION: A generated level {level} quest\n"
+                f"REWARD_XP: {level * rng.randint(40, 60)}\n"
+                f"REWARD_GOLD: {level * rng.randint(15, 35)}\n"
+                f"REQUIRED_LEVEL: {level}\n"
+                f"PREREQUISITE: {prereq}\n\n"
+            )
+    return levels, prereqs
+
+# ============================================================================
+# ITEM CATALOGS
+# ============================================================================
+def item_id(index):
+    return f"item_{index:07d}"
+
+def write_item_catalog(path, count, seed=0):
+    """Write an item catalog covering every type and effect stat"""
+    rng = random.Random(f"items:{seed}")
+    types = list(ITEM_TYPES)
+    with open(path, "w", buffering=1 << 20) as f:
+        for i in range(count):
+            item_type = types[i % len(types)]
+            stat = rng.choice(ITEM_TYPES[item_type])
+            amount = rng.randint(1, 30)
+            f.write(
+                f"ITEM_ID: {item_id(i)}\n"
+                f"NAME: Item {i}\n"
+                f"TYPE: {item_type}\n"
+                f"EFFECT: {stat}:{amount}\n"
+                f"COST: {amount * rng.randint(5, 15)}\n"
+                f"DESCRIPTION: A generated {item_type}\n\n"
+            )
+
+# ============================================================================
+# SAVE GAMES
+# ============================================================================
+def character_name(index):
+    return f"hero_{index:07d}"
+
+def generate_character(index, rng, quest_graph=None, item_count=0):
+    """Build a valid character dict with level-consistent stats"""
+    character = character_manager.create_character(character_name(index), rng.choice(CLASSES))
+    level = rng.randint(1, MAX_LEVEL)
+    gained = level - 1
+    character["level"] = level
+    for stat, per_level in DEFAULT_CURVE.stat_gains.items():
+        character[stat] += per_level * gained
+    character["health"] = rng.randint(1, character["max_health"])
+    character["experience"] = rng.randint(0, DEFAULT_CURVE.xp_to_next(level) - 1)
+    character["gold"] = rng.randint(0, 100 * level)
+    if item_count:
+        size = rng.randint(0, MAX_INVENTORY_SIZE)
+        character["inventory"] = [item_id(rng.randrange(item_count)) for _ in range(size)]
+    if quest_graph is not None and len(quest_graph[0]):
+        levels, prereqs = quest_graph
+        # Completing a quest implies its whole prerequisite chain
+        completed = []
+        current = rng.randrange(len(levels))
+        while current >= 0:
+            if levels[current] <= level:
+                completed.append(quest_id(current))
+            current = prereqs[current]
+        completed.reverse()
+        character["completed_quests"] = completed
+    return character
+
+def write_save_games(directory, count, seed=0, quest_graph=None, item_count=0):
+    """Write `count` save files using character_manager.save_character"""
+    rng = random.Random(f"saves:{seed}")
+    os.makedirs(directory, exist_ok=True)
+    for i in range(count):
+        character = generate_character(i, rng, quest_graph, item_count)
+        character_manager.save_character(character, directory)
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate Quest Chronicles test data")
+    parser.add_argument("--quests", type=int, default=1000, help="number of quests")
+    parser.add_argument("--items", type=int, default=1000, help="number of items")
+    parser.add_argument("--saves", type=int, default=1000, help="number of save files")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="data/generated", help="catalog output directory")
+    parser.add_argument("--save-dir", help="save file directory (default: OUT/save_games)")
+    args = parser.parse_args(argv)
+    save_dir = args.save_dir or os.path.join(args.out, "save_games")
+    os.makedirs(args.out, exist_ok=True)
+    graph = write_quest_catalog(os.path.join(args.out, "quests.txt"), args.quests, args.seed)
+    write_item_catalog(os.path.join(args.out, "items.txt"), args.items, args.seed)
+    write_save_games(save_dir, args.saves, args.seed, graph, args.items)
+    print(f"Wrote {args.quests} quests and {args.items} items to {args.out}, "
+          f"{args.saves} saves to {save_dir}")
+
+if __name__ == "__main__":
+    main()
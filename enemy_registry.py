@@ -0,0 +1,163 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Enemy Registry Module
+
+This module turns the enemy catalog (data/enemies.txt, read with
+game_data.load_enemies) into a registry of prototypes. Each enemy type
+is built once as the dict a battle needs; create() and spawn() hand out
+copies of it, so making an enemy is a single dict copy and the
+prototypes themselves can never be changed by a battle.
+
+Level bands come from MIN_LEVEL / MAX_LEVEL in the catalog: for_level()
+picks the enemy with the highest MIN_LEVEL whose band holds the level.
+
+combat_system.create_enemy and get_random_enemy_for_level use the
+registry installed with combat_system.set_enemy_registry(), which is
+loaded on first use from the data/enemies.txt next to this module (not
+the current directory), or from BUILTIN_ENEMIES if that file does not
+exist.
+"""
+
+import os
+import sys
+import time
+from bisect import bisect_right
+from itertools import repeat
+from types import MappingProxyType
+
+import game_data
+from custom_exceptions import InvalidTargetError
+
+# The shipped catalog, found from this file so any working directory works
+DEFAULT_ENEMY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                  "data", "enemies.txt")
+
+# Used when there is no enemy catalog file (same as data/enemies.txt)
+BUILTIN_ENEMIES = {
+    "goblin": {"enemy_id": "goblin", "name": "Goblin", "health": 50, "strength": 8, "magic": 2,
+               "xp_reward": 25, "gold_reward": 10, "min_level": 1, "max_level": 2},
+    "orc": {"enemy_id": "orc", "name": "Orc", "health": 80, "strength": 12, "magic": 5,
+            "xp_reward": 50, "gold_reward": 25, "min_level": 3, "max_level": 5},
+    "dragon": {"enemy_id": "dragon", "name": "Dragon", "health": 200, "strength": 25,
+               "magic": 15, "xp_reward": 200, "gold_reward": 100, "min_level": 6},
+}
+
+def build_prototype(record):
+    """Enemy dict for a catalog record (health starts full)"""
+    return {
+        "name": record["name"],
+        "health": record["health"],
+        "max_health": record["health"],
+        "strength": record["strength"],
+        "magic": record["magic"],
+        "xp_reward": record["xp_reward"],
+        "gold_reward": record["gold_reward"],
+    }
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+class EnemyRegistry:
+
+    """
+    Enemy prototypes by type, with level bands
+
+    records: {enemy_id: catalog record} as returned by game_data.load_enemies
+    """
+    def __init__(self, records):
+        # Type names are matched case-insensitively, like create_enemy always did
+        self._prototypes = {}
+        self._bands = []
+        for enemy_id, record in records.items():
+            key = enemy_id.lower()
+            self._prototypes[key] = build_prototype(record)
+            self._bands.append((record.get("min_level", 1), record.get("max_level"), key))
+        self._bands.sort(key=lambda band: band[0])
+        self._band_starts = [band[0] for band in self._bands]
+
+    @classmethod
+    def from_file(cls, filename=DEFAULT_ENEMY_FILE):
+        """
+        Registry for an enemy catalog file
+
+        Raises: MissingDataFileError, InvalidDataFormatError (as game_data)
+        """
+        return cls(game_data.load_enemies(filename))
+
+    def __contains__(self, enemy_type):
+        return enemy_type.lower() in self._prototypes
+
+    def __len__(self):
+        return len(self._prototypes)
+
+    def types(self):
+        return list(self._prototypes)
+
+    def _template(self, enemy_type):
+        template = self._prototypes.get(enemy_type.lower())
+        if template is None:
+            raise InvalidTargetError(f"Unknown enemy type: {enemy_type}")
+        return template
+
+    def prototype(self, enemy_type):
+        """Read-only view of an enemy type's prototype"""
+        return MappingProxyType(self._template(enemy_type))
+
+    def create(self, enemy_type):
+        """
+        New enemy of this type
+
+        Raises: InvalidTargetError if enemy_type is not registered
+        """
+        return self._template(enemy_type).copy()
+
+    def spawn(self, enemy_type, count):
+        """List of `count` new enemies of one type"""
+        return list(map(dict.copy, repeat(self._template(enemy_type), count)))
+
+    def for_level(self, character_level):
+        """
+        Enemy type for a character level
+
+        The band with the highest MIN_LEVEL that holds the level wins; a
+        level below every band gets the lowest band's enemy.
+        """
+        if not self._bands:
+            raise InvalidTargetError("No enemies are registered")
+        index = bisect_right(self._band_starts, character_level)
+        for min_level, max_level, key in reversed(self._bands[:index]):
+            if max_level is None or character_level <= max_level:
+                return key
+        return self._bands[max(0, index - 1)][2]
+
+def load_default_registry(filename=DEFAULT_ENEMY_FILE):
+    """Registry from filename, or from BUILTIN_ENEMIES when it is missing"""
+    if os.path.exists(filename):
+        return EnemyRegistry.from_file(filename)
+    return EnemyRegistry(BUILTIN_ENEMIES)
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+def run_benchmark(count=1_000_000):
+    """Compare the old dict-literal create_enemy with registry spawns"""
+    def literal_orc():
+        return {"name": "Orc", "health": 80, "max_health": 80, "strength": 12,
+                "magic": 5, "xp_reward": 50, "gold_reward": 25}
+    registry = load_default_registry()
+    print(f"{count} orcs")
+    start = time.perf_counter()
+    for _ in range(count):
+        literal_orc()
+    print(f"  dict literal per call: {time.perf_counter() - start:.3f}s")
+    start = time.perf_counter()
+    for _ in range(count):
+        registry.create("orc")
+    print(f"  registry.create:       {time.perf_counter() - start:.3f}s")
+    start = time.perf_counter()
+    registry.spawn("orc", count)
+    print(f"  registry.spawn:        {time.perf_counter() - start:.3f}s")
+
+if __name__ == "__main__":
+    print("=== ENEMY REGISTRY BENCHMARK ===")
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
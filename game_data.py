@@ -12,48 +12,126 @@ from custom_exceptions import (
     MissingDataFileError,
     CorruptedDataError
 )
+from record_schema import compile_checker, compile_schema, parse_effect
+
+# ============================================================================
+# RECORD SCHEMAS
+# ============================================================================
+# (file key, record field, converter, required, allowed values)
+QUEST_SCHEMA = [
+    ("QUEST_ID", "quest_id", str, True, None),
+    ("TITLE", "title", str, True, None),
+    ("DESCRIPTION", "description", str, True, None),
+    ("REWARD_XP", "reward_xp", int, True, None),
+    ("REWARD_GOLD", "reward_gold", int, True, None),
+    ("REQUIRED_LEVEL", "required_level", int, True, None),
+    ("PREREQUISITE", "prerequisite", str, True, None),
+]
+ITEM_SCHEMA = [
+    ("ITEM_ID", "item_id", str, True, None),
+    ("NAME", "name", str, True, None),
+    ("TYPE", "type", str, True, ["weapon", "armor", "consumable"]),
+    ("EFFECT", "effect", parse_effect, True, None),
+    ("COST", "cost", int, True, None),
+    ("DESCRIPTION", "description", str, True, None),
+]
+# MAX_LEVEL may be left out for an enemy that fits every level above MIN_LEVEL
+ENEMY_SCHEMA = [
+    ("ENEMY_ID", "enemy_id", str, True, None),
+    ("NAME", "name", str, True, None),
+    ("HEALTH", "health", int, True, None),
+    ("STRENGTH", "strength", int, True, None),
+    ("MAGIC", "magic", int, True, None),
+    ("XP_REWARD", "xp_reward", int, True, None),
+    ("GOLD_REWARD", "gold_reward", int, True, None),
+    ("MIN_LEVEL", "min_level", int, True, None),
+    ("MAX_LEVEL", "max_level", int, False, None),
+]
+# Single-pass parse + validate for one block of lines
+parse_quest_record = compile_schema(QUEST_SCHEMA, "Quest")
+parse_item_record = compile_schema(ITEM_SCHEMA, "Item")
+parse_enemy_record = compile_schema(ENEMY_SCHEMA, "Enemy")
+# Same schemas, but collect every error instead of raising (batch validation)
+check_quest_record = compile_checker(QUEST_SCHEMA, "Quest")
+check_item_record = compile_checker(ITEM_SCHEMA, "Item")
+check_enemy_record = compile_checker(ENEMY_SCHEMA, "Enemy")
 
 # ============================================================================
 # DATA LOADING FUNCTIONS
 # ============================================================================
 def load_quests(filename="data/quests.txt"):
     """Load quests from file and return dictionary"""
-    if not os.path.exists(filename):
-        raise MissingDataFileError("Quest data file not found")
-    try:
-        with open(filename, "r") as f:
-            content = f.read().strip()
-    except Exception as e:
-        raise CorruptedDataError(f"Failed to read quest file: {e}")
-    if content == "":
-        return {}
     quests = {}
-    blocks = content.split("\n\n")
-    for block in blocks:
-        lines = block.strip().split("\n")
-        quest_data = parse_quest_block(lines)
-        validate_quest_data(quest_data)
+    for line_number, quest_data in iter_quests(filename):
         quests[quest_data["quest_id"]] = quest_data
     return quests
 def load_items(filename="data/items.txt"):
     """Load items from file and return dictionary"""
-    if not os.path.exists(filename):
-        raise MissingDataFileError("Item data file not found")
-    try:
-        with open(filename, "r") as f:
-            content = f.read().strip()
-    except Exception as e:
-        raise CorruptedDataError(f"Failed to read item file: {e}")
-    if content == "":
-        return {}
     items = {}
-    blocks = content.split("\n\n")
-    for block in blocks:
-        lines = block.strip().split("\n")
-        item_data = parse_item_block(lines)
-        validate_item_data(item_data)
+    for line_number, item_data in iter_items(filename):
         items[item_data["item_id"]] = item_data
     return items
+def load_enemies(filename="data/enemies.txt"):
+    """Load enemy definitions from file and return dictionary"""
+    enemies = {}
+    for line_number, enemy_data in iter_enemies(filename):
+        enemies[enemy_data["enemy_id"]] = enemy_data
+    return enemies
+
+# ============================================================================
+# STREAMING LOADERS
+# ============================================================================
+def iter_blocks(filename, label):
+    """
+    Yield (line_number, lines) for each blank-line separated block
+
+    Reads the file line by line so only one block is held in memory.
+    line_number is the 1-based line the block starts on.
+    """
+    if not os.path.exists(filename):
+        raise MissingDataFileError(f"{label} data file not found")
+    try:
+        f = open(filename, "r")
+    except Exception as e:
+        raise CorruptedDataError(f"Failed to read {label.lower()} file: {e}")
+    with f:
+        block = []
+        start = 0
+        try:
+            for line_number, line in enumerate(f, 1):
+                line = line.rstrip("\r\n")
+                if line.strip() == "":
+                    if block:
+                        yield start, block
+                        block = []
+                    continue
+                if not block:
+                    start = line_number
+                block.append(line)
+        except UnicodeDecodeError as e:
+            raise CorruptedDataError(f"Failed to read {label.lower()} file: {e}")
+        if block:
+            yield start, block
+
+def _iter_records(filename, parse_record):
+    for line_number, lines in iter_blocks(filename, parse_record.label):
+        try:
+            record = parse_record(lines)
+        except InvalidDataFormatError as e:
+            raise InvalidDataFormatError(f"{e} (line {line_number})")
+        yield line_number, record
+
+def iter_quests(filename="data/quests.txt"):
+    """Yield (line_number, quest) for each validated quest in the file"""
+    return _iter_records(filename, parse_quest_record)
+
+def iter_items(filename="data/items.txt"):
+    """Yield (line_number, item) for each validated item in the file"""
+    return _iter_records(filename, parse_item_record)
+
+def iter_enemies(filename="data/enemies.txt"):
+    """Yield (line_number, enemy) for each validated enemy in the file"""
+    return _iter_records(filename, parse_enemy_record)
 
 # ============================================================================
 # VALIDATION FUNCTIONS
@@ -90,7 +168,7 @@ def validate_item_data(i):
 # DEFAULT DATA CREATION
 # ============================================================================
 def create_default_data_files():
-    """Create default quests and items files if missing"""
+    """Create default quests, items and enemies files if missing"""
     if not os.path.exists("data"):
         os.makedirs("data")
     try:
@@ -117,6 +195,15 @@ def create_default_data_files():
                     "COST: 10\n"
                     "DESCRIPTION: Restores 20 HP.\n\n"
                 )
+        # Default enemies: the same ones enemy_registry falls back to
+        if not os.path.exists("data/enemies.txt"):
+            from enemy_registry import BUILTIN_ENEMIES
+            with open("data/enemies.txt", "w") as f:
+                for record in BUILTIN_ENEMIES.values():
+                    for label, key, _, _, _ in ENEMY_SCHEMA:
+                        if record.get(key) is not None:
+                            f.write(f"{label}: {record[key]}\n")
+                    f.write("\n")
     except Exception as e:
         raise CorruptedDataError(f"Failed to create default files: {e}")
 
@@ -5,6 +5,7 @@ Name: Christopher Early
 AI Usage: AI was used to ensure exceptions, data formats, and functions worked properly.
 """
 
+import character_events
 from custom_exceptions import (
     InventoryFullError,
     ItemNotFoundError,
@@ -12,6 +13,9 @@ from custom_exceptions import (
     InvalidItemTypeError
 )
 MAX_INVENTORY_SIZE = 20
+# Save fields each kind of inventory action can change (see character_events)
+INVENTORY_STAT_FIELDS = ("inventory",) + character_events.STAT_FIELDS
+SHOP_FIELDS = ("gold", "inventory")
 
 # ============================================================================
 # INVENTORY MANAGEMENT
@@ -20,12 +24,14 @@ def add_item_to_inventory(character, item_id):
     if len(character["inventory"]) >= MAX_INVENTORY_SIZE:
         raise InventoryFullError("Inventory is full.")
     character["inventory"].append(item_id)
+    character_events.emit(character, ("inventory",))
     return True
 
 def remove_item_from_inventory(character, item_id):
     if item_id not in character["inventory"]:
         raise ItemNotFoundError(f"Item '{item_id}' not found in inventory.")
     character["inventory"].remove(item_id)
+    character_events.emit(character, ("inventory",))
     return True
 
 def has_item(character, item_id):
@@ -40,6 +46,7 @@ def get_inventory_space_remaining(character):
 def clear_inventory(character):
     removed = list(character["inventory"])
     character["inventory"].clear()
+    character_events.emit(character, ("inventory",))
     return removed
 
 # ============================================================================
@@ -53,6 +60,7 @@ def use_item(character, item_id, item_data):
     stat, value = parse_item_effect(item_data["effect"])
     apply_stat_effect(character, stat, value)
     character["inventory"].remove(item_id)
+    character_events.emit(character, INVENTORY_STAT_FIELDS)
     return f"{character['name']} used {item_id}! {stat} increased by {value}."
 
 def equip_weapon(character, item_id, item_data):
@@ -72,6 +80,7 @@ def equip_weapon(character, item_id, item_data):
     character["equipped_weapon"] = item_id
     character["equipped_weapon_effect"] = item_data["effect"]
     character["inventory"].remove(item_id)
+    character_events.emit(character, INVENTORY_STAT_FIELDS)
     return f"{character['name']} equipped {item_id} (+{value} {stat})."
 
 def equip_armor(character, item_id, item_data):
@@ -91,6 +100,7 @@ def equip_armor(character, item_id, item_data):
     character["equipped_armor"] = item_id
     character["equipped_armor_effect"] = item_data["effect"]
     character["inventory"].remove(item_id)
+    character_events.emit(character, INVENTORY_STAT_FIELDS)
     return f"{character['name']} equipped {item_id} (+{value} {stat})."
 
 def unequip_weapon(character):
@@ -104,6 +114,7 @@ def unequip_weapon(character):
     character["inventory"].append(item_id)
     character["equipped_weapon"] = None
     character["equipped_weapon_effect"] = None
+    character_events.emit(character, INVENTORY_STAT_FIELDS)
     return item_id
 
 def unequip_armor(character):
@@ -117,6 +128,7 @@ def unequip_armor(character):
     character["inventory"].append(item_id)
     character["equipped_armor"] = None
     character["equipped_armor_effect"] = None
+    character_events.emit(character, INVENTORY_STAT_FIELDS)
     return item_id
 
 # ============================================================================
@@ -130,6 +142,7 @@ def purchase_item(character, item_id, item_data):
         raise InventoryFullError("Inventory is full.")
     character["gold"] -= cost
     character["inventory"].append(item_id)
+    character_events.emit(character, SHOP_FIELDS)
     return True
 
 def sell_item(character, item_id, item_data):
@@ -138,6 +151,7 @@ def sell_item(character, item_id, item_data):
     sell_price = item_data["cost"] // 2
     character["inventory"].remove(item_id)
     character["gold"] += sell_price
+    character_events.emit(character, SHOP_FIELDS)
     return sell_price
 
 # ============================================================================
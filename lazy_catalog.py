@@ -0,0 +1,215 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Lazy Catalog Module
+
+This module provides LazyCatalog, a read-only dictionary over a quest or
+item data file that only parses a record the first time it is looked up.
+
+Opening a catalog memory-maps the file and builds an index of
+ID -> (byte offset, length). The index is saved to a sidecar file
+(data/quests.txt.idx) and reused while the data file's size and mtime
+are unchanged, so startup cost depends on the index, not the catalog.
+"""
+
+import marshal
+import mmap
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from collections.abc import Mapping
+
+import game_data
+from catalog_cache import file_signature
+from custom_exceptions import CorruptedDataError, InvalidDataFormatError
+from data_generator import write_quest_catalog
+
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 1
+
+# kind -> (ID key in the file, single-pass record parser)
+CATALOG_KINDS = {
+    "quests": (b"QUEST_ID", game_data.parse_quest_record),
+    "items": (b"ITEM_ID", game_data.parse_item_record),
+}
+
+# One or more blank (or whitespace-only) lines between blocks
+_BLOCK_SEPARATOR = re.compile(rb"\n(?:[ \t\r]*\n)+")
+
+# ============================================================================
+# INDEXING
+# ============================================================================
+def build_index(data, id_key):
+    """
+    Scan raw catalog bytes and return {record_id: (offset, length)}
+
+    Later duplicates replace earlier ones, matching game_data.load_quests.
+    """
+    id_line = re.compile(rb"(?m)^" + re.escape(id_key) + rb": (.*?)\r?$")
+    index = {}
+    pos = 0
+    end = len(data)
+    separators = _BLOCK_SEPARATOR.finditer(data)
+    while pos < end:
+        sep = next(separators, None)
+        block_end = sep.start() if sep else end
+        match = id_line.search(data, pos, block_end)
+        if match is not None:
+            index[match.group(1).decode()] = (pos, block_end - pos)
+        elif data[pos:block_end].strip():
+            line_number = data[:pos].count(b"\n") + 1
+            raise InvalidDataFormatError(f"Missing {id_key.decode()} (line {line_number})")
+        pos = sep.end() if sep else end
+    return index
+
+def default_index_path(filename):
+    return filename + INDEX_SUFFIX
+
+def load_index(filename, kind, index_filename=None):
+    """Return the sidecar index if it matches the data file, else None"""
+    index_filename = index_filename or default_index_path(filename)
+    try:
+        with open(index_filename, "rb") as f:
+            version, saved_kind, signature, index = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if version != INDEX_VERSION or saved_kind != kind:
+        return None
+    if tuple(signature) != file_signature(filename):
+        return None
+    return index
+
+def save_index(filename, kind, signature, index, index_filename=None):
+    """Write the sidecar index; failures are ignored since it is only a cache"""
+    index_filename = index_filename or default_index_path(filename)
+    try:
+        with open(index_filename, "wb") as f:
+            f.write(marshal.dumps((INDEX_VERSION, kind, signature, index)))
+    except OSError:
+        pass
+
+# ============================================================================
+# LAZY CATALOG
+# ============================================================================
+class LazyCatalog(Mapping):
+
+    """
+    Read-only dict of record_id -> record backed by an mmapped data file
+
+    Supports everything quest_handler and inventory_system do with the
+    loaded dictionaries: lookups, `in`, len(), keys(), values() and items().
+    Iterating values()/items() parses every record, so prefer lookups.
+    """
+    def __init__(self, filename, kind, index_filename=None, use_sidecar=True):
+        if kind not in CATALOG_KINDS:
+            raise ValueError(f"Unknown catalog kind: {kind}")
+        self.filename = filename
+        self.kind = kind
+        self._id_key, self._parse_record = CATALOG_KINDS[kind]
+        self._records = {}
+        self._file = None
+        self._data = b""
+        # Take the signature before mapping so a concurrent edit is not cached as fresh
+        signature = file_signature(filename)
+        try:
+            self._file = open(filename, "rb")
+            if signature[0] > 0:
+                self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            self.close()
+            raise CorruptedDataError(f"Failed to map {kind} file: {e}")
+        index = load_index(filename, kind, index_filename) if use_sidecar else None
+        if index is None:
+            index = build_index(self._data, self._id_key)
+            if use_sidecar:
+                save_index(filename, kind, signature, index, index_filename)
+        self._index = index
+
+    def __getitem__(self, record_id):
+        record = self._records.get(record_id)
+        if record is not None:
+            return record
+        offset, length = self._index[record_id]
+        raw = self._data[offset:offset + length]
+        try:
+            lines = raw.decode().splitlines()
+            record = self._parse_record(lines)
+        except UnicodeDecodeError as e:
+            raise CorruptedDataError(f"Failed to decode {self.kind} record '{record_id}': {e}")
+        except InvalidDataFormatError as e:
+            line_number = self._data[:offset].count(b"\n") + 1
+            raise InvalidDataFormatError(f"{e} (line {line_number})")
+        self._records[record_id] = record
+        return record
+
+    def __contains__(self, record_id):
+        return record_id in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def parsed_count(self):
+        """Return how many records have been parsed so far"""
+        return len(self._records)
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = b""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def open_quests(filename="data/quests.txt"):
+    """Open the quest catalog lazily"""
+    return LazyCatalog(filename, "quests")
+
+def open_items(filename="data/items.txt"):
+    """Open the item catalog lazily"""
+    return LazyCatalog(filename, "items")
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+def run_benchmark(sizes=(10_000, 100_000, 1_000_000), lookups=50):
+    """Compare eager loading with lazy startup plus a few dozen lookups"""
+    print(f"{'records':>10} {'eager load':>11} {'index build':>12} "
+          f"{'sidecar open':>13} {f'{lookups} lookups':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in sizes:
+            path = os.path.join(tmp, f"quests_{count}.txt")
+            write_quest_catalog(path, count)
+            start = time.perf_counter()
+            game_data.load_quests(path)
+            eager = time.perf_counter() - start
+            start = time.perf_counter()
+            LazyCatalog(path, "quests").close()
+            cold = time.perf_counter() - start
+            start = time.perf_counter()
+            catalog = LazyCatalog(path, "quests")
+            warm = time.perf_counter() - start
+            wanted = random.sample(list(catalog), min(lookups, count))
+            start = time.perf_counter()
+            for quest_id in wanted:
+                catalog[quest_id]
+            lookup = time.perf_counter() - start
+            catalog.close()
+            print(f"{count:>10} {eager:>10.3f}s {cold:>11.3f}s {warm:>12.3f}s {lookup:>11.4f}s")
+
+if __name__ == "__main__":
+    print("=== LAZY CATALOG BENCHMARK ===")
+    if len(sys.argv) > 1:
+        run_benchmark([int(arg) for arg in sys.argv[1:]])
+    else:
+        run_benchmark()
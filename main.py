@@ -10,6 +10,9 @@ import inventory_system
 import quest_handler
 import combat_system
 import game_data
+import catalog_reload
+import save_queue
+import character_loader
 from custom_exceptions import *
 
 # ============================================================================
@@ -20,6 +23,13 @@ current_character = None
 all_quests = {}
 all_items = {}
 game_running = False
+data_watchers = []
+# Background saver; None means save_game writes immediately
+saver = None
+# Background loader that prefetches likely saves in load_game
+loader = None
+# Characters played this session, most recent first (prefetch candidates)
+recent_characters = []
 
 # ============================================================================
 # MAIN MENU
@@ -54,10 +64,14 @@ def new_game():
 def load_game():
     global current_character
     print("\n=== LOAD GAME ===")
+    flush_saves()
     saved_names = character_manager.list_saved_characters()
     if not saved_names:
         print("No saved characters available.")
         return
+    if loader is not None:
+        listed = set(saved_names)
+        loader.prefetch([name for name in recent_characters if name in listed])
     for i, name in enumerate(saved_names):
         print(f"{i+1}. {name}")
     choice = input("Select a character number: ")
@@ -65,7 +79,11 @@ def load_game():
         print("Invalid selection.")
         return
     try:
-        current_character = character_manager.load_character(saved_names[int(choice)-1])
+        name = saved_names[int(choice)-1]
+        if loader is not None:
+            current_character = loader.load(name)
+        else:
+            current_character = character_manager.load_character(name)
         print(f"\nLoaded character '{current_character['name']}' successfully!")
         game_loop()
     except (CharacterNotFoundError, SaveFileCorruptedError) as e:
@@ -77,8 +95,13 @@ def load_game():
 def game_loop():
     global game_running
     game_running = True
+    name = current_character["name"]
+    if name in recent_characters:
+        recent_characters.remove(name)
+    recent_characters.insert(0, name)
     print("\n=== ENTERING GAME ===")
     while game_running:
+        check_for_data_updates()
         choice = game_menu()
         if choice == 1:
             view_character_stats()
@@ -246,7 +269,19 @@ def shop():
 # ============================================================================
 def save_game():
     try:
-        character_manager.save_character(current_character)
+        if saver is not None:
+            saver.enqueue(current_character)
+        else:
+            character_manager.save_character(current_character)
+    except Exception as e:
+        print(f"Error saving game: {e}")
+
+def flush_saves():
+    """Write any queued saves before reading saves back or exiting"""
+    if saver is None:
+        return
+    try:
+        saver.flush()
     except Exception as e:
         print(f"Error saving game: {e}")
 
@@ -262,6 +297,34 @@ def load_game_data():
         all_items = game_data.load_items()
     except InvalidDataFormatError as e:
         print(f"Data error: {e}")
+        return
+    start_data_watchers()
+
+def start_data_watchers():
+    """Watch the data files so edits are picked up without a restart"""
+    global data_watchers
+    try:
+        data_watchers = [
+            catalog_reload.CatalogWatcher("data/quests.txt", "quests", all_quests),
+            catalog_reload.CatalogWatcher("data/items.txt", "items", all_items),
+        ]
+    except DataError as e:
+        print(f"Data reload disabled: {e}")
+        data_watchers = []
+
+def check_for_data_updates():
+    """Apply any edits made to the data files since the last check"""
+    for watcher in data_watchers:
+        try:
+            report = watcher.poll()
+        except DataError as e:
+            print(f"Data reload error: {e}")
+            continue
+        if report is None:
+            continue
+        for change in ("added", "changed", "removed"):
+            if report[change]:
+                print(f"Reloaded {watcher.kind}: {change} {', '.join(report[change])}")
 
 def handle_character_death():
     global game_running
@@ -289,6 +352,7 @@ def display_welcome():
 # MAIN EXECUTION
 # ============================================================================
 def main():
+    global saver, loader
     display_welcome()
     try:
         load_game_data()
@@ -296,14 +360,24 @@ def main():
     except Exception as e:
         print(f"Fatal error loading game: {e}")
         return
-    while True:
-        choice = main_menu()
-        if choice == 1:
-            new_game()
-        elif choice == 2:
-            load_game()
-        elif choice == 3:
-            print("\nThanks for playing Quest Chronicles!")
-            break
+    saver = save_queue.SaveQueue().start()
+    loader = character_loader.CharacterLoader(workers=4)
+    try:
+        while True:
+            choice = main_menu()
+            if choice == 1:
+                new_game()
+            elif choice == 2:
+                load_game()
+            elif choice == 3:
+                print("\nThanks for playing Quest Chronicles!")
+                break
+    finally:
+        # Also on an error or Ctrl-C, so queued saves are not lost
+        loader.close()
+        try:
+            saver.close()
+        except Exception as e:
+            print(f"Error saving game: {e}")
 if __name__ == "__main__":
     main()
@@ -0,0 +1,167 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Progression Module
+
+This module turns an XP grant into a final level in one step. A curve
+knows the cumulative XP needed to reach every level, so the level after
+a grant is found directly (a closed form for linear curves, a bisect over
+a precomputed table for any other curve) and the stat gains for all the
+levels crossed are applied at once.
+
+The default curve is the original rule: reaching level L+1 from level L
+costs L * 100 XP, and every level adds 10 max health, 2 strength and
+2 magic and fully heals the character.
+"""
+
+import math
+import random
+import sys
+import time
+from bisect import bisect_right
+
+LEVEL_UP_GAINS = {"max_health": 10, "strength": 2, "magic": 2}
+
+# ============================================================================
+# CURVES
+# ============================================================================
+class XPCurve:
+
+    """
+    Progression curve built from a per-level cost function
+
+    xp_to_next(level) is the XP needed to go from `level` to `level + 1`.
+    Cumulative thresholds are precomputed and extended on demand, so any
+    level can be looked up with one bisect.
+    """
+    def __init__(self, xp_to_next, stat_gains=None, levels=100):
+        self.xp_to_next = xp_to_next
+        self.stat_gains = dict(LEVEL_UP_GAINS if stat_gains is None else stat_gains)
+        # _table[L] = total XP needed to reach level L from level 1 (index 0 unused)
+        self._table = [0, 0]
+        self._extend(levels)
+
+    def _extend(self, level):
+        table = self._table
+        while len(table) <= level:
+            last = len(table) - 1
+            table.append(table[-1] + self.xp_to_next(last))
+
+    def threshold(self, level):
+        """Total XP needed to reach `level` from level 1"""
+        self._extend(level)
+        return self._table[level]
+
+    def thresholds(self, level):
+        """Threshold list covering at least levels 1..level (index 0 unused)"""
+        self._extend(level)
+        return self._table
+
+    def level_for(self, total):
+        """Highest level whose threshold is at most `total` XP"""
+        table = self._table
+        while table[-1] <= total:
+            self._extend(2 * len(table))
+        return max(1, bisect_right(table, total) - 1)
+
+class LinearCurve(XPCurve):
+
+    """Curve where level L costs step * L XP; thresholds have a closed form"""
+    def __init__(self, step=100, stat_gains=None):
+        super().__init__(lambda level: step * level, stat_gains, levels=1)
+        self.step = step
+
+    def threshold(self, level):
+        # step * (1 + 2 + ... + (level - 1))
+        return self.step * level * (level - 1) // 2
+
+    def level_for(self, total):
+        if total <= 0:
+            return 1
+        # Largest L with L * (L - 1) <= 2 * total / step
+        limit = 2 * total // self.step
+        return (1 + math.isqrt(1 + 4 * limit)) // 2
+
+DEFAULT_CURVE = LinearCurve(100)
+
+# ============================================================================
+# APPLYING XP
+# ============================================================================
+def apply_experience(character, xp_amount, curve=None):
+    """
+    Add XP to a character and apply every level-up it earns in one step
+
+    Returns: the character's new level
+    """
+    curve = curve or DEFAULT_CURVE
+    level = character["level"]
+    total = curve.threshold(level) + character["experience"] + xp_amount
+    new_level = curve.level_for(total)
+    if new_level <= level:
+        character["experience"] += xp_amount
+        return level
+    gained = new_level - level
+    for stat, per_level in curve.stat_gains.items():
+        character[stat] += per_level * gained
+    character["level"] = new_level
+    character["experience"] = total - curve.threshold(new_level)
+    character["health"] = character["max_health"]
+    return new_level
+
+def apply_experience_bulk(characters, xp_amount, curve=None):
+    """Grant the same XP to many characters; returns their new levels"""
+    curve = curve or DEFAULT_CURVE
+    return [apply_experience(character, xp_amount, curve) for character in characters]
+
+def step_experience(character, xp_amount, curve=None):
+    """
+    Reference implementation: level up one step at a time
+
+    This is how gain_experience used to work; it is kept for checking
+    apply_experience and for the benchmark.
+    """
+    curve = curve or DEFAULT_CURVE
+    character["experience"] += xp_amount
+    while character["experience"] >= curve.xp_to_next(character["level"]):
+        character["experience"] -= curve.xp_to_next(character["level"])
+        character["level"] += 1
+        for stat, per_level in curve.stat_gains.items():
+            character[stat] += per_level
+        character["health"] = character["max_health"]
+    return character["level"]
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+def _fresh_character():
+    return {"level": 1, "experience": 0, "health": 100, "max_health": 100,
+            "strength": 10, "magic": 10}
+
+def run_benchmark(bulk=100_000):
+    """Time single large grants and bulk grants, stepwise vs closed form"""
+    print(f"{'grant':>14} {'levels':>7} {'stepwise':>10} {'closed form':>12}")
+    for xp in (10_000, 1_000_000, 100_000_000):
+        timings = []
+        for grant in (step_experience, apply_experience):
+            character = _fresh_character()
+            start = time.perf_counter()
+            level = grant(character, xp)
+            timings.append(time.perf_counter() - start)
+        print(f"{xp:>14} {level:>7} {timings[0] * 1e6:>8.1f}us {timings[1] * 1e6:>10.1f}us")
+    rng = random.Random(0)
+    grants = [rng.randint(0, 500_000) for _ in range(bulk)]
+    timings = []
+    for grant in (step_experience, apply_experience):
+        characters = [_fresh_character() for _ in range(bulk)]
+        start = time.perf_counter()
+        for character, xp in zip(characters, grants):
+            grant(character, xp)
+        timings.append(time.perf_counter() - start)
+    print(f"bulk: {bulk} characters, up to 500000 XP each: "
+          f"stepwise {timings[0]:.3f}s, closed form {timings[1]:.3f}s")
+
+if __name__ == "__main__":
+    print("=== PROGRESSION BENCHMARK ===")
+    if len(sys.argv) > 1:
+        run_benchmark(int(sys.argv[1]))
+    else:
+        run_benchmark()
@@ -14,6 +14,7 @@ from custom_exceptions import (
 )
 
 import character_manager  # Needed for XP and gold rewards
+import character_events
 # ============================================================================
 # QUEST MANAGEMENT
 # ============================================================================
@@ -37,6 +38,7 @@ def accept_quest(character, quest_id, quest_data_dict):
     if quest_id in character["active_quests"]:
         raise QuestRequirementsNotMetError("Quest already active.")
     character["active_quests"].append(quest_id)
+    character_events.emit(character, ("active_quests",))
     return True
 
 def complete_quest(character, quest_id, quest_data_dict):
@@ -49,6 +51,7 @@ def complete_quest(character, quest_id, quest_data_dict):
     # Remove from active and add to completed
     character["active_quests"].remove(quest_id)
     character["completed_quests"].append(quest_id)
+    character_events.emit(character, character_events.QUEST_FIELDS)
     # Rewards
     xp = quest["reward_xp"]
     gold = quest["reward_gold"]
@@ -65,6 +68,7 @@ def abandon_quest(character, quest_id):
     if quest_id not in character["active_quests"]:
         raise QuestNotActiveError("Quest not active; cannot abandon.")
     character["active_quests"].remove(quest_id)
+    character_events.emit(character, ("active_quests",))
     return True
 
 def get_active_quests(character, quest_data_dict):
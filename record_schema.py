@@ -0,0 +1,174 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Record Schema Module
+
+This module turns a declarative field schema into a parser for the
+"KEY: value" blocks used by the data files.
+
+A schema is a list of field tuples:
+    (file key, record field, converter, required, allowed values)
+The compiled parser does one pass over a block, looking each key up in a
+dispatch table, converting and checking it, and then checks that every
+required field was present. The result is already validated.
+"""
+
+import sys
+import time
+
+from custom_exceptions import InvalidDataFormatError
+
+# ============================================================================
+# CONVERTERS
+# ============================================================================
+def parse_effect(value):
+    """Convert 'stat:amount' into {'stat': amount}"""
+    stat, amount = value.split(":")
+    return {stat: int(amount)}
+
+# ============================================================================
+# SCHEMA COMPILER
+# ============================================================================
+def _build_table(schema):
+    """Return (key -> (field, converter, allowed), required fields in order)"""
+    table = {}
+    required = []
+    for key, name, convert, is_required, allowed in schema:
+        if key in table:
+            raise ValueError(f"Duplicate schema key: {key}")
+        if allowed is not None:
+            allowed = frozenset(allowed)
+        # str needs no conversion, so skip the call entirely
+        table[key] = (name, None if convert is str else convert, allowed)
+        if is_required:
+            required.append(name)
+    return table, required
+
+def compile_schema(schema, label):
+    """
+    Build a single-pass parser/validator for one record type
+
+    label is used in error messages, e.g. "Quest" -> "Missing quest field: title"
+    Returns: function(lines) -> record dictionary
+    Raises (from the parser): InvalidDataFormatError
+    """
+    table, required = _build_table(schema)
+    required_set = frozenset(required)
+    lower = label.lower()
+
+    def parse(lines):
+        record = {}
+        for line in lines:
+            key, sep, value = line.partition(": ")
+            if not sep:
+                raise InvalidDataFormatError(f"{label} line missing ':' separator")
+            entry = table.get(key)
+            if entry is None:
+                raise InvalidDataFormatError(f"Unknown {lower} field: {key}")
+            name, convert, allowed = entry
+            if convert is not None:
+                try:
+                    value = convert(value)
+                except ValueError:
+                    raise InvalidDataFormatError(f"{label} contained non-numeric data")
+            if allowed is not None and value not in allowed:
+                raise InvalidDataFormatError(f"Invalid {lower} {name.replace('_', ' ')}")
+            record[name] = value
+        if not record.keys() >= required_set:
+            for name in required:
+                if name not in record:
+                    raise InvalidDataFormatError(f"Missing {lower} field: {name}")
+        return record
+
+    parse.schema = schema
+    parse.label = label
+    return parse
+
+def compile_checker(schema, label):
+    """
+    Build a checker that reports every problem in a block instead of
+    stopping at the first one
+
+    Returns: function(lines) -> (record, errors) where errors is a list of
+             (line offset in block or None, field or None, reason)
+    """
+    table, required = _build_table(schema)
+    lower = label.lower()
+
+    def check(lines):
+        record = {}
+        errors = []
+        for offset, line in enumerate(lines):
+            key, sep, value = line.partition(": ")
+            if not sep:
+                errors.append((offset, None, f"{label} line missing ':' separator"))
+                continue
+            entry = table.get(key)
+            if entry is None:
+                errors.append((offset, key, f"Unknown {lower} field: {key}"))
+                continue
+            name, convert, allowed = entry
+            if convert is not None:
+                try:
+                    value = convert(value)
+                except ValueError:
+                    errors.append((offset, name, f"Invalid value for {name}: {value!r}"))
+                    continue
+            if allowed is not None and value not in allowed:
+                choices = ", ".join(sorted(allowed))
+                errors.append((offset, name, f"{name} must be one of {choices}, got {value!r}"))
+                continue
+            record[name] = value
+        for name in required:
+            if name not in record and not any(field == name for _, field, _ in errors):
+                errors.append((None, name, f"Missing {lower} field: {name}"))
+        return record, errors
+
+    check.schema = schema
+    check.label = label
+    return check
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+def run_benchmark(count=100_000):
+    """Compare the hand-written parse+validate functions with the compiled parsers"""
+    import game_data
+
+    quest_lines = [
+        "QUEST_ID: goblin_hunter",
+        "TITLE: Goblin Hunter",
+        "DESCRIPTION: Defeat 3 goblins to protect the townsfolk.",
+        "REWARD_XP: 100",
+        "REWARD_GOLD: 75",
+        "REQUIRED_LEVEL: 2",
+        "PREREQUISITE: first_steps",
+    ]
+    item_lines = [
+        "ITEM_ID: iron_sword",
+        "NAME: Iron Sword",
+        "TYPE: weapon",
+        "EFFECT: strength:5",
+        "COST: 100",
+        "DESCRIPTION: A sturdy iron sword that increases strength",
+    ]
+    cases = [
+        ("quest", quest_lines, game_data.parse_quest_block,
+         game_data.validate_quest_data, game_data.parse_quest_record),
+        ("item", item_lines, game_data.parse_item_block,
+         game_data.validate_item_data, game_data.parse_item_record),
+    ]
+    print(f"{'record':>7} {'if/elif + validate':>19} {'compiled':>9} {'speedup':>8}")
+    for name, lines, parse_block, validate, compiled in cases:
+        start = time.perf_counter()
+        for _ in range(count):
+            validate(parse_block(lines))
+        old = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(count):
+            compiled(lines)
+        new = time.perf_counter() - start
+        print(f"{name:>7} {old:>18.3f}s {new:>8.3f}s {old / new:>7.2f}x")
+
+if __name__ == "__main__":
+    print("=== RECORD SCHEMA BENCHMARK ===")
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
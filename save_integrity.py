@@ -0,0 +1,129 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Save Integrity Module
+
+This module checks a whole save directory without parsing any save.
+Each file's header (see character_manager.frame_save) gives the body
+length and CRC32, so checking a file is one read and one checksum.
+Files are checked in chunks on a thread pool (or a process pool), and
+corrupt files can be moved to a quarantine directory so the game no
+longer sees them.
+
+Saves written before the header existed are counted as "unchecked"
+and left alone.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import character_manager
+import save_layout
+from custom_exceptions import SaveFileCorruptedError
+
+QUARANTINE_DIRECTORY = "quarantine"
+
+# ============================================================================
+# FILE CHECKS
+# ============================================================================
+def check_save_file(path):
+    """
+    Check one save file without parsing it
+
+    Returns: "ok", "unchecked" (no header) or "corrupt: <reason>"
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        return f"corrupt: could not be read ({e.strerror})"
+    if not data.startswith(character_manager.SAVE_HEADER_PREFIX):
+        return "unchecked"
+    try:
+        character_manager.check_save_bytes(data)
+    except SaveFileCorruptedError as e:
+        return f"corrupt: {e}"
+    return "ok"
+
+def _check_chunk(paths):
+    """Pool entry point: [(path, status)] for a list of paths"""
+    return [(path, check_save_file(path)) for path in paths]
+
+# ============================================================================
+# DIRECTORY SCAN
+# ============================================================================
+def verify_saves(directory="data/save_games", workers=None, processes=False,
+                 quarantine=True, chunk_size=256):
+    """
+    Check every save file in directory
+
+    workers: pool size (None = a small multiple of the CPU count)
+    processes: check on a process pool instead of threads
+    quarantine: move corrupt files into directory/quarantine
+    Returns: {'checked': int, 'ok': int, 'unchecked': int,
+              'corrupt': {name: reason}, 'quarantined': [new paths]}
+    """
+    paths = list(save_layout.iter_save_paths(directory))
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    if processes:
+        executor = ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers or min(32, (os.cpu_count() or 1) + 4))
+    report = {"checked": len(paths), "ok": 0, "unchecked": 0, "corrupt": {}, "quarantined": []}
+    with executor:
+        for results in executor.map(_check_chunk, chunks):
+            for path, status in results:
+                if status == "ok" or status == "unchecked":
+                    report[status] += 1
+                    continue
+                name = os.path.basename(path)[:-len("_save.txt")]
+                report["corrupt"][name] = status[len("corrupt: "):]
+                if quarantine:
+                    report["quarantined"].append(quarantine_save(path, directory))
+    return report
+
+def quarantine_save(path, directory="data/save_games"):
+    """Move a save file into directory/quarantine; returns its new path"""
+    target_directory = os.path.join(directory, QUARANTINE_DIRECTORY)
+    os.makedirs(target_directory, exist_ok=True)
+    target = os.path.join(target_directory, os.path.basename(path))
+    os.replace(path, target)
+    return target
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+def run_benchmark(count=20_000):
+    """Time a full scan against loading every save"""
+    from data_generator import write_save_games
+    with tempfile.TemporaryDirectory() as tmp:
+        write_save_games(tmp, count)
+        names = character_manager.list_saved_characters(tmp)
+        start = time.perf_counter()
+        for name in names:
+            character_manager.load_character(name, tmp)
+        load_time = time.perf_counter() - start
+        print(f"{count} saves, {os.cpu_count()} CPUs")
+        print(f"{'load every save':>18} {load_time:7.3f}s {count / load_time:9.0f} files/s")
+        for label, kwargs in (("verify, 1 thread", {"workers": 1}),
+                              ("verify, threads", {}),
+                              ("verify, processes", {"processes": True})):
+            start = time.perf_counter()
+            report = verify_saves(tmp, quarantine=False, **kwargs)
+            elapsed = time.perf_counter() - start
+            assert report["ok"] == count
+            print(f"{label:>18} {elapsed:7.3f}s {count / elapsed:9.0f} files/s")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--benchmark":
+        run_benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 20_000)
+        sys.exit(0)
+    target = sys.argv[1] if len(sys.argv) > 1 else "data/save_games"
+    found = verify_saves(target)
+    for name, reason in sorted(found["corrupt"].items()):
+        print(f"{name}: {reason}")
+    print(f"{found['checked']} checked, {found['ok']} ok, {found['unchecked']} without "
+          f"checksum, {len(found['corrupt'])} corrupt, {len(found['quarantined'])} quarantined")
+    sys.exit(1 if found["corrupt"] else 0)
@@ -0,0 +1,241 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Save Layout Module
+
+This module decides where a text save file lives. A save directory uses
+one of two layouts:
+
+    flat:    save_games/NAME_save.txt                (the original layout)
+    sharded: save_games/ab/cd/NAME_save.txt          (ab/cd from a hash of NAME)
+
+A directory is sharded once it holds a ".sharded" marker file, written
+by enable_sharding() or migrate_to_sharded(). Saves are then written to
+their shard, so no directory holds more than a few dozen files even with
+millions of saves. Reads try the shard first and fall back to the flat
+file, so saves that have not been migrated yet still load.
+
+Listing walks the tree with os.scandir and streams names instead of
+building one huge os.listdir result; list_saves_page() returns a page of
+names and a cursor for the next page.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from hashlib import blake2b
+
+SHARD_MARKER = ".sharded"
+SAVE_SUFFIX = "_save.txt"
+_HEX_DIGITS = frozenset("0123456789abcdef")
+
+# Absolute paths of directories known to be sharded. Sharding is never
+# turned off, so only True is cached; an unsharded directory checks for
+# the marker again each time, which sees a migration by another process.
+_sharded_cache = set()
+
+# ============================================================================
+# PATHS
+# ============================================================================
+def shard_for(name):
+    """Two-level shard of a character name, such as "3f/a0" """
+    digest = blake2b(name.encode("utf-8"), digest_size=2).hexdigest()
+    return f"{digest[:2]}/{digest[2:]}"
+
+def is_sharded(directory):
+    key = os.path.abspath(directory)
+    if key in _sharded_cache:
+        return True
+    if os.path.exists(os.path.join(directory, SHARD_MARKER)):
+        _sharded_cache.add(key)
+        return True
+    return False
+
+def enable_sharding(directory):
+    """Write new saves in directory to the sharded layout from now on"""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, SHARD_MARKER), "w") as f:
+        f.write("2\n")
+    _sharded_cache.add(os.path.abspath(directory))
+
+def flat_path(name, directory):
+    return os.path.join(directory, name + SAVE_SUFFIX)
+
+def sharded_path(name, directory):
+    return os.path.join(directory, *shard_for(name).split("/"), name + SAVE_SUFFIX)
+
+def save_path(name, directory):
+    """Path a save is written to"""
+    if is_sharded(directory):
+        return sharded_path(name, directory)
+    return flat_path(name, directory)
+
+def read_paths(name, directory):
+    """Paths a save may be read from, in lookup order"""
+    if is_sharded(directory):
+        return (sharded_path(name, directory), flat_path(name, directory))
+    return (flat_path(name, directory),)
+
+def existing_save_path(name, directory):
+    """First path in read_paths that exists, or None"""
+    for path in read_paths(name, directory):
+        if os.path.exists(path):
+            return path
+    return None
+
+# ============================================================================
+# LISTING
+# ============================================================================
+def _is_shard_name(name):
+    return len(name) == 2 and _HEX_DIGITS.issuperset(name)
+
+def _scan(directory):
+    """(save file entries, shard subdirectory names) directly in directory"""
+    files = []
+    shards = []
+    try:
+        entries = os.scandir(directory)
+    except FileNotFoundError:
+        return files, shards
+    with entries:
+        for entry in entries:
+            if entry.name.endswith(SAVE_SUFFIX):
+                if entry.is_file():
+                    files.append(entry)
+            elif _is_shard_name(entry.name) and entry.is_dir():
+                shards.append(entry.name)
+    return files, shards
+
+def iter_save_paths(directory):
+    """Yield the path of every save file, flat ones first, in no set order"""
+    files, shards = _scan(directory)
+    for entry in files:
+        yield entry.path
+    for first in shards:
+        for second in _scan(os.path.join(directory, first))[1]:
+            for entry in _scan(os.path.join(directory, first, second))[0]:
+                yield entry.path
+
+def iter_save_names(directory):
+    """Yield every saved character name without building a full listing"""
+    for path in iter_save_paths(directory):
+        yield os.path.basename(path)[:-len(SAVE_SUFFIX)]
+
+def _sorted_names(entries):
+    return sorted(entry.name[:-len(SAVE_SUFFIX)] for entry in entries)
+
+def iter_save_entries(directory, after=None):
+    """
+    Yield (cursor, name) for every save in a fixed order
+
+    Flat saves come first, sorted by name, then each shard in order. With
+    `after`, start just past that cursor; only the shards from the
+    cursor's shard onwards are scanned.
+    """
+    after_shard, after_name = "", None
+    if after:
+        after_shard, _, after_name = after.rpartition("/")
+    files, shards = _scan(directory)
+    if not after_shard:
+        for name in _sorted_names(files):
+            if after_name is None or name > after_name:
+                yield name, name
+    for first in sorted(shards):
+        if first < after_shard[:2]:
+            continue
+        for second in sorted(_scan(os.path.join(directory, first))[1]):
+            shard = f"{first}/{second}"
+            if shard < after_shard:
+                continue
+            names = _sorted_names(_scan(os.path.join(directory, first, second))[0])
+            for name in names:
+                if shard == after_shard and name <= after_name:
+                    continue
+                yield f"{shard}/{name}", name
+
+def list_saves_page(directory, limit=1000, after=None):
+    """
+    Return (names, cursor) for up to `limit` saves after `after`
+
+    Pass the returned cursor back to get the next page; it is None once
+    every save has been listed.
+    """
+    names = []
+    cursor = None
+    for cursor, name in iter_save_entries(directory, after):
+        names.append(name)
+        if len(names) == limit:
+            return names, cursor
+    return names, None
+
+# ============================================================================
+# MIGRATION
+# ============================================================================
+def migrate_to_sharded(directory):
+    """
+    Move every flat save in directory into its shard
+
+    Safe to run again after an interruption. When a save exists in both
+    places, the more recently written copy is kept. Returns how many
+    files moved.
+    """
+    enable_sharding(directory)
+    moved = 0
+    made = set()
+    for entry in _scan(directory)[0]:
+        name = entry.name[:-len(SAVE_SUFFIX)]
+        target = sharded_path(name, directory)
+        parent = os.path.dirname(target)
+        if parent not in made:
+            os.makedirs(parent, exist_ok=True)
+            made.add(parent)
+        try:
+            shard_mtime = os.stat(target).st_mtime_ns
+        except FileNotFoundError:
+            shard_mtime = None
+        if shard_mtime is not None and shard_mtime >= entry.stat().st_mtime_ns:
+            # A newer save was already written to the shard
+            os.remove(entry.path)
+        else:
+            os.replace(entry.path, target)
+            moved += 1
+    return moved
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+def run_benchmark(count=50_000):
+    """Compare listing a flat directory with listing the sharded layout"""
+    with tempfile.TemporaryDirectory() as tmp:
+        flat = os.path.join(tmp, "flat")
+        os.makedirs(flat)
+        for i in range(count):
+            open(flat_path(f"hero_{i:07d}", flat), "w").close()
+        start = time.perf_counter()
+        listed = [f[:-len(SAVE_SUFFIX)] for f in os.listdir(flat) if f.endswith(SAVE_SUFFIX)]
+        listdir_time = time.perf_counter() - start
+        start = time.perf_counter()
+        moved = migrate_to_sharded(flat)
+        migrate_time = time.perf_counter() - start
+        start = time.perf_counter()
+        streamed = sum(1 for _ in iter_save_names(flat))
+        stream_time = time.perf_counter() - start
+        start = time.perf_counter()
+        first_page = list_saves_page(flat, 100)[0]
+        page_time = time.perf_counter() - start
+        assert len(listed) == moved == streamed == count and len(first_page) == 100
+    print(f"{count} saves")
+    print(f"  flat listdir:        {listdir_time:.3f}s")
+    print(f"  migrate to sharded:  {migrate_time:.3f}s")
+    print(f"  sharded full stream: {stream_time:.3f}s")
+    print(f"  sharded first page:  {page_time * 1000:.1f}ms")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--benchmark":
+        run_benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 50_000)
+        sys.exit(0)
+    if len(sys.argv) < 3 or sys.argv[1] != "migrate":
+        print("Usage: python save_layout.py migrate SAVE_DIRECTORY")
+        print("       python save_layout.py --benchmark [COUNT]")
+        sys.exit(2)
+    print(f"Moved {migrate_to_sharded(sys.argv[2])} saves into shards in {sys.argv[2]}")
@@ -0,0 +1,220 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Save Queue Module
+
+This module moves character saves off the game loop. SaveQueue.enqueue()
+only copies the character into a pending table; a background thread
+writes the pending saves in batches.
+
+If the same character is enqueued several times before a flush, only the
+latest copy is written. Pending saves are flushed when `batch_size`
+characters are waiting, every `interval` seconds, on flush(), and on
+close(). A save that fails in the background is raised from the next
+enqueue(), flush() or close() call; when several failed, the first is
+raised and the others are printed.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import character_manager
+
+LIST_FIELDS = ("inventory", "active_quests", "completed_quests")
+
+def snapshot_character(character):
+    """Copy a character so later changes do not leak into a queued save"""
+    snapshot = dict(character)
+    for field in LIST_FIELDS:
+        if field in snapshot:
+            snapshot[field] = list(snapshot[field])
+    return snapshot
+
+# ============================================================================
+# SAVE QUEUE
+# ============================================================================
+class SaveQueue:
+
+    """
+    Write-behind queue for character saves
+
+    store: any save store (see save_store.py); None writes through
+           character_manager.save_character(character, save_directory)
+    """
+    def __init__(self, store=None, save_directory="data/save_games",
+                 batch_size=32, interval=2.0):
+        self.store = store
+        self.save_directory = save_directory
+        self.batch_size = batch_size
+        self.interval = interval
+        # name -> latest snapshot waiting to be written
+        self._pending = {}
+        self._errors = []
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        # Held while a batch is written so batches land in order
+        self._write_lock = threading.Lock()
+        self._thread = None
+        self._stopping = False
+        self.writes = 0
+        self.coalesced = 0
+
+    # ------------------------------------------------------------------------
+    # Caller side
+    # ------------------------------------------------------------------------
+    def enqueue(self, character):
+        """
+        Queue a copy of the character to be saved; returns immediately
+
+        The copy is queued even when an earlier background save failed;
+        that failure is raised afterwards.
+        """
+        snapshot = snapshot_character(character)
+        with self._lock:
+            if snapshot["name"] in self._pending:
+                self.coalesced += 1
+            self._pending[snapshot["name"]] = snapshot
+            full = len(self._pending) >= self.batch_size
+            if full:
+                self._wake.notify()
+        if full and self._thread is None:
+            # Not started: write full batches on the caller's thread
+            self._flush_pending()
+        self._raise_errors()
+        return True
+
+    def pending(self):
+        """Return the names of characters waiting to be written"""
+        with self._lock:
+            return sorted(self._pending)
+
+    def flush(self):
+        """Write every pending save now, on the caller's thread"""
+        self._flush_pending()
+        self._raise_errors()
+
+    def _raise_errors(self):
+        with self._lock:
+            if not self._errors:
+                return
+            error, *others = self._errors
+            self._errors = []
+        for other in others:
+            print(f"Save queue error: {other}")
+        raise error
+
+    # ------------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------------
+    def _write_one(self, character):
+        if self.store is not None:
+            self.store.save(character)
+        else:
+            character_manager.save_character(character, self.save_directory)
+
+    def _write_batch(self, batch):
+        save_many = getattr(self.store, "save_many", None)
+        if save_many is not None:
+            try:
+                save_many(batch)
+                return []
+            except Exception:
+                # Fall back to one at a time to find the bad save(s)
+                pass
+        errors = []
+        for character in batch:
+            try:
+                self._write_one(character)
+            except Exception as e:
+                errors.append(e)
+        return errors
+
+    def _flush_pending(self):
+        with self._write_lock:
+            with self._lock:
+                batch = list(self._pending.values())
+                self._pending = {}
+            if not batch:
+                return
+            errors = self._write_batch(batch)
+            with self._lock:
+                self.writes += len(batch) - len(errors)
+                self._errors.extend(errors)
+
+    # ------------------------------------------------------------------------
+    # Background thread
+    # ------------------------------------------------------------------------
+    def start(self):
+        """Start writing pending saves on a daemon thread"""
+        if self._thread is not None:
+            return self
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._stopping and len(self._pending) < self.batch_size:
+                    self._wake.wait(self.interval)
+                stopping = self._stopping
+            self._flush_pending()
+            if stopping:
+                return
+
+    def close(self):
+        """Stop the thread, write everything still pending, and report errors"""
+        if self._thread is not None:
+            with self._lock:
+                self._stopping = True
+                self._wake.notify()
+            self._thread.join()
+            self._thread = None
+        self._flush_pending()
+        self._raise_errors()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+def run_benchmark(characters=50, saves=5000):
+    """Compare caller-side latency of direct saves and queued saves"""
+    from data_generator import generate_character
+    rng = random.Random(0)
+    roster = [generate_character(i, rng) for i in range(characters)]
+    order = [rng.choice(roster) for _ in range(saves)]
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = os.path.join(tmp, "save_games")
+        start = time.perf_counter()
+        for character in order:
+            character_manager.save_character(character, directory)
+        direct = time.perf_counter() - start
+        queue = SaveQueue(save_directory=directory).start()
+        start = time.perf_counter()
+        for character in order:
+            queue.enqueue(character)
+        queued = time.perf_counter() - start
+        start = time.perf_counter()
+        queue.close()
+        drain = time.perf_counter() - start
+    print(f"{saves} saves of {characters} characters")
+    print(f"  direct:  {direct * 1e6 / saves:8.1f} us per save on the caller")
+    print(f"  queued:  {queued * 1e6 / saves:8.1f} us per save on the caller")
+    print(f"  {queue.writes} files written ({queue.coalesced} saves coalesced), "
+          f"final flush {drain:.3f}s")
+
+if __name__ == "__main__":
+    print("=== SAVE QUEUE BENCHMARK ===")
+    if len(sys.argv) > 1:
+        run_benchmark(saves=int(sys.argv[1]))
+    else:
+        run_benchmark()
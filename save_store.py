@@ -0,0 +1,270 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Save Store Module
+
+This module provides interchangeable storage backends for character saves.
+Every store has the same four methods:
+
+    save(character) -> True
+    load(name) -> character dict       (CharacterNotFoundError if missing)
+    list() -> [names]
+    delete(name) -> True               (CharacterNotFoundError if missing)
+
+TextSaveStore keeps the original one-file-per-character layout.
+SqliteSaveStore keeps every character in one indexed SQLite table, opened
+in WAL mode and shared through a small connection pool.
+
+Install a store with character_manager.set_save_store(store) and the usual
+save_character / load_character / list_saved_characters / delete_character
+calls go through it. migrate_saves() copies every save between two stores.
+"""
+
+import os
+import queue
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+import character_manager
+from custom_exceptions import (
+    CharacterNotFoundError,
+    InvalidSaveDataError,
+    SaveFileCorruptedError
+)
+
+# ============================================================================
+# TEXT FILE STORE
+# ============================================================================
+class TextSaveStore:
+
+    """One NAME_save.txt file per character (the original format)"""
+    def __init__(self, directory="data/save_games"):
+        self.directory = directory
+
+    def save(self, character):
+        return character_manager.write_save_file(character, self.directory)
+
+    def load(self, name):
+        return character_manager.read_save_file(name, self.directory)
+
+    def list(self):
+        return character_manager.list_save_files(self.directory)
+
+    def delete(self, name):
+        return character_manager.delete_save_file(name, self.directory)
+
+    def close(self):
+        pass
+
+# ============================================================================
+# SQLITE STORE
+# ============================================================================
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS characters (
+    name TEXT PRIMARY KEY,
+    class TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    health INTEGER NOT NULL,
+    max_health INTEGER NOT NULL,
+    strength INTEGER NOT NULL,
+    magic INTEGER NOT NULL,
+    experience INTEGER NOT NULL,
+    gold INTEGER NOT NULL,
+    inventory TEXT NOT NULL,
+    active_quests TEXT NOT NULL,
+    completed_quests TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+COLUMNS = ("name", "class", "level", "health", "max_health", "strength", "magic",
+           "experience", "gold", "inventory", "active_quests", "completed_quests")
+LIST_COLUMNS = ("inventory", "active_quests", "completed_quests")
+
+# Fixed statement text, so each pooled connection prepares them once and
+# reuses them from its statement cache
+SAVE_SQL = (
+    f"INSERT INTO characters ({', '.join(COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in COLUMNS)}) "
+    f"ON CONFLICT(name) DO UPDATE SET "
+    + ", ".join(f"{col} = excluded.{col}" for col in COLUMNS[1:])
+)
+LOAD_SQL = f"SELECT {', '.join(COLUMNS)} FROM characters WHERE name = ?"
+LIST_SQL = "SELECT name FROM characters ORDER BY name"
+DELETE_SQL = "DELETE FROM characters WHERE name = ?"
+
+def _to_row(character):
+    return tuple(
+        ",".join(character[col]) if col in LIST_COLUMNS else character[col]
+        for col in COLUMNS
+    )
+
+def _from_row(row):
+    character = dict(zip(COLUMNS, row))
+    for col in LIST_COLUMNS:
+        character[col] = character[col].split(",") if character[col] else []
+    return character
+
+class SqliteSaveStore:
+
+    """
+    All characters in one SQLite database
+
+    Every operation is a single primary-key statement. Connections are
+    pooled so the store can be shared between threads.
+    """
+    def __init__(self, path="data/saves.db", pool_size=4, timeout=30.0):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.path = path
+        self._pool = queue.Queue()
+        self._connections = []
+        try:
+            for _ in range(pool_size):
+                conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False,
+                                       cached_statements=32)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                self._connections.append(conn)
+                self._pool.put(conn)
+            with self._connection() as conn:
+                conn.executescript(SCHEMA_SQL)
+        except sqlite3.DatabaseError as e:
+            self.close()
+            raise SaveFileCorruptedError(f"Could not open save database: {e}")
+
+    @contextmanager
+    def _connection(self):
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def save(self, character):
+        character_manager.validate_character_data(character)
+        with self._connection() as conn:
+            with conn:
+                conn.execute(SAVE_SQL, _to_row(character))
+        return True
+
+    def save_many(self, characters):
+        """Save several characters in one transaction"""
+        rows = []
+        for character in characters:
+            character_manager.validate_character_data(character)
+            rows.append(_to_row(character))
+        with self._connection() as conn:
+            with conn:
+                conn.executemany(SAVE_SQL, rows)
+        return True
+
+    def load(self, name):
+        try:
+            with self._connection() as conn:
+                row = conn.execute(LOAD_SQL, (name,)).fetchone()
+        except sqlite3.DatabaseError as e:
+            raise SaveFileCorruptedError(f"Could not read save database: {e}")
+        if row is None:
+            raise CharacterNotFoundError(f"No save file found for: {name}")
+        character = _from_row(row)
+        character_manager.validate_character_data(character)
+        return character
+
+    def list(self):
+        with self._connection() as conn:
+            return [row[0] for row in conn.execute(LIST_SQL)]
+
+    def delete(self, name):
+        with self._connection() as conn:
+            with conn:
+                deleted = conn.execute(DELETE_SQL, (name,)).rowcount
+        if not deleted:
+            raise CharacterNotFoundError(f"No save file found for: {name}")
+        return True
+
+    def close(self):
+        for conn in self._connections:
+            conn.close()
+        self._connections = []
+
+# ============================================================================
+# MIGRATION
+# ============================================================================
+def open_store(spec):
+    """Open a store from 'text:DIRECTORY' or 'sqlite:PATH'"""
+    kind, _, location = spec.partition(":")
+    if kind == "text":
+        return TextSaveStore(location or "data/save_games")
+    if kind == "sqlite":
+        return SqliteSaveStore(location or "data/saves.db")
+    raise ValueError(f"Unknown save store: {spec}")
+
+def migrate_saves(source, dest, names=None):
+    """
+    Copy saves from one store to another
+
+    Returns: (number copied, {name: error} for saves that could not be read)
+    """
+    copied = 0
+    failed = {}
+    for name in (names if names is not None else source.list()):
+        try:
+            character = source.load(name)
+        except (SaveFileCorruptedError, InvalidSaveDataError, CharacterNotFoundError) as e:
+            failed[name] = e
+            continue
+        dest.save(character)
+        copied += 1
+    return copied, failed
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+def run_benchmark(count=20_000, lookups=2000):
+    """Compare save, list, load and delete times for both stores"""
+    from data_generator import generate_character
+    rng = random.Random(0)
+    characters = [generate_character(i, rng) for i in range(count)]
+    names = [c["name"] for c in random.Random(1).sample(characters, lookups)]
+    with tempfile.TemporaryDirectory() as tmp:
+        stores = {
+            "text": TextSaveStore(os.path.join(tmp, "save_games")),
+            "sqlite": SqliteSaveStore(os.path.join(tmp, "saves.db")),
+        }
+        print(f"{count} characters, {lookups} loads/deletes")
+        print(f"{'store':>8} {'save':>9} {'list':>9} {'load':>9} {'delete':>9}")
+        for label, store in stores.items():
+            timings = []
+            for step in (lambda: [store.save(c) for c in characters],
+                         store.list,
+                         lambda: [store.load(n) for n in names],
+                         lambda: [store.delete(n) for n in names]):
+                start = time.perf_counter()
+                step()
+                timings.append(time.perf_counter() - start)
+            store.close()
+            print(f"{label:>8} " + " ".join(f"{t:>8.3f}s" for t in timings))
+
+if __name__ == "__main__":
+    if len(sys.argv) == 1:
+        print("=== SAVE STORE BENCHMARK ===")
+        print("(migrate with: python save_store.py SOURCE DEST,")
+        print(" e.g. python save_store.py text:data/save_games sqlite:data/saves.db)")
+        run_benchmark()
+        sys.exit(0)
+    if len(sys.argv) != 3:
+        print("Usage: python save_store.py SOURCE DEST")
+        print("  e.g. python save_store.py text:data/save_games sqlite:data/saves.db")
+        sys.exit(2)
+    source_store = open_store(sys.argv[1])
+    dest_store = open_store(sys.argv[2])
+    count, errors = migrate_saves(source_store, dest_store)
+    for failed_name, error in errors.items():
+        print(f"Skipped {failed_name}: {error}")
+    print(f"Migrated {count} characters from {sys.argv[1]} to {sys.argv[2]}")
+    source_store.close()
+    dest_store.close()
@@ -0,0 +1,588 @@
+"""
+Test Character Systems Extensions
+Tests for save stores and the other character storage and update helpers
+"""
+
+import pytest
+import sys
+import random
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_exceptions import *
+import character_manager
+import save_store
+import save_queue
+import character_events
+import character_journal
+import progression
+import character_population
+import data_generator
+import character_loader
+import character_cache
+import inventory_system
+import combat_system
+import battle_events
+import character_snapshots
+import save_integrity
+import save_layout
+
+@pytest.fixture
+def sqlite_store(tmp_path):
+    """Route character_manager saves through a temporary SQLite store"""
+    store = save_store.SqliteSaveStore(str(tmp_path / "saves.db"))
+    character_manager.set_save_store(store)
+    yield store
+    character_manager.set_save_store(None)
+    store.close()
+
+# ============================================================================
+# SAVE STORES
+# ============================================================================
+
+def test_sqlite_store_round_trip(sqlite_store):
+    """save/load/list/delete go through the installed store"""
+    hero = character_manager.create_character("Hero", "Mage")
+    hero["inventory"] = ["health_potion", "iron_sword"]
+    hero["completed_quests"] = ["first_quest"]
+    character_manager.save_character(hero)
+    character_manager.save_character(character_manager.create_character("Ally", "Rogue"))
+    assert character_manager.load_character("Hero") == hero
+    assert character_manager.list_saved_characters() == ["Ally", "Hero"]
+    hero["gold"] = 500
+    character_manager.save_character(hero)
+    assert character_manager.load_character("Hero")["gold"] == 500
+    assert character_manager.delete_character("Hero")
+    assert character_manager.list_saved_characters() == ["Ally"]
+
+def test_sqlite_store_missing_character(sqlite_store):
+    """Unknown names raise CharacterNotFoundError like the text store"""
+    with pytest.raises(CharacterNotFoundError):
+        character_manager.load_character("Nobody")
+    with pytest.raises(CharacterNotFoundError):
+        character_manager.delete_character("Nobody")
+
+def test_migrate_text_to_sqlite(tmp_path):
+    """Good saves are copied to SQLite; unreadable ones are reported"""
+    text_dir = str(tmp_path / "save_games")
+    for name, cls in (("Hero", "Warrior"), ("Ally", "Cleric")):
+        character_manager.save_character(character_manager.create_character(name, cls), text_dir)
+    with open(os.path.join(text_dir, "Broken_save.txt"), "w") as f:
+        f.write("NAME: Broken\nLEVEL: not a number\n")
+    source = save_store.open_store(f"text:{text_dir}")
+    dest = save_store.open_store(f"sqlite:{tmp_path / 'saves.db'}")
+    copied, failed = save_store.migrate_saves(source, dest)
+    assert copied == 2
+    assert list(failed) == ["Broken"]
+    assert dest.list() == ["Ally", "Hero"]
+    assert dest.load("Hero") == source.load("Hero")
+    dest.close()
+
+# ============================================================================
+# SAVE QUEUE
+# ============================================================================
+
+def test_save_queue_coalesces_and_flushes(tmp_path):
+    """Only the latest state of each character is written"""
+    directory = str(tmp_path / "save_games")
+    queue = save_queue.SaveQueue(save_directory=directory, batch_size=100, interval=60)
+    queue.start()
+    hero = character_manager.create_character("Hero", "Warrior")
+    for gold in range(5):
+        hero["gold"] = gold
+        queue.enqueue(hero)
+    hero["gold"] = 999
+    hero["inventory"].append("late_item")
+    queue.close()
+    loaded = character_manager.load_character("Hero", directory)
+    assert loaded["gold"] == 4
+    assert loaded["inventory"] == []
+    assert queue.writes == 1
+    assert queue.coalesced == 4
+
+def test_save_queue_reports_errors_on_next_call(tmp_path, capsys):
+    """Failed background writes are reported once, by the next call"""
+    blocked = tmp_path / "not_a_directory"
+    blocked.write_text("")
+    queue = save_queue.SaveQueue(save_directory=str(blocked)).start()
+    queue.enqueue(character_manager.create_character("Hero", "Mage"))
+    queue.enqueue(character_manager.create_character("Ally", "Rogue"))
+    with pytest.raises(OSError):
+        queue.flush()
+    assert "Save queue error:" in capsys.readouterr().out
+    # The error is reported once, then the queue keeps working
+    queue.save_directory = str(tmp_path / "save_games")
+    queue.enqueue(character_manager.create_character("Hero", "Mage"))
+    queue.close()
+    assert character_manager.list_saved_characters(queue.save_directory) == ["Hero"]
+
+def test_save_after_a_failed_save_is_still_written(tmp_path):
+    """Reporting an earlier failure does not drop the save being queued"""
+    directory = str(tmp_path / "save_games")
+    # Not started: a write happens on the caller's thread once 2 are waiting
+    queue = save_queue.SaveQueue(save_directory=directory, batch_size=2)
+    broken = character_manager.create_character("Broken", "Mage")
+    del broken["class"]
+    queue.enqueue(broken)
+    with pytest.raises(KeyError):
+        queue.enqueue(character_manager.create_character("Ally", "Rogue"))
+    hero = character_manager.create_character("Hero", "Warrior")
+    queue.enqueue(hero)
+    queue.close()
+    assert character_manager.load_character("Hero", directory) == hero
+
+# ============================================================================
+# CHARACTER EVENTS AND JOURNAL
+# ============================================================================
+
+@pytest.fixture
+def journal(tmp_path):
+    store = character_journal.JournalSaveStore(str(tmp_path / "journal"), compact_after=3)
+    yield store
+    store.close()
+
+def test_mutations_emit_events():
+    """Mutation functions report the fields they changed"""
+    seen = []
+    listener = lambda character, fields: seen.append(fields)
+    character_events.subscribe(listener)
+    try:
+        hero = character_manager.create_character("Hero", "Warrior")
+        character_manager.add_gold(hero, 10)
+        inventory_system.add_item_to_inventory(hero, "health_potion")
+    finally:
+        character_events.unsubscribe(listener)
+    assert seen == [("gold",), ("inventory",)]
+
+def test_journal_records_small_changes(journal):
+    """Each change is a short journal line and reloads exactly"""
+    hero = character_manager.create_character("Hero", "Warrior")
+    journal.save(hero)
+    before = journal.bytes_written
+    character_manager.add_gold(hero, 25)
+    inventory_system.add_item_to_inventory(hero, "health_potion")
+    hero["gold"] += 5  # changed outside an event; picked up by save()
+    journal.save(hero)
+    assert journal.bytes_written - before < 100
+    assert journal.sequence("Hero") == 4
+    reopened = character_journal.JournalSaveStore(journal.directory)
+    assert reopened.load("Hero") == hero
+    assert reopened.list() == ["Hero"]
+    reopened.close()
+
+def test_journal_recovers_any_point_after_compaction(journal):
+    """History rebuilds earlier states; a torn last line is ignored"""
+    hero = character_manager.create_character("Hero", "Mage")
+    journal.save(hero)
+    for _ in range(5):
+        character_manager.add_gold(hero, 1)
+    assert journal.compact_due() == ["Hero"]
+    character_manager.add_gold(hero, 1)
+    assert journal.load("Hero") == hero
+    assert journal.load("Hero", upto_seq=1)["gold"] == 100
+    assert journal.load("Hero", upto_seq=4)["gold"] == 103
+    # A torn final line (crash mid-append) is ignored on reload
+    with open(os.path.join(journal.directory, "Hero.journal"), "a") as f:
+        f.write('8 {"gold":')
+    reopened = character_journal.JournalSaveStore(journal.directory)
+    assert reopened.load("Hero")["gold"] == 106
+    reopened.close()
+
+def test_journal_appends_after_a_torn_line(journal):
+    """Changes made after a crash mid-append survive a reload"""
+    hero = character_manager.create_character("Hero", "Warrior")
+    journal.save(hero)
+    character_manager.add_gold(hero, 5)
+    journal.close()
+    with open(os.path.join(journal.directory, "Hero.journal"), "a") as f:
+        f.write('3 {"gold":1')
+    store = character_journal.JournalSaveStore(journal.directory)
+    hero = store.load("Hero")
+    assert hero["gold"] == 105
+    character_manager.add_gold(hero, 50)
+    store.close()
+    reopened = character_journal.JournalSaveStore(journal.directory)
+    assert reopened.load("Hero")["gold"] == 155
+    reopened.close()
+
+def test_journal_ignores_copies_and_bounds_open_files(tmp_path):
+    """Only the saved/loaded dict is journaled; old journal files get closed"""
+    store = character_journal.JournalSaveStore(str(tmp_path / "journal"), max_open=2)
+    heroes = [character_manager.create_character(f"Hero{i}", "Cleric") for i in range(5)]
+    for hero in heroes:
+        store.save(hero)
+    assert len(store._journals) == 2
+    copy = dict(heroes[0])
+    character_manager.add_gold(copy, 5000)
+    character_manager.add_gold(heroes[0], 1)
+    loaded = store.load("Hero1")
+    character_manager.add_gold(loaded, 2)
+    store.close()
+    reopened = character_journal.JournalSaveStore(store.directory)
+    assert reopened.load("Hero0")["gold"] == 101
+    assert reopened.load("Hero1")["gold"] == 102
+    reopened.close()
+
+# ============================================================================
+# PROGRESSION
+# ============================================================================
+
+@pytest.mark.parametrize("curve", [
+    progression.DEFAULT_CURVE,
+    progression.XPCurve(lambda level: 50 * level * level + 25, {"max_health": 7, "magic": 1}),
+])
+def test_closed_form_matches_stepwise(curve):
+    """apply_experience gives the same result as levelling one step at a time"""
+    rng = random.Random(7)
+    for _ in range(500):
+        start = character_manager.create_character("Hero", rng.choice(["Warrior", "Mage"]))
+        start["level"] = rng.randint(1, 40)
+        start["experience"] = rng.randint(0, curve.xp_to_next(start["level"]) - 1)
+        xp = rng.choice([0, rng.randint(1, 500), rng.randint(1, 10 ** 6)])
+        stepped, jumped = dict(start), dict(start)
+        assert progression.step_experience(stepped, xp, curve) == \
+            progression.apply_experience(jumped, xp, curve)
+        assert stepped == jumped
+
+def test_gain_experience_huge_grant():
+    """A grant worth thousands of levels is applied in one go"""
+    hero = character_manager.create_character("Hero", "Warrior")
+    level = character_manager.gain_experience(hero, 50 * 10000 * 9999 + 123)
+    assert level == 10000
+    assert hero["experience"] == 123
+    assert hero["max_health"] == 120 + 10 * 9999
+    assert hero["health"] == hero["max_health"]
+
+# ============================================================================
+# CHARACTER POPULATION
+# ============================================================================
+
+def _random_roster(count, seed=3):
+    rng = random.Random(seed)
+    roster = [data_generator.generate_character(i, rng) for i in range(count)]
+    for character in roster[::7]:
+        character["health"] = 0
+    return roster
+
+@pytest.mark.parametrize("curve", [
+    progression.DEFAULT_CURVE,
+    progression.XPCurve(lambda level: 30 * level * level),
+])
+def test_population_matches_scalar_functions(curve):
+    """Array updates give the same characters as the per-character functions"""
+    pytest.importorskip("numpy")
+    roster = _random_roster(300)
+    grants = [random.Random(i).randint(0, 200_000) for i in range(len(roster))]
+    population = character_population.CharacterPopulation(roster, curve)
+    population.gain_experience(grants)
+    population.add_gold(50)
+    revived = population.revive()
+    for character, xp in zip(roster, grants):
+        if character["health"] > 0:
+            character_manager.gain_experience(character, xp, curve)
+        character_manager.add_gold(character, 50)
+    assert revived == sum(1 for c in roster if c["health"] <= 0)
+    for character in roster:
+        if character["health"] <= 0:
+            character_manager.revive_character(character)
+    assert population.to_characters() == roster
+
+def test_population_gold_is_all_or_nothing(tmp_path):
+    """A gold change that would go negative changes no one"""
+    pytest.importorskip("numpy")
+    roster = _random_roster(20)
+    roster[5]["gold"] = 10
+    population = character_population.CharacterPopulation(roster)
+    before = population.gold.copy()
+    with pytest.raises(ValueError):
+        population.add_gold(-20)
+    assert (population.gold == before).all()
+    population.save_all(str(tmp_path))
+    loaded = character_population.CharacterPopulation.from_save_files(str(tmp_path))
+    assert sorted(loaded.to_characters(), key=lambda c: c["name"]) == roster
+
+# ============================================================================
+# BULK LOADING
+# ============================================================================
+
+def test_load_characters_reports_each_failure(tmp_path):
+    """Bulk loading returns every good save and the error for each bad one"""
+    directory = str(tmp_path)
+    data_generator.write_save_games(directory, 30)
+    with open(os.path.join(directory, "Broken_save.txt"), "w") as f:
+        f.write("NAME: Broken\nLEVEL: x\n")
+    names = character_manager.list_saved_characters(directory) + ["Missing"]
+    for kwargs in ({"workers": 3}, {"workers": 2, "processes": True}):
+        loaded, failed = character_loader.load_characters(names, directory, **kwargs)
+        assert len(loaded) == 30
+        assert loaded["hero_0000007"] == character_manager.load_character("hero_0000007", directory)
+        assert isinstance(failed["Broken"], InvalidSaveDataError)
+        assert isinstance(failed["Missing"], CharacterNotFoundError)
+
+def test_prefetch_is_refreshed_when_save_changes(tmp_path):
+    """A prefetched save is re-read if the file changed since"""
+    directory = str(tmp_path)
+    hero = character_manager.create_character("Hero", "Rogue")
+    character_manager.save_character(hero, directory)
+    with character_loader.CharacterLoader(directory, workers=2) as loader:
+        loader.prefetch(["Hero", "Missing"])
+        hero["gold"] = 1234
+        hero["inventory"] = ["a_much_longer_inventory_entry"]
+        character_manager.save_character(hero, directory)
+        assert loader.load("Hero") == hero
+        with pytest.raises(CharacterNotFoundError):
+            loader.load("Missing")
+
+def test_prefetch_is_bounded_and_dropped_on_save(sqlite_store):
+    """Only a few names are prefetched, and saving a character drops its result"""
+    for name in ("Ann", "Bob", "Cat"):
+        character_manager.save_character(character_manager.create_character(name, "Mage"))
+    with character_loader.CharacterLoader(workers=2, max_prefetch=2) as loader:
+        loader.prefetch(["Ann", "Bob", "Cat"])
+        assert list(loader._prefetched) == ["Ann", "Bob"]
+        loader.prefetch(["Bob"])
+        assert list(loader._prefetched) == ["Bob"]
+        bob = character_manager.load_character("Bob")
+        bob["gold"] = 4321
+        character_manager.save_character(bob)
+        assert not loader._prefetched
+        assert loader.load("Bob")["gold"] == 4321
+
+# ============================================================================
+# CHARACTER CACHE
+# ============================================================================
+
+@pytest.fixture
+def cache(tmp_path):
+    data_generator.write_save_games(str(tmp_path), 5)
+    cache = character_cache.CharacterCache(capacity=2, save_directory=str(tmp_path))
+    character_manager.set_save_store(cache)
+    yield cache
+    character_manager.set_save_store(None)
+    cache.close()
+
+def test_cache_hits_and_skips_clean_saves(cache):
+    """Repeat loads hit the cache; saving an unchanged character writes nothing"""
+    hero = character_manager.load_character("hero_0000000")
+    assert character_manager.load_character("hero_0000000") is hero
+    character_manager.save_character(hero)
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.writes == 0 and cache.skipped_writes == 1
+    character_manager.add_gold(hero, 5)
+    assert cache.is_dirty("hero_0000000")
+    character_manager.save_character(hero)
+    assert cache.writes == 1 and not cache.is_dirty("hero_0000000")
+
+def test_cache_writes_only_dirty_evictions(cache, tmp_path):
+    """Evicting a changed character writes it; evicting a clean one does not"""
+    first = character_manager.load_character("hero_0000000")
+    second = character_manager.load_character("hero_0000001")
+    inventory_system.add_item_to_inventory(second, "health_potion")
+    character_manager.load_character("hero_0000002")   # evicts clean first
+    character_manager.load_character("hero_0000003")   # evicts dirty second
+    stats = cache.stats()
+    assert stats["evictions"] == 2
+    assert stats["writes"] == 1
+    on_disk = character_manager.read_save_file("hero_0000001", str(tmp_path))
+    assert on_disk["inventory"][-1] == "health_potion"
+    assert character_manager.load_character("hero_0000000") is not first
+
+def test_failed_eviction_keeps_the_dirty_character(cache, monkeypatch):
+    """A dirty character whose eviction save fails is still cached and dirty"""
+    first = character_manager.load_character("hero_0000000")
+    character_manager.add_gold(first, 5)
+    character_manager.load_character("hero_0000001")
+    def full_disk(character):
+        raise OSError("No space left on device")
+    monkeypatch.setattr(cache.store, "save", full_disk)
+    with pytest.raises(OSError):
+        character_manager.load_character("hero_0000002")
+    assert cache.is_dirty("hero_0000000")
+    assert character_manager.load_character("hero_0000000") is first
+    monkeypatch.undo()
+    assert cache.flush() == 1
+
+def test_cache_saves_battle_results(cache, tmp_path):
+    """A battle marks the cached character dirty, so its results are saved"""
+    hero = character_manager.load_character("hero_0000000")
+    hero["health"], hero["max_health"], hero["strength"] = 500, 500, 20
+    cache.mark_dirty("hero_0000000")
+    cache.save(hero)
+    gold = hero["gold"]
+    result = combat_system.SimpleBattle(hero, combat_system.create_enemy("goblin"),
+                                        battle_events.NULL_SINK).start_battle()
+    assert result["winner"] == "player"
+    assert cache.is_dirty("hero_0000000")
+    character_manager.save_character(hero)
+    on_disk = character_manager.read_save_file("hero_0000000", str(tmp_path))
+    assert on_disk["health"] == hero["health"] < 500
+    assert on_disk["gold"] == gold + result["gold_gained"]
+
+# ============================================================================
+# CHARACTER SNAPSHOTS
+# ============================================================================
+
+def test_snapshot_restores_only_changed_fields():
+    """restore() puts back changed fields and keeps the same list objects"""
+    hero = character_snapshots.track(character_manager.create_character("Hero", "Warrior"))
+    inventory = hero["inventory"]
+    quests = hero["completed_quests"]
+    original = hero.to_dict()
+    snapshot = hero.snapshot()
+    inventory_system.purchase_item(hero, "health_potion", {"cost": 25})
+    battle = combat_system.SimpleBattle(hero, combat_system.create_enemy("goblin"))
+    battle.apply_damage(hero, battle.calculate_damage(battle.enemy, hero))
+    assert set(hero.changed_fields()) == {"gold", "inventory", "ability_cooldown", "health"}
+    hero.restore(snapshot)
+    assert hero == original
+    assert hero["inventory"] is inventory and hero["completed_quests"] is quests
+
+def test_nested_snapshots_commit_and_restore():
+    """Transactions and previews nest inside an outer snapshot"""
+    hero = character_snapshots.track(character_manager.create_character("Hero", "Rogue"))
+    outer = hero.snapshot()
+    character_manager.add_gold(hero, 10)
+    with hero.transaction():
+        inventory_system.add_item_to_inventory(hero, "iron_sword")
+    with pytest.raises(InsufficientResourcesError):
+        with hero.transaction():
+            inventory_system.sell_item(hero, "iron_sword", {"cost": 40})
+            inventory_system.purchase_item(hero, "dragon_plate", {"cost": 5000})
+    assert hero["inventory"] == ["iron_sword"] and hero["gold"] == 110
+    assert hero.preview(character_manager.add_gold, 50) == 160
+    assert hero["gold"] == 110
+    hero.restore(outer)
+    assert hero["inventory"] == [] and hero["gold"] == 100
+    with pytest.raises(ValueError):
+        hero.restore(outer)
+
+def test_preview_leaves_journal_with_restored_values(journal):
+    """Listeners see the undo of a preview, not just its what-if changes"""
+    hero = character_snapshots.track(character_manager.create_character("Hero", "Rogue"))
+    journal.save(hero)
+    assert hero.preview(character_manager.add_gold, 5000) == 5100
+    with hero.transaction():
+        inventory_system.add_item_to_inventory(hero, "health_potion")
+        snapshot = hero.snapshot()
+        character_manager.add_gold(hero, 7)
+        hero.restore(snapshot)
+    reopened = character_journal.JournalSaveStore(journal.directory)
+    assert reopened.load("Hero") == hero.to_dict()
+    assert reopened.load("Hero")["gold"] == 100
+    reopened.close()
+
+# ============================================================================
+# SAVE INTEGRITY
+# ============================================================================
+
+def _damage_save(path, keep_bytes=None, flip_at=None):
+    with open(path, "rb") as f:
+        data = bytearray(f.read())
+    if flip_at is not None:
+        data[flip_at] ^= 0x01
+    with open(path, "wb") as f:
+        f.write(bytes(data[:keep_bytes]))
+
+def test_load_rejects_truncated_and_corrupt_saves(tmp_path):
+    """The save header catches truncated files and flipped bits"""
+    directory = str(tmp_path)
+    hero = character_manager.create_character("Hero", "Cleric")
+    hero["completed_quests"] = ["first_quest", "second_quest"]
+    character_manager.save_character(hero, directory)
+    path = os.path.join(directory, "Hero_save.txt")
+    assert character_manager.load_character("Hero", directory) == hero
+    _damage_save(path, keep_bytes=-20)
+    with pytest.raises(SaveFileCorruptedError):
+        character_manager.load_character("Hero", directory)
+    character_manager.save_character(hero, directory)
+    _damage_save(path, flip_at=-5)
+    with pytest.raises(SaveFileCorruptedError):
+        character_manager.load_character("Hero", directory)
+
+def test_verify_saves_quarantines_corrupt_files(tmp_path):
+    """verify_saves moves corrupt saves aside and keeps headerless ones"""
+    directory = str(tmp_path)
+    data_generator.write_save_games(directory, 40)
+    _damage_save(os.path.join(directory, "hero_0000003_save.txt"), keep_bytes=-1)
+    _damage_save(os.path.join(directory, "hero_0000011_save.txt"), flip_at=60)
+    with open(os.path.join(directory, "Old_save.txt"), "w") as f:
+        f.write(character_manager.format_character_save(
+            character_manager.create_character("Old", "Mage")))
+    report = save_integrity.verify_saves(directory, workers=4, chunk_size=7)
+    assert report["checked"] == 41
+    assert report["ok"] == 38 and report["unchecked"] == 1
+    assert sorted(report["corrupt"]) == ["hero_0000003", "hero_0000011"]
+    assert len(report["quarantined"]) == 2
+    assert len(character_manager.list_saved_characters(directory)) == 39
+    assert character_manager.load_character("Old", directory)["class"] == "Mage"
+
+# ============================================================================
+# SHARDED SAVE LAYOUT
+# ============================================================================
+
+def test_migration_keeps_flat_saves_readable(tmp_path):
+    """Saves load the same before, during and after migration to shards"""
+    directory = str(tmp_path)
+    data_generator.write_save_games(directory, 25)
+    before = {name: character_manager.load_character(name, directory)
+              for name in character_manager.list_saved_characters(directory)}
+    save_layout.enable_sharding(directory)
+    # Unmigrated flat saves still load; a new write goes to the shard
+    hero = character_manager.load_character("hero_0000004", directory)
+    hero["gold"] = 9999
+    character_manager.save_character(hero, directory)
+    assert os.path.exists(save_layout.sharded_path("hero_0000004", directory))
+    assert not os.path.exists(save_layout.flat_path("hero_0000004", directory))
+    assert save_layout.migrate_to_sharded(directory) == 24
+    assert not any(f.endswith("_save.txt") for f in os.listdir(directory))
+    assert sorted(character_manager.list_saved_characters(directory)) == sorted(before)
+    before["hero_0000004"]["gold"] = 9999
+    for name, character in before.items():
+        assert character_manager.load_character(name, directory) == character
+    character_manager.delete_character("hero_0000004", directory)
+    with pytest.raises(CharacterNotFoundError):
+        character_manager.load_character("hero_0000004", directory)
+
+def test_migration_by_another_process_is_seen(tmp_path):
+    """A cached flat layout notices the marker, and migration keeps the newest copy"""
+    directory = str(tmp_path)
+    hero = character_manager.create_character("Hero", "Warrior")
+    character_manager.save_character(hero, directory)
+    assert not save_layout.is_sharded(directory)
+    # Another process migrates; this one must now read and write the shard
+    os.makedirs(os.path.dirname(save_layout.sharded_path("Hero", directory)))
+    os.replace(save_layout.flat_path("Hero", directory), save_layout.sharded_path("Hero", directory))
+    with open(os.path.join(directory, save_layout.SHARD_MARKER), "w") as f:
+        f.write("2\n")
+    assert character_manager.load_character("Hero", directory) == hero
+    # A flat save written after the shard copy wins a second migration
+    hero["gold"] = 777
+    character_manager.save_character(hero, str(tmp_path / "other"))
+    os.replace(str(tmp_path / "other" / "Hero_save.txt"), save_layout.flat_path("Hero", directory))
+    old = os.stat(save_layout.flat_path("Hero", directory)).st_mtime - 60
+    os.utime(save_layout.sharded_path("Hero", directory), (old, old))
+    assert save_layout.migrate_to_sharded(directory) == 1
+    assert character_manager.load_character("Hero", directory)["gold"] == 777
+
+def test_paged_listing_covers_every_save_once(tmp_path):
+    """Paging through a sharded directory lists each save exactly once"""
+    directory = str(tmp_path)
+    data_generator.write_save_games(directory, 30)
+    save_layout.migrate_to_sharded(directory)
+    character_manager.save_character(character_manager.create_character("Flat", "Mage"),
+                                     str(tmp_path / "other"))
+    os.replace(str(tmp_path / "other" / "Flat_save.txt"), os.path.join(directory, "Flat_save.txt"))
+    pages = []
+    cursor = None
+    while True:
+        names, cursor = save_layout.list_saves_page(directory, limit=7, after=cursor)
+        pages.append(names)
+        if cursor is None:
+            break
+    listed = [name for page in pages for name in page]
+    assert listed[0] == "Flat"
+    assert len(listed) == 31 and sorted(listed) == sorted(
+        character_manager.list_saved_characters(directory))
+    assert all(len(page) == 7 for page in pages[:-1])
@@ -0,0 +1,390 @@
+"""
+Test Combat Systems Extensions
+Tests for battle simulation and the other combat helpers
+"""
+
+import pytest
+import sys
+import os
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_exceptions import *
+import character_manager
+import combat_system
+import battle_simulator
+import battle_arrays
+import battle_events
+import enemy_registry
+import battle_replay
+import game_data
+
+# ============================================================================
+# BATTLE SIMULATOR
+# ============================================================================
+
+@pytest.mark.parametrize("character_class", ["Warrior", "Mage", "Rogue", "Cleric"])
+@pytest.mark.parametrize("action", ["ability", "run"])
+def test_silent_battle_matches_start_battle(character_class, action):
+    """Same random stream, same outcome as the printing engine"""
+    for seed in range(20):
+        hero = character_manager.create_character("Hero", character_class)
+        random.seed(seed)
+        battle = combat_system.SimpleBattle(dict(hero), combat_system.create_enemy("orc"),
+                                            battle_events.NULL_SINK)
+        battle.next_player_action = action
+        expected = battle.start_battle()
+        random.seed(seed)
+        # start_battle uses next_player_action on the first turn only
+        policy = lambda b: action if b.turn == 1 else "attack"
+        copy = dict(hero)
+        winner, turns, xp, gold = battle_simulator.run_battle(
+            copy, combat_system.create_enemy("orc"), policy)
+        assert (winner, xp, gold) == (expected["winner"], expected["xp_gained"],
+                                      expected["gold_gained"])
+        assert turns == battle.turn
+        assert copy == battle.character
+
+def test_simulation_is_seeded_and_worker_independent():
+    """The same seed gives the same report for any number of workers"""
+    hero = character_manager.create_character("Hero", "Rogue")
+    hero["health"] = 20
+    one = battle_simulator.simulate_battles(hero, "goblin", 3000, "ability",
+                                            workers=1, seed=1, batch_size=500)
+    two = battle_simulator.simulate_battles(hero, "goblin", 3000, "ability",
+                                            workers=2, seed=1, batch_size=500)
+    assert one == two
+    assert one["wins"] + one["losses"] + one["escapes"] == 3000
+    assert sum(one["turns"].values()) == 3000
+    low, high = one["win_rate_ci"]
+    assert 0 < low <= one["win_rate"] <= high < 1
+    assert one["xp_per_battle"] == pytest.approx(one["win_rate"] * 25)
+    other = battle_simulator.simulate_battles(hero, "goblin", 3000, "ability",
+                                              workers=1, seed=2, batch_size=500)
+    assert other != one
+
+def test_simulation_workers_use_the_installed_registry(enemy_file, monkeypatch):
+    """Enemies registered in this process are used by every worker"""
+    import functools
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    # Fresh worker processes, which do not inherit the registry
+    monkeypatch.setattr(battle_simulator, "ProcessPoolExecutor", functools.partial(
+        ProcessPoolExecutor, mp_context=multiprocessing.get_context("spawn")))
+    hero = character_manager.create_character("Hero", "Warrior")
+    combat_system.set_enemy_registry(enemy_registry.EnemyRegistry.from_file(enemy_file))
+    try:
+        one = battle_simulator.simulate_battles(hero, "troll", 400, workers=1, batch_size=100)
+        two = battle_simulator.simulate_battles(hero, "troll", 400, workers=2, batch_size=100)
+    finally:
+        combat_system.set_enemy_registry(None)
+    assert one == two
+    assert one["xp_per_battle"] == pytest.approx(one["win_rate"] * 90)
+
+def test_simulation_rejects_bad_arguments():
+    """Unknown enemy types and policies fail before any battle runs"""
+    hero = character_manager.create_character("Hero", "Mage")
+    with pytest.raises(InvalidTargetError):
+        battle_simulator.simulate_battles(hero, "unicorn", 10)
+    with pytest.raises(ValueError):
+        battle_simulator.simulate_battles(hero, "goblin", 10, "dance")
+
+# ============================================================================
+# BATTLE ARRAYS
+# ============================================================================
+
+def _weak_hero(character_class):
+    hero = character_manager.create_character("Hero", character_class)
+    hero["health"] = 20
+    return hero
+
+@pytest.mark.parametrize("character_class", ["Warrior", "Mage", "Cleric", "Unknown"])
+def test_array_engine_matches_deterministic_battles(character_class):
+    """Without random rolls the array engine matches the scalar engine exactly"""
+    pytest.importorskip("numpy")
+    hero = _weak_hero("Warrior")
+    hero["class"] = character_class
+    for enemy_type in ("goblin", "orc", "dragon"):
+        for policy in ("attack", "ability"):
+            scalar = battle_simulator.simulate_battles(hero, enemy_type, 50, policy, workers=1)
+            vector = battle_arrays.simulate_battles(hero, enemy_type, 50, policy)
+            assert vector == scalar
+
+@pytest.mark.parametrize("policy", ["ability", "run"])
+def test_array_engine_distribution_matches_scalar(policy):
+    """Rogue crits and escapes are random; compare the distributions"""
+    pytest.importorskip("numpy")
+    hero = _weak_hero("Rogue")
+    scalar = battle_simulator.simulate_battles(hero, "goblin", 20_000, policy, workers=1, seed=3)
+    vector = battle_arrays.simulate_battles(hero, "goblin", 20_000, policy, seed=3)
+    _, _, p_value = battle_arrays.chi_square_homogeneity(scalar["turns"], vector["turns"])
+    assert p_value > 0.001
+    winners = ("wins", "losses", "escapes")
+    _, _, p_value = battle_arrays.chi_square_homogeneity(
+        {k: scalar[k] for k in winners}, {k: vector[k] for k in winners})
+    assert p_value > 0.001
+    low, high = scalar["win_rate_ci"]
+    assert low - 0.02 <= vector["win_rate"] <= high + 0.02
+
+def test_chi_square_flags_different_distributions():
+    """The homogeneity test passes similar samples and flags different ones"""
+    same = battle_arrays.chi_square_homogeneity({1: 500, 2: 500}, {1: 510, 2: 490})
+    different = battle_arrays.chi_square_homogeneity({1: 500, 2: 500}, {1: 600, 2: 400})
+    assert same[2] > 0.05 and different[2] < 0.001
+
+# ============================================================================
+# BATTLE EVENTS
+# ============================================================================
+
+def _fight(sink, seed=4):
+    random.seed(seed)
+    hero = character_manager.create_character("Hero", "Rogue")
+    battle = combat_system.SimpleBattle(hero, combat_system.create_enemy("orc"), sink)
+    battle.next_player_action = "ability"
+    return battle.start_battle()
+
+def test_default_sink_prints_battle_log(capsys):
+    """The default sink prints the same lines the game always printed"""
+    _fight(None)
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == ">>> Battle start! Hero vs Orc"
+    assert lines[1] == ">>> Turn 1 begins."
+    assert lines[3].startswith("  Hero: 90/90 HP | Orc: ")
+    assert lines[-1] == ">>> Hero defeated Orc!"
+
+def test_sinks_record_the_same_events(capsys):
+    """Every sink sees the same events and the binary recording decodes back"""
+    ring = battle_events.RingBufferSink(capacity=1000)
+    recorder = battle_events.BinaryRecorder()
+    text = battle_events.TextSink(batch_size=3)
+    assert _fight(ring) == _fight(recorder) == _fight(text) == _fight(battle_events.NULL_SINK)
+    assert battle_events.decode_events(recorder.data()) == list(ring.events)
+    assert capsys.readouterr().out.splitlines() == ring.lines()
+    small = battle_events.RingBufferSink(capacity=4)
+    _fight(small)
+    assert list(small.events) == list(ring.events)[-4:]
+
+def test_installed_sink_is_used_by_new_battles(capsys):
+    """set_event_sink changes where battles without a sink report"""
+    combat_system.set_event_sink(battle_events.NULL_SINK)
+    try:
+        _fight(None)
+    finally:
+        combat_system.set_event_sink(None)
+    assert capsys.readouterr().out == ""
+
+def test_text_sink_keeps_threaded_battles_apart():
+    """Battles on different threads through one sink print whole battle logs"""
+    import io
+    import threading
+    import time
+    stream = io.StringIO()
+    sink = battle_events.TextSink(stream, batch_size=1000)
+    names = [f"Hero{i}" for i in range(8)]
+    def fight(name):
+        for _ in range(20):
+            hero = character_manager.create_character(name, "Warrior")
+            battle = combat_system.SimpleBattle(hero, combat_system.create_enemy("orc"), sink)
+            # Give the other threads a chance to run every turn
+            battle.policy = lambda b: time.sleep(0) or "attack"
+            battle.start_battle()
+    threads = [threading.Thread(target=fight, args=(name,)) for name in names]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    lines = stream.getvalue().splitlines()
+    starts = [i for i, line in enumerate(lines) if line.startswith(">>> Battle start!")]
+    assert len(starts) == len(names) * 20
+    for start in starts:
+        name = lines[start].split()[3]
+        end = next(i for i in range(start, len(lines)) if "defeated" in lines[i])
+        assert all(name in line for line in lines[start:end + 1] if "Turn" not in line)
+
+def test_narration_is_flushed_when_a_battle_fails():
+    """An error mid-battle still prints what happened before it"""
+    import io
+    stream = io.StringIO()
+    battle = combat_system.SimpleBattle(character_manager.create_character("Hero", "Mage"),
+                                        combat_system.create_enemy("dragon"),
+                                        battle_events.TextSink(stream))
+    def policy(b):
+        if b.turn == 2:
+            raise RuntimeError("controller disconnected")
+        return "attack"
+    battle.policy = policy
+    with pytest.raises(RuntimeError):
+        battle.start_battle()
+    lines = stream.getvalue().splitlines()
+    assert lines[0] == ">>> Battle start! Hero vs Dragon"
+    assert lines[-1] == ">>> Turn 2 begins."
+
+# ============================================================================
+# ENEMY REGISTRY
+# ============================================================================
+
+@pytest.fixture
+def enemy_file(tmp_path):
+    path = tmp_path / "enemies.txt"
+    with open("data/enemies.txt") as f:
+        shipped = f.read()
+    path.write_text(shipped + "\nENEMY_ID: troll\nNAME: Troll\nHEALTH: 120\nSTRENGTH: 18\n"
+                    "MAGIC: 0\nXP_REWARD: 90\nGOLD_REWARD: 40\nMIN_LEVEL: 4\nMAX_LEVEL: 4\n")
+    return str(path)
+
+def test_shipped_enemies_match_builtin_definitions():
+    """data/enemies.txt gives the same enemies and level bands as before"""
+    registry = enemy_registry.EnemyRegistry.from_file("data/enemies.txt")
+    builtin = enemy_registry.EnemyRegistry(enemy_registry.BUILTIN_ENEMIES)
+    for enemy_type in ("goblin", "orc", "dragon"):
+        assert registry.create(enemy_type) == builtin.create(enemy_type)
+    assert combat_system.create_enemy("Orc") == {
+        "name": "Orc", "health": 80, "max_health": 80, "strength": 12,
+        "magic": 5, "xp_reward": 50, "gold_reward": 25}
+    names = [combat_system.get_random_enemy_for_level(level)["name"] for level in range(1, 9)]
+    assert names == ["Goblin"] * 2 + ["Orc"] * 3 + ["Dragon"] * 3
+
+def test_default_enemy_file_has_every_builtin_enemy(tmp_path, monkeypatch):
+    """A fresh install writes all shipped enemies, not just the goblin"""
+    monkeypatch.chdir(tmp_path)
+    game_data.create_default_data_files()
+    with open("data/enemies.txt") as f:
+        written = f.read()
+    with open(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           "data", "enemies.txt")) as f:
+        assert written.strip() == f.read().strip()
+    registry = enemy_registry.load_default_registry()
+    assert sorted(registry.types()) == ["dragon", "goblin", "orc"]
+    assert registry.create("orc")["name"] == "Orc"
+    assert registry.for_level(10) == "dragon"
+
+def test_create_enemy_works_from_any_directory(tmp_path, monkeypatch):
+    """The default registry does not depend on the current directory"""
+    monkeypatch.chdir(tmp_path)
+    # Some other program's data directory
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "enemies.txt").write_text("ENEMY_ID: slime\nHEALTH: lots\n")
+    combat_system.set_enemy_registry(None)
+    try:
+        assert combat_system.create_enemy("dragon")["name"] == "Dragon"
+        assert combat_system.get_random_enemy_for_level(4)["name"] == "Orc"
+    finally:
+        combat_system.set_enemy_registry(None)
+
+def test_registry_spawns_independent_clones(enemy_file):
+    """Spawned enemies are separate copies of a read-only prototype"""
+    registry = enemy_registry.EnemyRegistry.from_file(enemy_file)
+    combat_system.set_enemy_registry(registry)
+    try:
+        trolls = combat_system.spawn_enemies("troll", 100)
+        assert combat_system.get_random_enemy_for_level(4)["name"] == "Troll"
+        assert combat_system.get_random_enemy_for_level(5)["name"] == "Orc"
+    finally:
+        combat_system.set_enemy_registry(None)
+    assert len(trolls) == 100 and len({id(t) for t in trolls}) == 100
+    trolls[0]["health"] = 0
+    assert trolls[1]["health"] == 120
+    assert registry.prototype("troll")["health"] == 120
+    with pytest.raises(TypeError):
+        registry.prototype("troll")["health"] = 1
+    with pytest.raises(InvalidTargetError):
+        registry.spawn("unicorn", 3)
+
+def test_enemy_catalog_uses_game_data_conventions(tmp_path):
+    """Bad enemy catalogs raise the usual game_data errors"""
+    import catalog_validation
+    bad = tmp_path / "enemies.txt"
+    bad.write_text("ENEMY_ID: slime\nNAME: Slime\nHEALTH: lots\n")
+    with pytest.raises(InvalidDataFormatError):
+        enemy_registry.EnemyRegistry.from_file(str(bad))
+    with pytest.raises(MissingDataFileError):
+        game_data.load_enemies(str(tmp_path / "missing.txt"))
+    errors = catalog_validation.validate_catalog(str(bad))
+    assert {e["field"] for e in errors} >= {"health", "strength", "min_level"}
+
+# ============================================================================
+# SEEDED BATTLES AND REPLAY
+# ============================================================================
+
+def _mixed_policy(battle):
+    return ("attack", "ability", "ability", "run")[battle.turn % 4]
+
+def _recorded_battles(count):
+    recordings = []
+    for i in range(count):
+        character_class = ("Warrior", "Mage", "Rogue", "Cleric")[i % 4]
+        hero = character_manager.create_character(f"Hero{i}", character_class)
+        hero["health"] = 40
+        _, recording = battle_replay.record_battle(
+            hero, combat_system.create_enemy("orc"), _mixed_policy, seed=i)
+        recordings.append(recording)
+    return recordings
+
+def test_same_seed_gives_same_battle():
+    """A battle's seed alone decides its random rolls"""
+    hero = character_manager.create_character("Shade", "Rogue")
+    outcomes = set()
+    for _ in range(3):
+        random.seed()   # the global stream must not matter
+        battle = combat_system.SimpleBattle(dict(hero), combat_system.create_enemy("orc"),
+                                            battle_events.NULL_SINK, seed=1234)
+        battle.policy = _mixed_policy
+        result = battle.start_battle()
+        outcomes.add((result["winner"], battle.turn, tuple(battle.actions)))
+    assert len(outcomes) == 1
+    assert battle_simulator.simulate_battles(hero, "orc", 300, "ability", workers=1, seed=5,
+                                             batch_size=100) == \
+        battle_simulator.simulate_battles(hero, "orc", 300, "ability", workers=2, seed=5,
+                                          batch_size=100)
+
+def test_recording_round_trip_replays_outcome():
+    """Recordings decode to what was recorded and replay to the same outcome"""
+    recordings = _recorded_battles(40)
+    assert {r.result["winner"] for r in recordings} >= {"player", "escaped"}
+    for recording in recordings:
+        data = battle_replay.encode(recording)
+        assert len(data) < 100
+        assert battle_replay.decode(data) == recording
+        matches, result = battle_replay.replay(data)
+        assert matches and result == recording.result
+
+def test_replay_detects_changed_outcomes(tmp_path, monkeypatch):
+    """Replaying a file flags tampered recordings and changed rules"""
+    recordings = _recorded_battles(40)
+    path = str(tmp_path / "battles.bin")
+    battle_replay.write_recordings(path, recordings)
+    assert battle_replay.replay_file(path, workers=2, chunk_size=10) == \
+        {"replayed": 40, "mismatches": [], "corrupt": []}
+    tampered = battle_replay.decode(battle_replay.encode(recordings[3]))
+    tampered.seed += 1
+    tampered.enemy["health"] = 1
+    assert not battle_replay.replay(tampered)[0]
+    # A balance change: orcs reward less gold
+    monkeypatch.setattr(combat_system, "get_victory_rewards",
+                        lambda enemy: {"xp": enemy["xp_reward"], "gold": 0})
+    report = battle_replay.replay_file(path, workers=1)
+    won = [i for i, r in enumerate(recordings) if r.result["winner"] == "player"]
+    assert report["mismatches"] == won
+
+def test_odd_seeds_and_damaged_files_are_handled(tmp_path):
+    """Any random.Random seed records; damaged recordings are reported, not fatal"""
+    hero = character_manager.create_character("Hero", "Rogue")
+    recordings = []
+    for seed in (-1, 2 ** 70, "dragon run", 12):
+        _, recording = battle_replay.record_battle(
+            dict(hero), combat_system.create_enemy("orc"), _mixed_policy, seed)
+        assert battle_replay.replay(battle_replay.encode(recording))[0]
+        recordings.append(battle_replay.encode(recording))
+    assert recordings[3] == battle_replay.encode(battle_replay.record_battle(
+        dict(hero), combat_system.create_enemy("orc"), _mixed_policy, 12)[1])
+    recordings[1] = recordings[1][:20]
+    path = str(tmp_path / "battles.bin")
+    battle_replay.write_recordings(path, recordings)
+    with open(path, "ab") as f:
+        f.write(b"\x40\x00")   # torn length prefix of a fifth recording
+    for workers in (1, 2):
+        report = battle_replay.replay_file(path, workers=workers, chunk_size=2)
+        assert report == {"replayed": 5, "mismatches": [], "corrupt": [1, 4]}
+    with pytest.raises(ValueError):
+        battle_replay.decode(recordings[1])
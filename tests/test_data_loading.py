@@ -0,0 +1,390 @@
+"""
+Test Data Loading Extensions
+Tests for catalog caching and the alternative catalog loaders
+"""
+
+import pytest
+import sys
+import os
+import shutil
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_exceptions import *
+import game_data
+import catalog_cache
+import lazy_catalog
+import catalog_shards
+import catalog_reload
+import record_schema
+import compact_records
+import inventory_system
+import catalog_validation
+import catalog_backends
+import data_generator
+import quest_handler
+import character_manager
+
+@pytest.fixture
+def quest_file(tmp_path):
+    """Copy the shipped quest catalog into a temp directory"""
+    path = tmp_path / "quests.txt"
+    shutil.copy("data/quests.txt", path)
+    return str(path)
+
+@pytest.fixture
+def item_file(tmp_path):
+    """Copy the shipped item catalog into a temp directory"""
+    path = tmp_path / "items.txt"
+    shutil.copy("data/items.txt", path)
+    return str(path)
+
+# ============================================================================
+# CATALOG CACHE TESTS
+# ============================================================================
+
+def test_bundle_matches_text_parse(quest_file, item_file):
+    """Test that bundle loads return the same records as the text parser"""
+    assert catalog_cache.load_quests(quest_file) == game_data.load_quests(quest_file)
+    assert catalog_cache.is_bundle_fresh(quest_file, "quests")
+    assert catalog_cache.load_quests(quest_file) == game_data.load_quests(quest_file)
+    assert catalog_cache.load_items(item_file) == game_data.load_items(item_file)
+
+def test_stale_bundle_falls_back_to_text(quest_file):
+    """Test that editing the text catalog invalidates the bundle"""
+    catalog_cache.compile_catalog(quest_file, "quests")
+    with open(quest_file, "a") as f:
+        f.write("QUEST_ID: extra\nTITLE: Extra\nDESCRIPTION: New\n"
+                "REWARD_XP: 1\nREWARD_GOLD: 1\nREQUIRED_LEVEL: 1\nPREREQUISITE: NONE\n")
+    assert not catalog_cache.is_bundle_fresh(quest_file, "quests")
+    quests = catalog_cache.load_quests(quest_file)
+    assert "extra" in quests
+    assert catalog_cache.is_bundle_fresh(quest_file, "quests")
+
+def test_bundle_rejects_invalid_catalog(tmp_path):
+    """Test that invalid catalogs are never compiled"""
+    path = tmp_path / "bad.txt"
+    path.write_text("QUEST_ID: bad\nREWARD_XP: lots\n")
+    with pytest.raises(InvalidDataFormatError):
+        catalog_cache.compile_catalog(str(path), "quests")
+    assert not os.path.exists(str(path) + catalog_cache.BUNDLE_SUFFIX)
+
+def test_failed_bundle_write_leaves_no_temp_file(quest_file, tmp_path):
+    """Test that a bundle that cannot be written leaves nothing behind"""
+    bundle = tmp_path / "blocked.bundle"
+    bundle.mkdir()
+    (bundle / "keep").write_text("")
+    before = sorted(os.listdir(str(tmp_path)))
+    with pytest.raises(CorruptedDataError):
+        catalog_cache.compile_catalog(quest_file, "quests", str(bundle))
+    assert sorted(os.listdir(str(tmp_path))) == before
+
+# ============================================================================
+# STREAMING PARSER TESTS
+# ============================================================================
+
+def test_iter_quests_yields_line_numbers(quest_file):
+    """Test that streamed quests carry the line their block starts on"""
+    records = list(game_data.iter_quests(quest_file))
+    assert records[0][0] == 1
+    assert records[1][0] == 9
+    assert [q["quest_id"] for _, q in records] == list(game_data.load_quests(quest_file))
+
+def test_iter_items_is_lazy(tmp_path):
+    """Test that records before a bad block are yielded before the error"""
+    path = tmp_path / "items.txt"
+    path.write_text(
+        "ITEM_ID: ok\nNAME: Ok\nTYPE: armor\nEFFECT: max_health:1\nCOST: 1\nDESCRIPTION: Ok\n\n\n"
+        "ITEM_ID: bad\nNAME: Bad\nTYPE: hat\nEFFECT: magic:1\nCOST: 1\nDESCRIPTION: Bad\n"
+    )
+    records = game_data.iter_items(str(path))
+    line_number, item = next(records)
+    assert item["item_id"] == "ok"
+    with pytest.raises(InvalidDataFormatError, match="line 9"):
+        next(records)
+
+# ============================================================================
+# LAZY CATALOG TESTS
+# ============================================================================
+
+def test_lazy_catalog_parses_on_demand(quest_file):
+    """Test that lookups parse only the requested record"""
+    eager = game_data.load_quests(quest_file)
+    with lazy_catalog.open_quests(quest_file) as quests:
+        assert len(quests) == len(eager)
+        assert "dragon_slayer" in quests
+        assert quests.parsed_count() == 0
+        assert quests["dragon_slayer"] == eager["dragon_slayer"]
+        assert quests.parsed_count() == 1
+        assert dict(quests) == eager
+
+def test_lazy_catalog_works_with_quest_handler(quest_file):
+    """Test that quest_handler accepts a lazy catalog as its quest dict"""
+    char = character_manager.create_character("LazyTest", "Mage")
+    with lazy_catalog.open_quests(quest_file) as quests:
+        quest_handler.accept_quest(char, "first_steps", quests)
+        quest_handler.complete_quest(char, "first_steps", quests)
+        available = quest_handler.get_available_quests(char, quests)
+    assert "first_steps" in char["completed_quests"]
+    assert all(q["prerequisite"] == "first_steps" for q in available)
+
+def test_lazy_catalog_sidecar_invalidated_by_edit(quest_file):
+    """Test that the sidecar index is rebuilt when the file changes"""
+    lazy_catalog.open_quests(quest_file).close()
+    assert lazy_catalog.load_index(quest_file, "quests") is not None
+    with open(quest_file, "a") as f:
+        f.write("QUEST_ID: extra\nTITLE: Extra\nDESCRIPTION: New\n"
+                "REWARD_XP: 1\nREWARD_GOLD: 1\nREQUIRED_LEVEL: 1\nPREREQUISITE: NONE\n")
+    assert lazy_catalog.load_index(quest_file, "quests") is None
+    with lazy_catalog.open_quests(quest_file) as quests:
+        assert quests["extra"]["title"] == "Extra"
+
+# ============================================================================
+# SHARDED CATALOG TESTS
+# ============================================================================
+
+def _write_quest(path, quest_id, title="Quest"):
+    with open(path, "a") as f:
+        f.write(f"QUEST_ID: {quest_id}\nTITLE: {title}\nDESCRIPTION: Test\n"
+                "REWARD_XP: 10\nREWARD_GOLD: 5\nREQUIRED_LEVEL: 1\nPREREQUISITE: NONE\n\n")
+
+def test_sharded_catalog_merges_shards(tmp_path):
+    """Test that serial and pooled shard loading give the same result"""
+    for i in range(6):
+        _write_quest(tmp_path / f"shard_{i}.txt", f"quest_{i}")
+    serial = catalog_shards.load_quest_shards(str(tmp_path), workers=1)
+    pooled = catalog_shards.load_quest_shards(str(tmp_path), workers=2)
+    assert serial == pooled
+    assert sorted(serial) == [f"quest_{i}" for i in range(6)]
+
+def test_sharded_catalog_reports_duplicates(tmp_path):
+    """Test that duplicate IDs across shards are all reported in order"""
+    _write_quest(tmp_path / "b.txt", "dup_one")
+    _write_quest(tmp_path / "a.txt", "dup_two")
+    _write_quest(tmp_path / "c.txt", "dup_one")
+    _write_quest(tmp_path / "c.txt", "dup_two")
+    with pytest.raises(InvalidDataFormatError) as exc:
+        catalog_shards.load_quest_shards(str(tmp_path), workers=1)
+    assert str(exc.value).endswith("dup_one in b.txt, c.txt; dup_two in a.txt, c.txt")
+
+def test_sharded_catalog_missing_directory(tmp_path):
+    """Test that a missing shard directory raises MissingDataFileError"""
+    with pytest.raises(MissingDataFileError):
+        catalog_shards.load_item_shards(str(tmp_path / "items.d"))
+
+# ============================================================================
+# HOT RELOAD TESTS
+# ============================================================================
+
+def _rewrite(path, old, new):
+    with open(path) as f:
+        content = f.read()
+    with open(path, "w") as f:
+        f.write(content.replace(old, new))
+
+def test_watcher_reports_block_changes(quest_file):
+    """Test that a reload updates the live dict in place and reports IDs"""
+    quests = game_data.load_quests(quest_file)
+    untouched = quests["orc_menace"]
+    watcher = catalog_reload.CatalogWatcher(quest_file, "quests", quests)
+    assert watcher.poll() is None
+    _rewrite(quest_file, "REWARD_GOLD: 500\n", "REWARD_GOLD: 9000\n")
+    _rewrite(quest_file, "QUEST_ID: treasure_hunter", "QUEST_ID: treasure_seeker")
+    report = watcher.poll()
+    assert report == {
+        "added": ["treasure_seeker"],
+        "changed": ["dragon_slayer"],
+        "removed": ["treasure_hunter"],
+    }
+    assert quests["dragon_slayer"]["reward_gold"] == 9000
+    assert "treasure_hunter" not in quests
+    assert quests["orc_menace"] is untouched
+
+def test_watcher_keeps_catalog_on_bad_edit(quest_file):
+    """Test that an invalid edit leaves the live catalog unchanged"""
+    watcher = catalog_reload.CatalogWatcher(quest_file, "quests")
+    before = dict(watcher.records)
+    _rewrite(quest_file, "REWARD_XP: 50\n", "REWARD_XP: fifty\n")
+    with pytest.raises(InvalidDataFormatError):
+        watcher.poll()
+    assert watcher.records == before
+
+# ============================================================================
+# RECORD SCHEMA TESTS
+# ============================================================================
+
+def test_compiled_parser_matches_hand_written(quest_file, item_file):
+    """Test that schema parsers produce the same records as parse_*_block"""
+    for _, lines in game_data.iter_blocks(quest_file, "Quest"):
+        assert game_data.parse_quest_record(lines) == game_data.parse_quest_block(lines)
+    for _, lines in game_data.iter_blocks(item_file, "Item"):
+        assert game_data.parse_item_record(lines) == game_data.parse_item_block(lines)
+
+def test_compiled_parser_validates_in_one_pass():
+    """Test that the compiled parser rejects bad values and missing fields"""
+    with pytest.raises(InvalidDataFormatError, match="Invalid item type"):
+        game_data.parse_item_record(["ITEM_ID: x", "TYPE: hat"])
+    with pytest.raises(InvalidDataFormatError, match="Missing quest field: title"):
+        game_data.parse_quest_record(["QUEST_ID: x"])
+    with pytest.raises(InvalidDataFormatError, match="non-numeric"):
+        game_data.parse_quest_record(["REWARD_XP: lots"])
+
+def test_new_record_type_needs_only_schema():
+    """Test that a new record type can be parsed from a schema alone"""
+    parse_loot = record_schema.compile_schema([
+        ("LOOT_ID", "loot_id", str, True, None),
+        ("WEIGHT", "weight", int, True, None),
+        ("RARITY", "rarity", str, False, ["common", "rare"]),
+    ], "Loot")
+    assert parse_loot(["LOOT_ID: chest", "WEIGHT: 3"]) == {"loot_id": "chest", "weight": 3}
+    with pytest.raises(InvalidDataFormatError, match="Invalid loot rarity"):
+        parse_loot(["LOOT_ID: chest", "WEIGHT: 3", "RARITY: epic"])
+
+# ============================================================================
+# COMPACT RECORD TESTS
+# ============================================================================
+
+def test_compact_records_equal_dicts(quest_file, item_file):
+    """Test that compact records compare equal to the loaded dictionaries"""
+    assert compact_records.load_compact_quests(quest_file) == game_data.load_quests(quest_file)
+    assert compact_records.load_compact_items(item_file) == game_data.load_items(item_file)
+
+def test_compact_records_support_dict_access(quest_file, item_file):
+    """Test that game modules can read compact records like dicts"""
+    quests = compact_records.load_compact_quests(quest_file)
+    items = compact_records.load_compact_items(item_file)
+    char = character_manager.create_character("CompactTest", "Warrior")
+    quest_handler.accept_quest(char, "first_steps", quests)
+    result = quest_handler.complete_quest(char, "first_steps", quests)
+    assert result["xp"] == 50
+    inventory_system.purchase_item(char, "iron_sword", items["iron_sword"])
+    assert items["iron_sword"]["effect"] == {"strength": 5}
+    assert "cost" in items["iron_sword"] and "color" not in items["iron_sword"]
+    with pytest.raises(KeyError):
+        items["iron_sword"]["color"]
+
+# ============================================================================
+# BATCH VALIDATION TESTS
+# ============================================================================
+
+BAD_QUESTS = """QUEST_ID: a
+TITLE: A
+DESCRIPTION: Fine
+REWARD_XP: 10
+REWARD_GOLD: ten
+REQUIRED_LEVEL: 1
+PREREQUISITE: c
+
+QUEST_ID: b
+TITLE: B
+REWARD_XP: 10
+REWARD_GOLD: 5
+REQUIRED_LEVEL: 1
+PREREQUISITE: missing
+
+QUEST_ID: c
+TITLE: C
+DESCRIPTION: Loop
+REWARD_XP: 10
+REWARD_GOLD: 5
+REQUIRED_LEVEL: 1
+PREREQUISITE: a
+
+QUEST_ID: b
+TITLE: Again
+DESCRIPTION: Duplicate
+REWARD_XP: 1
+REWARD_GOLD: 1
+REQUIRED_LEVEL: 1
+PREREQUISITE: missing
+"""
+
+def test_validate_catalog_reports_every_error(tmp_path):
+    """Test that one scan reports field, cross-record and duplicate errors"""
+    path = tmp_path / "quests.txt"
+    path.write_text(BAD_QUESTS)
+    errors = catalog_validation.validate_catalog(str(path), workers=1)
+    found = {(e["line"], e["field"]) for e in errors}
+    assert (5, "reward_gold") in found
+    assert (9, "description") in found
+    assert (24, "prerequisite") in found
+    assert (24, None) in found
+    assert any("Circular" in e["reason"] for e in errors)
+    assert catalog_validation.validate_catalog(str(path), workers=2) == errors
+
+def test_validate_catalog_clean_files():
+    """Test that the shipped catalogs have no errors"""
+    assert catalog_validation.validate_catalog("data/quests.txt") == []
+    assert catalog_validation.validate_catalog("data/items.txt") == []
+
+# ============================================================================
+# CATALOG BACKEND TESTS
+# ============================================================================
+
+@pytest.mark.parametrize("extension", [".jsonl", ".db", ".txt"])
+def test_backends_round_trip(tmp_path, quest_file, item_file, extension):
+    """Test that every backend returns the same dicts as the text loader"""
+    quest_dest = str(tmp_path / f"converted_quests{extension}")
+    item_dest = str(tmp_path / f"converted_items{extension}")
+    catalog_backends.convert_catalog(quest_file, quest_dest, "quests")
+    catalog_backends.convert_catalog(item_file, item_dest, "items")
+    assert catalog_backends.load_quests(quest_dest) == game_data.load_quests(quest_file)
+    assert catalog_backends.load_items(item_dest) == game_data.load_items(item_file)
+
+def test_sqlite_filters(tmp_path, quest_file, item_file):
+    """Test that SQLite filters match filtering the loaded dicts"""
+    db = str(tmp_path / "catalog.db")
+    catalog_backends.convert_catalog(quest_file, db, "quests")
+    catalog_backends.convert_catalog(item_file, db, "items")
+    quests = game_data.load_quests(quest_file)
+    with catalog_backends.SqliteCatalog(db) as catalog:
+        found = catalog.query_quests(2, 3)
+        expected = quest_handler.get_quests_by_level(quests, 2, 3)
+        assert sorted(q["quest_id"] for q in found) == sorted(q["quest_id"] for q in expected)
+        weapons = catalog.query_items(item_type="weapon", max_cost=200)
+        assert sorted(i["item_id"] for i in weapons) == ["fire_staff", "iron_sword"]
+        assert catalog.get_item("missing") is None
+
+def test_jsonl_backend_rejects_bad_records(tmp_path):
+    """Test that JSON Lines records are validated like text records"""
+    path = tmp_path / "items.jsonl"
+    path.write_text('{"item_id": "x", "name": "X", "type": "hat", "effect": {"magic": 1}, '
+                    '"cost": 1, "description": "X"}\n')
+    with pytest.raises(InvalidDataFormatError, match="line 1"):
+        catalog_backends.load_items(str(path))
+
+# ============================================================================
+# DATA GENERATOR TESTS
+# ============================================================================
+
+def test_generator_is_seeded_and_valid(tmp_path):
+    """Test that generated catalogs are reproducible and pass validation"""
+    first = str(tmp_path / "quests_a.txt")
+    second = str(tmp_path / "quests_b.txt")
+    data_generator.write_quest_catalog(first, 500, seed=7)
+    data_generator.write_quest_catalog(second, 500, seed=7)
+    with open(first) as a, open(second) as b:
+        assert a.read() == b.read()
+    items = str(tmp_path / "items.txt")
+    data_generator.write_item_catalog(items, 300, seed=7)
+    assert catalog_validation.validate_catalog(first) == []
+    assert catalog_validation.validate_catalog(items) == []
+    quests = game_data.load_quests(first)
+    assert quest_handler.validate_quest_prerequisites(quests)
+
+def test_generated_saves_load(tmp_path):
+    """Test that generated save files load and respect quest prerequisites"""
+    graph = data_generator.write_quest_catalog(str(tmp_path / "quests.txt"), 200)
+    quests = game_data.load_quests(str(tmp_path / "quests.txt"))
+    save_dir = str(tmp_path / "saves")
+    data_generator.write_save_games(save_dir, 20, quest_graph=graph, item_count=50)
+    names = character_manager.list_saved_characters(save_dir)
+    assert len(names) == 20
+    for name in names:
+        char = character_manager.load_character(name, save_dir)
+        for quest_id in char["completed_quests"]:
+            prereq = quests[quest_id]["prerequisite"]
+            assert prereq == "NONE" or prereq in char["completed_quests"]
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])